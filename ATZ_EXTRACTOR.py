@@ -1,69 +1,55 @@
+import argparse
 import os
-import requests
-from bs4 import BeautifulSoup
-from geopy.distance import geodesic
-from shapely.geometry import LineString
-from collections import defaultdict
+from geoaisweb.sectors import LAYERS, extract_to_file, parse_sectors, sector_lines as layer_sector_lines
+from geoaisweb.wfs import feature_url
 
-def extract_atz_sectors_from_url(url, output_file_name, tolerance=0.001):
-    """Extracts ATZ sectors from a GML URL, simplifies coordinates, and saves them to a text file on the desktop."""
-    def simplify_coordinates(coords, tolerance):
-        """Simplifies a list of coordinates using Shapely's simplify method."""
-        line = LineString(coords)
-        simplified_line = line.simplify(tolerance, preserve_topology=False)
-        return list(simplified_line.coords)
-
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "xml")
-
-        sectors = soup.find_all("ICA:ATZ")
-        fir_sectors = defaultdict(list)  # Dict to group sectors by FIR
-
-        for sector in sectors:
-            name = sector.find("ICA:nam")
-            coordinates_data = sector.find("gml:coordinates")
-            related_fir = sector.find("ICA:relatedfir")
+LAYER = LAYERS["ATZ"]
 
-            if name and coordinates_data:
-                name_text = name.get_text()
-                coordinate_pairs = coordinates_data.get_text().split()
-                related_fir_text = f"{related_fir.get_text()}" if related_fir else ""
 
-                # Extract coordinates as tuples of floats, correctly ordered
-                coordinates = [(float(lat), float(lon)) for lon, lat in (pair.split(",") for pair in coordinate_pairs)]
-                
-                # Simplify coordinates
-                simplified_coordinates = simplify_coordinates(coordinates, tolerance)
+def parse_atz_sectors(content, tolerance=0.001, vertex_budget=None, max_error_nm=None, arc_error_nm=None, report=None, lod=None):
+    """Parses ATZ sectors from GML, simplifies coordinates, and groups the formatted lines by FIR.
 
-                # Format the simplified coordinates
-                sector_data = [
-                    f"T;ATZ {name_text};{lat};{lon};"
-                    for lat, lon in simplified_coordinates
-                ]
+    See geoaisweb.sectors.parse_sectors for the adaptive simplification,
+    report and lod arguments.
+    """
+    return parse_sectors(LAYER, content, tolerance, vertex_budget, max_error_nm, arc_error_nm, report, lod)
 
-                fir_sectors[related_fir_text].extend(sector_data)
+def sector_lines(fir_sectors):
+    """Yields the ATZ lines with a //FIR header before each FIR group."""
+    return layer_sector_lines(LAYER, fir_sectors)
 
-        # Get the user's desktop path
-        desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-        output_file_path = os.path.join(desktop_path, output_file_name)
+def extract_atz_sectors_from_url(url, output_file_name, tolerance=0.001, vertex_budget=None, max_error_nm=None, arc_error_nm=None,
+                                 lod_budgets=None):
+    """Extracts ATZ sectors from a GML URL, simplifies coordinates, and saves them to a text file on the desktop."""
+    # Get the user's desktop path
+    desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+    output_file_path = os.path.join(desktop_path, output_file_name)
 
+    def check_desktop():
         # Check if the desktop path is valid and writable
         if not os.access(desktop_path, os.W_OK):
             raise PermissionError(f"The desktop directory is not writable: {desktop_path}")
 
-        # Sort sectors within each FIR and write to file
-        with open(output_file_path, "w", encoding="utf-8") as output_file:
-            for fir, sector_list in fir_sectors.items():
-                output_file.write(f"//FIR {fir}\n")
-                output_file.writelines("\n".join(sector_list) + "\n")
-
-        print(f"ATZ sectors extracted, simplified, and grouped by FIR, saved to {output_file_path}")
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    extract_to_file(LAYER, url, output_file_path, tolerance, vertex_budget, max_error_nm, arc_error_nm, lod_budgets,
+                    check_desktop)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract ATZ sectors from GEOAISWEB to Desktop/atz.txt")
+    parser.add_argument("--output", default="atz.txt", help="Output file name (saved on the Desktop)")
+    parser.add_argument("--tolerance", type=float, default=0.001, help="Simplification tolerance in degrees")
+    parser.add_argument("--vertex-budget", type=int, help="Total vertices for all sectors (adaptive, replaces --tolerance)")
+    parser.add_argument("--max-error-nm", type=float, help="Maximum deviation in NM per sector (adaptive, replaces --tolerance)")
+    parser.add_argument("--arc-error-nm", type=float, help="Rebuild circular arcs with minimal segments within this error in NM")
+    parser.add_argument("--lod", help="Comma separated vertex budgets: also write <output>.lod<budget> at each level of detail")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    url = feature_url(LAYER.type_name, args.base_url)
+    from geoaisweb.simplify import parse_budgets
+    extract_atz_sectors_from_url(url, args.output, args.tolerance, args.vertex_budget, args.max_error_nm, args.arc_error_nm,
+                                 parse_budgets(args.lod))
 
 if __name__ == "__main__":
-    url = "https://geoaisweb.decea.mil.br/geoserver/ICA/ows?service=WFS&version=1.0.0&request=GetFeature&typeName=ICA%3AATZ"
-    extract_atz_sectors_from_url(url, "atz.txt")
+    main()
@@ -1,18 +1,22 @@
-import requests
 import xml.etree.ElementTree as ET
+import argparse
 import os
+import sys
 import logging
-from dataclasses import dataclass
 from typing import Optional
+from geoaisweb.wfs import feature_url
+from geoaisweb.airway_levels import airway_classes, is_upper
+from geoaisweb.airways import AirwaySegment, fix_sequences
+from geoaisweb.canonical import canonical_lines
+from geoaisweb.layers import extractor
+from geoaisweb.snap import DEFAULT_SNAP_NM
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# URLs of the XML data
-airway_url = "https://geoaisweb.decea.mil.br/geoserver/ICA/ows?service=WFS&version=1.0.0&request=GetFeature&typeName=ICA%3Aairway"
-waypoint_url = "https://geoaisweb.decea.mil.br/geoserver/ICA/ows?service=WFS&version=1.0.0&request=GetFeature&typeName=ICA%3Awaypoint"
-navaids_url = "https://geoaisweb.decea.mil.br/geoserver/ICA/ows?service=WFS&version=1.0.0&request=GetFeature&typeName=ICA%3Anavaids"
+# Compiled once: qualified tag names and direct child lookups (geoaisweb.layers)
+WAYPOINT = extractor("ICA:waypoint", "ident", geometry=True)
+NAVAID = extractor("ICA:navaids", "designator", geometry=True)
+AIRWAY = extractor("ICA:airway", "txtdesig", "seq", geometry=True)
 
 # Function to fetch and parse XML data
 def fetch_and_parse_xml(url: str) -> Optional[ET.Element]:
@@ -25,116 +29,132 @@ def fetch_and_parse_xml(url: str) -> Optional[ET.Element]:
     Returns:
         ElementTree.Element: Parsed XML root element or None if an error occurred.
     """
+    from geoaisweb.client import HttpError, get_client
+
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return ET.fromstring(response.content)
-    except (requests.exceptions.RequestException, ET.ParseError) as e:
+        return ET.fromstring(get_client().get(url).content)
+    except (HttpError, ET.ParseError) as e:
         logger.error(f"Error fetching or parsing data from {url}: {e}")
         return None
 
-# Fetch the XML data
-airway_root = fetch_and_parse_xml(airway_url)
-waypoint_root = fetch_and_parse_xml(waypoint_url)
-navaids_root = fetch_and_parse_xml(navaids_url)
-
-# Check if data was successfully fetched
-if airway_root is None or waypoint_root is None or navaids_root is None:
-    logger.error("Failed to fetch and parse all required XML data. Exiting.")
-    exit(1)
-
-# Define namespaces manually
-namespaces = {
-    'wfs': "http://www.opengis.net/wfs",
-    'gml': "http://www.opengis.net/gml",
-    'ICA': "http://10.32.62.212/geoserver/ICA"
-}
-
-# Step 1: Fetch and store waypoint and navaids data
-fixes = {}
-
-# Load waypoints
-for feature in waypoint_root.findall('gml:featureMember', namespaces):
-    waypoint = feature.find('ICA:waypoint', namespaces)
-    if waypoint is not None:
-        ident = waypoint.find('ICA:ident', namespaces).text
-        geom = waypoint.find('ICA:geom/gml:MultiPoint/gml:pointMember/gml:Point/gml:coordinates', namespaces)
-        if geom is not None:
-            coords = tuple(map(lambda x: round(float(x), 6), geom.text.strip().split(',')))
+def load_fixes(waypoint_root: ET.Element, navaids_root: ET.Element) -> dict:
+    """
+    Map rounded (lon, lat) coordinates to waypoint idents and navaid designators.
+
+    Args:
+        waypoint_root (ET.Element): Parsed ICA:waypoint layer.
+        navaids_root (ET.Element): Parsed ICA:navaids layer.
+
+    Returns:
+        dict: (lon, lat) tuple -> fix ident.
+    """
+    fixes = {}
+
+    # Waypoints, then navaids (a navaid wins over a waypoint at the same position)
+    for root, layer_extractor in ((waypoint_root, WAYPOINT), (navaids_root, NAVAID)):
+        for ident, geom in layer_extractor.records(root):
+            coords = tuple(map(lambda x: round(float(x), 6), geom.strip().split(',')))
             fixes[coords] = ident
 
-# Load navaids
-for feature in navaids_root.findall('gml:featureMember', namespaces):
-    navaid = feature.find('ICA:navaids', namespaces)
-    if navaid is not None:
-        designator = navaid.find('ICA:designator', namespaces).text
-        geom = navaid.find('ICA:geom/gml:MultiPoint/gml:pointMember/gml:Point/gml:coordinates', namespaces)
-        if geom is not None:
-            coords = tuple(map(lambda x: round(float(x), 6), geom.text.strip().split(',')))
-            fixes[coords] = designator
-
-# Define a data class for airway segments
-@dataclass
-class AirwaySegment:
-    seq: float
-    segments: list
-
-# Step 2: Extract airway segments categorized by txtdesig and seq
-airways = {}
-
-for feature in airway_root.findall('gml:featureMember', namespaces):
-    airway = feature.find('ICA:airway', namespaces)
-    if airway is not None:
-        txtdesig_element = airway.find('ICA:txtdesig', namespaces)
-        seq_element = airway.find('ICA:seq', namespaces)
-        
-        if txtdesig_element is not None and seq_element is not None:
-            txtdesig = txtdesig_element.text
-            seq = float(seq_element.text)
-            
-            geom_element = airway.find('ICA:geom/gml:LineString/gml:coordinates', namespaces)
-            if geom_element is not None:
-                segments = [tuple(map(lambda x: round(float(x), 6), segment.split(','))) for segment in geom_element.text.strip().split(' ')]
-                
-                if txtdesig not in airways:
-                    airways[txtdesig] = []
-                
-                airways[txtdesig].append(AirwaySegment(seq=seq, segments=segments))
-            else:
-                logger.warning(f"'coordinates' element not found for airway ID {airway.attrib.get('fid')}")
-
-# Sort the segments by sequence and prepare the output
-upper_airways_output = []
-lower_airways_output = []
-
-for txtdesig, segments in airways.items():
-    segments.sort(key=lambda x: x.seq)  # Sort by sequence
-    
-    for segment in segments:
-        for lon, lat in segment.segments:
-            # Replace coordinates with waypoint or navaid ident/designator if it exists
-            fix_ident = fixes.get((lon, lat), None)
-            if fix_ident:
-                track_line = f"T;{txtdesig};{fix_ident};{fix_ident};"
-                if txtdesig.startswith('U'):
-                    upper_airways_output.append(track_line)
-                else:
-                    lower_airways_output.append(track_line)
-
-# Remove duplicates
-upper_airways_output = list(dict.fromkeys(upper_airways_output))
-lower_airways_output = list(dict.fromkeys(lower_airways_output))
-
-# Set output path to always save on Desktop
-output_path = os.path.join(os.path.expanduser("~"), "Desktop", "awy.txt")
-
-# Write the output to a file
-with open(output_path, 'w') as file:
-    # Write upper airways first
-    for line in upper_airways_output:
-        file.write(line + "\n")
-    # Write lower airways after upper airways
-    for line in lower_airways_output:
-        file.write(line + "\n")
-
-logger.info(f"Output has been saved to {output_path}")
+    return fixes
+
+
+def extract_airways(airway_root: ET.Element) -> dict:
+    """
+    Extract airway segments categorized by txtdesig and seq.
+
+    Args:
+        airway_root (ET.Element): Parsed ICA:airway layer.
+
+    Returns:
+        dict: txtdesig -> list of AirwaySegment.
+    """
+    airways = {}
+    # (txtdesig, seq, coordinates text); segments missing one of them are counted and logged
+    found = AIRWAY.records(airway_root)
+
+    # All linestrings in one bulk conversion; segments are rounded (lon, lat) like the fix keys
+    from geoaisweb.gml import coordinate_lists
+    for (txtdesig, seq, _), coordinates in zip(found, coordinate_lists([text for _, _, text in found])):
+        segments = [(round(lon, 6), round(lat, 6)) for lat, lon in coordinates]
+
+        if txtdesig not in airways:
+            airways[txtdesig] = []
+
+        airways[txtdesig].append(AirwaySegment(seq=seq, segments=segments))
+
+    return airways
+
+def build_airway_lines(airways: dict, fixes: dict, snap_nm: float = DEFAULT_SNAP_NM, classes: Optional[dict] = None) -> tuple:
+    """
+    Join the segments of each airway into continuous polylines and prepare the output lines.
+
+    Args:
+        airways (dict): txtdesig -> list of AirwaySegment.
+        fixes (dict): (lon, lat) -> fix ident.
+        snap_nm (float): Vertices without an exact fix match snap to the nearest fix within this distance (0 disables).
+        classes (dict): txtdesig -> True for upper, from geoaisweb.airway_levels (default: the 'U' prefix).
+
+    Returns:
+        tuple: (upper airway lines, lower airway lines), one T line per polyline vertex.
+    """
+    upper_airways_output = []
+    lower_airways_output = []
+
+    # Unmatched and ambiguous vertices are logged
+    sequences, report = fix_sequences(airways, fixes, snap_nm)
+    report.log()
+
+    for txtdesig, polylines in sequences.items():
+        output = upper_airways_output if is_upper(txtdesig, classes) else lower_airways_output
+        # Waypoint or navaid ident/designator of each vertex
+        lines = [f"T;{txtdesig};{fix_ident};{fix_ident};" for idents in polylines for fix_ident in idents]
+        # A polyline starting on the fix where the previous one ended does not repeat it
+        output.extend(line for i, line in enumerate(lines) if not i or line != lines[i - 1])
+
+    return upper_airways_output, lower_airways_output
+
+def write_output(output_path: str, upper_airways_output: list, lower_airways_output: list) -> None:
+    """Write upper airways first, then lower airways, each sorted by designator (see geoaisweb.canonical)."""
+    with open(output_path, 'w', newline="\n") as file:
+        for line in canonical_lines(upper_airways_output, "HIGH AIRWAY"):
+            file.write(line + "\n")
+        for line in canonical_lines(lower_airways_output, "LOW AIRWAY"):
+            file.write(line + "\n")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract airways from GEOAISWEB to awy.txt")
+    # Set output path to always save on Desktop
+    parser.add_argument("--output", default=os.path.join(os.path.expanduser("~"), "Desktop", "awy.txt"),
+                        help="Output file (default: Desktop/awy.txt)")
+    parser.add_argument("--snap-nm", type=float, default=DEFAULT_SNAP_NM,
+                        help="Snap airway vertices to the nearest fix within this many NM (0: exact match only)")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    # Configure logging
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+
+    # Fetch the XML data
+    airway_root = fetch_and_parse_xml(feature_url("ICA:airway", args.base_url))
+    waypoint_root = fetch_and_parse_xml(feature_url("ICA:waypoint", args.base_url))
+    navaids_root = fetch_and_parse_xml(feature_url("ICA:navaids", args.base_url))
+
+    # Check if data was successfully fetched
+    if airway_root is None or waypoint_root is None or navaids_root is None:
+        logger.error("Failed to fetch and parse all required XML data. Exiting.")
+        sys.exit(1)
+
+    fixes = load_fixes(waypoint_root, navaids_root)
+    airways = extract_airways(airway_root)
+    # Upper / lower from the vertical limits of the segments
+    classes = airway_classes(airway_root)
+    upper_airways_output, lower_airways_output = build_airway_lines(airways, fixes, args.snap_nm, classes)
+
+    write_output(args.output, upper_airways_output, lower_airways_output)
+    logger.info(f"Output has been saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
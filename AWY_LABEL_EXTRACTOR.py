@@ -1,8 +1,11 @@
-import requests
 import xml.etree.ElementTree as ET
+import argparse
 import math
 import logging
 import os
+from geoaisweb.airway_levels import airway_classes, is_upper
+from geoaisweb.wfs import feature_url
+from geoaisweb.layers import extractor
 
 
 def convert_to_dms(decimal_degree):
@@ -10,9 +13,11 @@ def convert_to_dms(decimal_degree):
     if not -180.0 <= decimal_degree <= 180.0:
         raise ValueError("Decimal degree value must be between -180 and 180.")
     
-    degrees = int(decimal_degree)
-    minutes = int((abs(decimal_degree) - abs(degrees)) * 60)
-    seconds = (abs(decimal_degree) - abs(degrees) - minutes / 60) * 3600
+    # Rounded to the printed thousandths of a second first, so 59.9999" carries into the minutes
+    total = round(abs(decimal_degree) * 3600, 3)
+    degrees = int(total // 3600) * (-1 if decimal_degree < 0 else 1)
+    minutes = int(total % 3600 // 60)
+    seconds = total % 60
     return degrees, minutes, seconds
 
 
@@ -41,105 +46,121 @@ def haversine_distance(coord1, coord2):
     return distance_nm
 
 
-def process_airways(airway_data, upper_output_file, other_output_file, min_label_distance_nm=10.0):
-    """Processes the airways and generates labels for segments longer than 10 NM, ensuring labels are not too close together."""
-    try:
-        with open(upper_output_file, 'w') as upper_file, open(other_output_file, 'w') as other_file:
-            last_label_position = None
-            
-            for txtdesig, airwayseg, routedist, coord_tuples in airway_data:
-                if routedist >= 10.0:
-                    # Calculate the midpoint for placing the label
-                    start = coord_tuples[0]
-                    end = coord_tuples[-1]
-                    mid_lat = (start[0] + end[0]) / 2
-                    mid_lon = (start[1] + end[1]) / 2
-                    label_position = (mid_lat, mid_lon)
-                    
-                    # Check the distance to the last label position to avoid overlap
-                    if last_label_position is None or haversine_distance(last_label_position, label_position) >= min_label_distance_nm:
-                        label = format_label(txtdesig, mid_lat, mid_lon)
-                        last_label_position = label_position
-                        
-                        if txtdesig.startswith('U'):
-                            upper_file.write(label + '\n')
-                        else:
-                            other_file.write(label + '\n')
-    except IOError as e:
-        logging.error(f"Error writing to output files: {e}")
+def airway_labels(airway_data, min_label_distance_nm=10.0, every_nm=None, classes=None):
+    """Yields (is_upper, label) for segments longer than 10 NM, ensuring labels are not too close together.
+
+    Labels sit at the along-track midpoint of each segment's geometry, or
+    every every_nm NM along long segments (see geoaisweb.labels). classes
+    (txtdesig -> True for upper, from geoaisweb.airway_levels) decides upper
+    or lower; the 'U' prefix without it.
+    """
+    import numpy as np
+    from geoaisweb.labels import AlongTrackIndex
 
+    routedist = np.array([record[2] for record in airway_data], dtype=np.float64)
+    records = [airway_data[i] for i in np.flatnonzero(routedist >= 10.0).tolist()]
+    index = AlongTrackIndex([coord_tuples for _, _, _, coord_tuples in records])
+    owners, lats, lons = index.label_positions(every_nm)
 
-# Set up logging
-log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-logging.basicConfig(level=getattr(logging, log_level, logging.INFO))
+    last_label_position = None
+    for owner, label_lat, label_lon in zip(owners.tolist(), lats.tolist(), lons.tolist()):
+        txtdesig = records[owner][0]
+        label_position = (label_lat, label_lon)
 
-# URL to the WFS service
-url = "https://geoaisweb.decea.mil.br/geoserver/ICA/ows?service=WFS&version=1.0.0&request=GetFeature&typeName=ICA%3Aairway"
+        # Check the distance to the last label position to avoid overlap
+        if last_label_position is None or haversine_distance(last_label_position, label_position) >= min_label_distance_nm:
+            last_label_position = label_position
+            yield is_upper(txtdesig, classes), format_label(txtdesig, label_lat, label_lon)
 
-# Fetch the data from the WFS service
-try:
-    response = requests.get(url)
-    response.raise_for_status()  # Ensure we got a successful response
-except requests.exceptions.HTTPError as http_err:
-    logging.error(f"HTTP error occurred: {http_err}. Status code: {response.status_code}. Response content: {response.text}")
-    raise
-except requests.exceptions.RequestException as err:
-    logging.error(f"Error occurred during the request: {err}")
-    raise
 
-# Parse the XML response
-root = ET.fromstring(response.content)
+def process_airways(airway_data, upper_output_file, other_output_file, min_label_distance_nm=10.0, every_nm=None,
+                    classes=None):
+    """Processes the airways and writes the upper and lower labels to separate files."""
+    try:
+        with open(upper_output_file, 'w') as upper_file, open(other_output_file, 'w') as other_file:
+            for upper, label in airway_labels(airway_data, min_label_distance_nm, every_nm, classes):
+                if upper:
+                    upper_file.write(label + '\n')
+                else:
+                    other_file.write(label + '\n')
+    except IOError as e:
+        logging.error(f"Error writing to output files: {e}")
+
 
-# Namespace dictionary to handle the ICA namespace
-ns = {'ICA': 'http://10.32.62.212/geoserver/ICA', 'gml': 'http://www.opengis.net/gml'}
+# Compiled once: qualified tag names and direct child lookups (geoaisweb.layers)
+AIRWAY = extractor("ICA:airway", "txtdesig", "airwayseg_", "routedis", geometry=True)
 
-# Find all airway elements
-airways = root.findall('.//ICA:airway', ns)
 
-# Extract relevant information and sort airways
-airway_data = []
+def fetch_airways(url):
+    """Fetches the airway layer from the WFS service and returns the raw XML."""
+    from geoaisweb.client import HttpError, HttpStatusError, get_client
 
-for airway in airways:
     try:
-        txtdesig = airway.find('ICA:txtdesig', ns).text
-        airwayseg = float(airway.find('ICA:airwayseg_', ns).text)
-        routedist = float(airway.find('ICA:routedis', ns).text)
-        
-        coordinates_element = airway.find('.//gml:coordinates', ns)
-        if coordinates_element is None:
-            logging.warning(f"Coordinates not found for airway {txtdesig}. Skipping this entry.")
-            continue
-
-        coordinates = coordinates_element.text.strip()
-        coord_pairs = coordinates.split(' ')
-        coord_tuples = []
-        for coord in coord_pairs:
-            try:
-                lon, lat = coord.split(',')
-                coord_tuples.append((float(lat), float(lon)))
-            except ValueError as e:
-                logging.error(f"Error parsing coordinates for airway {txtdesig}: {e}")
-                continue
-
-        airway_data.append((txtdesig, airwayseg, routedist, coord_tuples))
-
-    except AttributeError as e:
-        logging.error(f"Error extracting airway details: {e}")
-        continue
-    except ValueError as e:
-        logging.error(f"Error converting numerical value: {e}")
-        continue
-
-# Sort by txtdesig and airwayseg_
-# Sorting the airway data first by txtdesig (airway designation) and then by airwayseg (segment number) to ensure the airways are processed in a logical and organized manner.
-airway_data.sort(key=lambda x: (x[0], x[1]))
-
-# Get the user's desktop directory
-desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-
-# Define output files on the desktop
-upper_output_file = os.path.join(desktop_path, "upper_awy_label.txt")
-other_output_file = os.path.join(desktop_path, "lower_awy_label.txt")
-
-# Process the sorted airways and output to separate files
-process_airways(airway_data, upper_output_file, other_output_file)
+        response = get_client().get(url)  # Raises unless we got a successful response
+    except HttpStatusError as http_err:
+        logging.error(f"HTTP error occurred: {http_err}. Status code: {http_err.status_code}. Response content: {http_err.response.text}")
+        raise
+    except HttpError as err:
+        logging.error(f"Error occurred during the request: {err}")
+        raise
+    return response.content
+
+
+def parse_airways(xml_content):
+    """Parses the airway XML into (txtdesig, airwayseg, routedist, coord_tuples) sorted by designator and segment."""
+    return airway_data_from_root(ET.fromstring(xml_content))
+
+
+def airway_data_from_root(root):
+    """Same as parse_airways, for an already parsed airway layer."""
+    # Extract relevant information and sort airways; segments missing an attribute (or with a
+    # non-numeric airwayseg_ / routedis) are counted per attribute and logged
+    airway_data = []
+    texts = []
+
+    for txtdesig, airwayseg, routedist, coordinates in AIRWAY.records(root):
+        airway_data.append((txtdesig, airwayseg, routedist))
+        texts.append(coordinates)
+
+    # [lat, lon] pairs of every airway in one bulk conversion; malformed pairs are logged and dropped
+    from geoaisweb.gml import coordinate_lists
+    airway_data = [record + (coord_tuples,) for record, coord_tuples in zip(airway_data, coordinate_lists(texts, strict=False))]
+
+    # Sort by txtdesig and airwayseg_
+    # Sorting the airway data first by txtdesig (airway designation) and then by airwayseg (segment number) to ensure the airways are processed in a logical and organized manner.
+    airway_data.sort(key=lambda x: (x[0], x[1]))
+    return airway_data
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract upper and lower airway labels from GEOAISWEB")
+    # Get the user's desktop directory
+    parser.add_argument("--output-dir", default=os.path.join(os.path.expanduser("~"), "Desktop"),
+                        help="Output directory (default: Desktop)")
+    parser.add_argument("--every-nm", type=float, help="Repeat labels every N NM along long segments (default: midpoint only)")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    # Set up logging
+    log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
+    logging.basicConfig(level=getattr(logging, log_level, logging.INFO))
+    args = parse_args(argv)
+
+    # Fetch the data from the WFS service
+    root = ET.fromstring(fetch_airways(feature_url("ICA:airway", args.base_url)))
+    airway_data = airway_data_from_root(root)
+    # Upper / lower from the vertical limits of the segments
+    classes = airway_classes(root)
+
+    # Define output files
+    upper_output_file = os.path.join(args.output_dir, "upper_awy_label.txt")
+    other_output_file = os.path.join(args.output_dir, "lower_awy_label.txt")
+
+    # Process the sorted airways and output to separate files
+    process_airways(airway_data, upper_output_file, other_output_file, every_nm=args.every_nm, classes=classes)
+
+
+if __name__ == "__main__":
+    main()
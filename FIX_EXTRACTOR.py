@@ -1,14 +1,16 @@
 import xml.etree.ElementTree as ET
 from collections import defaultdict
-import requests
+import argparse
 import sys
 import re
 import os
+from geoaisweb.wfs import feature_url
+from geoaisweb.layers import extractor
 
 def fetch_xml(url):
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.text
+    from geoaisweb.client import get_client
+
+    return get_client().get(url).text
 
 def clean_xml(xml_string):
     xml_string = xml_string.replace('Â°', '°')
@@ -29,47 +31,38 @@ def parse_xml_safely(xml_string, parser_func, *args):
         print(cleaned_xml[-1000:])
         raise
 
-def safe_get_text(element):
-    return element.text if element is not None else None
+# Compiled once (geoaisweb.layers); features without ident, name or coordinates are counted and logged
+WAYPOINT = extractor("ICA:waypoint_aisweb", "ident", geometry=True)
+AIRWAY = extractor("ICA:airway", "name", geometry=True)
 
 def parse_waypoints(waypoint_xml):
     waypoints = {}
     root = ET.fromstring(waypoint_xml)
-    ns = {'ICA': 'http://10.32.62.212/geoserver/ICA', 'gml': 'http://www.opengis.net/gml'}
     
-    for waypoint in root.findall('.//ICA:waypoint_aisweb', ns):
-        ident = safe_get_text(waypoint.find('ICA:ident', ns))
-        coordinates = waypoint.find('.//gml:coordinates', ns)
-        
-        if ident and coordinates is not None and coordinates.text:
-            coord_parts = coordinates.text.split(',')
-            if len(coord_parts) == 2:
-                lon, lat = map(float, coord_parts)
-                waypoints[ident] = {
-                    'coordinates': (lat, lon),
-                    'used_in_airways': set()
-                }
+    for ident, coordinates in WAYPOINT.records(root):
+        coord_parts = coordinates.split(',')
+        if len(coord_parts) == 2:
+            lon, lat = map(float, coord_parts)
+            waypoints[ident] = {
+                'coordinates': (lat, lon),
+                'used_in_airways': set()
+            }
     
     return waypoints
 
 def parse_airways(airway_xml, waypoints):
     airways = defaultdict(list)
     root = ET.fromstring(airway_xml)
-    ns = {'ICA': 'http://10.32.62.212/geoserver/ICA', 'gml': 'http://www.opengis.net/gml'}
     
-    for airway in root.findall('.//ICA:airway', ns):
-        airway_name = safe_get_text(airway.find('ICA:name', ns))
-        coordinates = airway.find('.//gml:coordinates', ns)
+    for airway_name, coordinates in AIRWAY.records(root):
+        coord_pairs = [tuple(map(float, pair.split(','))) for pair in coordinates.split()]
         
-        if airway_name and coordinates is not None and coordinates.text:
-            coord_pairs = [tuple(map(float, pair.split(','))) for pair in coordinates.text.split()]
-            
-            for lon, lat in coord_pairs:
-                for ident, waypoint in waypoints.items():
-                    if waypoint['coordinates'] == (lat, lon):
-                        airways[airway_name].append(ident)
-                        waypoint['used_in_airways'].add(airway_name)
-                        break
+        for lon, lat in coord_pairs:
+            for ident, waypoint in waypoints.items():
+                if waypoint['coordinates'] == (lat, lon):
+                    airways[airway_name].append(ident)
+                    waypoint['used_in_airways'].add(airway_name)
+                    break
     
     return airways
 
@@ -90,12 +83,21 @@ def format_coordinates(lat, lon):
     
     return f"{lat_dir}{lat_deg:03d}.{lat_min:02d}.{lat_sec:06.3f}", f"{lon_dir}{lon_deg:03d}.{lon_min:02d}.{lon_sec:06.3f}"
 
-def main():
-    waypoint_url = "https://geoaisweb.decea.mil.br/geoserver/ICA/ows?service=WFS&version=1.0.0&request=GetFeature&typeName=ICA%3Awaypoint_aisweb"
-    airway_url = "https://geoaisweb.decea.mil.br/geoserver/ICA/ows?service=WFS&version=1.0.0&request=GetFeature&typeName=ICA%3Aairway"
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract fixes from GEOAISWEB to fixes.txt")
+    parser.add_argument("--output", default=os.path.join(os.path.expanduser("~"), "Desktop", "fixes.txt"),
+                        help="Output file (default: Desktop/fixes.txt)")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    from geoaisweb.client import HttpError
+
+    waypoint_url = feature_url("ICA:waypoint_aisweb", args.base_url)
+    airway_url = feature_url("ICA:airway", args.base_url)
     
-    desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-    output_file = os.path.join(desktop_path, "fixes.txt")
+    output_file = args.output
     
     try:
         print("Fetching waypoint data...")
@@ -133,7 +135,7 @@ def main():
         print(f"Fixes used in airways: {len(fixes_in_airways)}")
         print(f"Fixes not used in airways: {len(fixes_not_in_airways)}")
         
-    except requests.exceptions.RequestException as e:
+    except HttpError as e:
         print(f"An error occurred while fetching data: {e}")
     except ET.ParseError as e:
         print(f"An error occurred while parsing XML: {e}")
@@ -141,6 +143,7 @@ def main():
         print(f"An unexpected error occurred: {e}")
         print("Python version:", sys.version)
         print("ElementTree version:", ET.VERSION)
+        import requests
         print("Requests version:", requests.__version__)
 
 if __name__ == "__main__":
@@ -1,22 +1,23 @@
 import xml.etree.ElementTree as ET
 from collections import defaultdict
-import requests
 import sys
 import re
 import os
 import logging
 import argparse
+from geoaisweb.wfs import feature_url, get_base_url
+from geoaisweb.canonical import canonical_lines
+from geoaisweb.layers import extractor
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class Config:
-    BASE_URL = "https://geoaisweb.decea.mil.br/geoserver/ICA/ows"
+    BASE_URL = get_base_url()
     WAYPOINT_TYPE = "ICA:waypoint_aisweb"
     AIRWAY_TYPE = "ICA:airway"
     VOR_TYPE = "ICA:vor"
     NDB_TYPE = "ICA:ndb"
+    FIR_TYPE = "ICA:SETOR_FIR"
     NAMESPACE = {
         'ICA': 'http://10.32.62.212/geoserver/ICA',
         'gml': 'http://www.opengis.net/gml'
@@ -24,13 +25,13 @@ class Config:
     OUTPUT_FILE = "navaids.txt"
 
 def fetch_xml(url, timeout=30):
+    from geoaisweb.client import HttpError, HttpTimeout, get_client
+
     try:
-        response = requests.get(url, timeout=timeout)
-        response.raise_for_status()
-        return response.text
-    except requests.Timeout:
+        return get_client().get(url, timeout=timeout).text
+    except HttpTimeout:
         raise Exception(f"Request timed out after {timeout} seconds: {url}")
-    except requests.RequestException as e:
+    except HttpError as e:
         raise Exception(f"Failed to fetch URL {url}: {str(e)}")
 
 def clean_xml(xml_string):
@@ -58,9 +59,6 @@ def parse_xml_safely(xml_string, parser_func, *args):
         logger.debug(cleaned_xml[-1000:])
         raise
 
-def safe_get_text(element):
-    return element.text.strip() if element is not None and element.text else None
-
 def parse_coordinates(coord_string):
     try:
         if not coord_string:
@@ -73,40 +71,73 @@ def parse_coordinates(coord_string):
     except (ValueError, AttributeError):
         return None
 
-def parse_waypoints(waypoint_xml):
+# Compiled once: qualified tags and direct child lookups, missing attributes counted (geoaisweb.layers)
+WAYPOINT = extractor(Config.WAYPOINT_TYPE, "ident", geometry=True)
+AIRWAY = extractor(Config.AIRWAY_TYPE, "name", geometry=True)
+VOR = extractor(Config.VOR_TYPE, "ident", "frequency", "latitude_gms", "longitude_gms")
+NDB = extractor(Config.NDB_TYPE, "codeid", "valfreq", "latitude_gms", "longitude_gms")
+
+def waypoint_record(waypoint):
+    """(ident, (lat, lon)) for one ICA:waypoint_aisweb element, or None."""
+    record = WAYPOINT(waypoint)
+    if record is None:
+        return None
+    ident, coordinates = record
+    coords = parse_coordinates(coordinates.strip())
+    return (ident, coords) if coords else None
+
+def waypoints_from_records(records):
     waypoints = {}
-    root = ET.fromstring(waypoint_xml)
-    
-    for waypoint in root.findall('.//ICA:waypoint_aisweb', Config.NAMESPACE):
-        ident = safe_get_text(waypoint.find('ICA:ident', Config.NAMESPACE))
-        coords_elem = waypoint.find('.//gml:coordinates', Config.NAMESPACE)
-        coords = parse_coordinates(safe_get_text(coords_elem))
-        
-        if ident and coords:
+    for record in records:
+        if record:
+            ident, coords = record
             waypoints[ident] = {
                 'coordinates': coords,
                 'used_in_airways': set()
             }
     return waypoints
 
+def parse_waypoints(waypoint_xml):
+    root = ET.fromstring(waypoint_xml)
+    records = [waypoint_record(waypoint) for waypoint in root.iter(WAYPOINT.tag)]
+    WAYPOINT.log_stats()
+    return waypoints_from_records(records)
+
 def parse_airways(airway_xml, waypoints):
-    airways = defaultdict(list)
     root = ET.fromstring(airway_xml)
-    
-    for airway in root.findall('.//ICA:airway', Config.NAMESPACE):
-        airway_name = safe_get_text(airway.find('ICA:name', Config.NAMESPACE))
-        coordinates = airway.find('.//gml:coordinates', Config.NAMESPACE)
-        
-        if airway_name and coordinates is not None and coordinates.text:
-            coord_pairs = [parse_coordinates(pair) for pair in coordinates.text.split()]
-            coord_pairs = [pair for pair in coord_pairs if pair is not None]
-            
+    return match_airway_fixes(root, waypoints)
+
+def airway_record(airway):
+    """(name, [(lat, lon), ...]) for one ICA:airway element, or None."""
+    record = AIRWAY(airway)
+    if record is None:
+        return None
+    airway_name, coordinates = record
+    coord_pairs = [parse_coordinates(pair) for pair in coordinates.split()]
+    return airway_name, [pair for pair in coord_pairs if pair is not None]
+
+def match_airway_fixes(root, waypoints):
+    """Maps each airway name to the waypoints on it, flagging used_in_airways."""
+    records = [airway_record(airway) for airway in root.iter(AIRWAY.tag)]
+    AIRWAY.log_stats()
+    return match_airway_records(records, waypoints)
+
+def match_airway_records(records, waypoints):
+    """Same as match_airway_fixes, for airway_record() results."""
+    airways = defaultdict(list)
+    # First waypoint wins for duplicated coordinates, as in a linear scan
+    by_coordinates = {}
+    for ident, waypoint in waypoints.items():
+        by_coordinates.setdefault(waypoint['coordinates'], ident)
+
+    for record in records:
+        if record:
+            airway_name, coord_pairs = record
             for lat, lon in coord_pairs:
-                for ident, waypoint in waypoints.items():
-                    if waypoint['coordinates'] == (lat, lon):
-                        airways[airway_name].append(ident)
-                        waypoint['used_in_airways'].add(airway_name)
-                        break
+                ident = by_coordinates.get((lat, lon))
+                if ident is not None:
+                    airways[airway_name].append(ident)
+                    waypoints[ident]['used_in_airways'].add(airway_name)
     return airways
 
 def gms_to_decimal(gms_str):
@@ -122,48 +153,55 @@ def gms_to_decimal(gms_str):
         logger.warning(f"Failed to parse GMS string '{gms_str}': {str(e)}")
         return None
 
+def gms_to_degrees(gms_str):
+    """Converts a GMS string such as 23°26'08"S to signed decimal degrees."""
+    try:
+        degrees, minutes_seconds = gms_str.split("°")
+        minutes, seconds_hemisphere = minutes_seconds.split("'")
+        seconds = seconds_hemisphere[:-1].replace('"', '').strip()
+        hemisphere = seconds_hemisphere.strip()[-1]
+        value = float(degrees) + float(minutes) / 60 + float(seconds or 0) / 3600
+        return -value if hemisphere in "SW" else value
+    except (ValueError, AttributeError, IndexError) as e:
+        logger.warning(f"Failed to parse GMS string '{gms_str}': {str(e)}")
+        return None
+
+def navaid_record(navaid, navaid_extractor):
+    """The VOR/NDB dict for one navaid element, or None."""
+    record = navaid_extractor(navaid)
+    if record is None:
+        return None
+    ident, frequency, lat_gms, lon_gms = record
+
+    lat_formatted = gms_to_decimal(lat_gms)
+    lon_formatted = gms_to_decimal(lon_gms)
+    if lat_formatted and lon_formatted:
+        return {
+            'ident': ident,
+            'frequency': frequency,
+            'latitude': lat_formatted,
+            'longitude': lon_formatted,
+            'lat': gms_to_degrees(lat_gms),
+            'lon': gms_to_degrees(lon_gms)
+        }
+    return None
+
+def vor_record(vor):
+    return navaid_record(vor, VOR)
+
+def ndb_record(ndb):
+    return navaid_record(ndb, NDB)
+
 def parse_vor(vor_xml):
-    vors = []
     root = ET.fromstring(vor_xml)
-    
-    for vor in root.findall('.//ICA:vor', Config.NAMESPACE):
-        ident = safe_get_text(vor.find('ICA:ident', Config.NAMESPACE))
-        frequency = safe_get_text(vor.find('ICA:frequency', Config.NAMESPACE))
-        lat_gms = safe_get_text(vor.find('ICA:latitude_gms', Config.NAMESPACE))
-        lon_gms = safe_get_text(vor.find('ICA:longitude_gms', Config.NAMESPACE))
-        
-        if all([ident, frequency, lat_gms, lon_gms]):
-            lat_formatted = gms_to_decimal(lat_gms)
-            lon_formatted = gms_to_decimal(lon_gms)
-            if lat_formatted and lon_formatted:
-                vors.append({
-                    'ident': ident,
-                    'frequency': frequency,
-                    'latitude': lat_formatted,
-                    'longitude': lon_formatted
-                })
+    vors = [vor for vor in map(vor_record, root.iter(VOR.tag)) if vor]
+    VOR.log_stats()
     return vors
 
 def parse_ndb(ndb_xml):
-    ndbs = []
     root = ET.fromstring(ndb_xml)
-    
-    for ndb in root.findall('.//ICA:ndb', Config.NAMESPACE):
-        ident = safe_get_text(ndb.find('ICA:codeid', Config.NAMESPACE))
-        frequency = safe_get_text(ndb.find('ICA:valfreq', Config.NAMESPACE))
-        lat_gms = safe_get_text(ndb.find('ICA:latitude_gms', Config.NAMESPACE))
-        lon_gms = safe_get_text(ndb.find('ICA:longitude_gms', Config.NAMESPACE))
-        
-        if all([ident, frequency, lat_gms, lon_gms]):
-            lat_formatted = gms_to_decimal(lat_gms)
-            lon_formatted = gms_to_decimal(lon_gms)
-            if lat_formatted and lon_formatted:
-                ndbs.append({
-                    'ident': ident,
-                    'frequency': frequency,
-                    'latitude': lat_formatted,
-                    'longitude': lon_formatted
-                })
+    ndbs = [ndb for ndb in map(ndb_record, root.iter(NDB.tag)) if ndb]
+    NDB.log_stats()
     return ndbs
 
 def format_coordinates(lat, lon):
@@ -182,30 +220,77 @@ def format_coordinates(lat, lon):
     
     return f"{lat_dir}{lat_deg:03d}.{lat_min:02d}.{lat_sec:06.3f}", f"{lon_dir}{lon_deg:03d}.{lon_min:02d}.{lon_sec:06.3f}"
 
-def write_output(file, waypoints, fixes_in_airways, fixes_not_in_airways, vors, ndbs):
-    # Write FIXES section
-    file.write("[FIXES]\n")
-    file.write("//" * 50 + "\n")
+def fixes_lines(waypoints, fixes_in_airways, fixes_not_in_airways):
     for fix in sorted(fixes_in_airways):
         lat, lon = waypoints[fix]['coordinates']
         lat_str, lon_str = format_coordinates(lat, lon)
-        file.write(f"{fix};{lat_str};{lon_str};0;0\n")
+        yield f"{fix};{lat_str};{lon_str};0;0"
     for fix in sorted(fixes_not_in_airways):
         lat, lon = waypoints[fix]['coordinates']
         lat_str, lon_str = format_coordinates(lat, lon)
-        file.write(f"{fix};{lat_str};{lon_str};1;0\n")
+        yield f"{fix};{lat_str};{lon_str};1;0"
+
+def navaid_lines(navaids):
+    for navaid in navaids:
+        yield f"{navaid['ident']};{navaid['frequency']};{navaid['latitude']};{navaid['longitude']};"
+
+def write_output(file, waypoints, fixes_in_airways, fixes_not_in_airways, vors, ndbs):
+    # Write FIXES section
+    file.write("[FIXES]\n")
+    file.write("//" * 50 + "\n")
+    for line in fixes_lines(waypoints, fixes_in_airways, fixes_not_in_airways):
+        file.write(line + "\n")
     
     # Write VOR section
+    # VORs and NDBs are written in canonical ident order, whatever order the server sent them in
     file.write("\n[VOR]\n")
     file.write("//" * 50 + "\n")
-    for vor in vors:
-        file.write(f"{vor['ident']};{vor['frequency']};{vor['latitude']};{vor['longitude']};\n")
+    for line in canonical_lines(navaid_lines(vors), "VOR"):
+        file.write(line + "\n")
     
     # Write NDB section
     file.write("\n[NDB]\n")
     file.write("//" * 50 + "\n")
-    for ndb in ndbs:
-        file.write(f"{ndb['ident']};{ndb['frequency']};{ndb['latitude']};{ndb['longitude']};\n")
+    for line in canonical_lines(navaid_lines(ndbs), "NDB"):
+        file.write(line + "\n")
+
+def fir_groups(items, firs):
+    """Groups items by FIR, sorted, with points outside every FIR last."""
+    groups = defaultdict(list)
+    for item, fir in zip(items, firs):
+        groups[fir].append(item)
+    return sorted(groups.items(), key=lambda group: (group[0] is None, group[0] or ""))
+
+def write_output_by_fir(file, waypoints, fixes_in_airways, fixes_not_in_airways, vors, ndbs, fir_polygons):
+    """Same as write_output, with each section split into //FIR groups by position."""
+    from geoaisweb.fir_index import locator
+
+    index = locator(fir_polygons)
+    idents = sorted(waypoints)
+    vor_firs = index.assign((vor['lat'], vor['lon']) for vor in vors)
+    ndb_firs = index.assign((ndb['lat'], ndb['lon']) for ndb in ndbs)
+
+    file.write("[FIXES]\n")
+    file.write("//" * 50 + "\n")
+    for fir, fir_idents in fir_groups(idents, index.assign(waypoints[ident]['coordinates'] for ident in idents)):
+        file.write(f"//FIR {fir or ''}\n")
+        fir_idents = set(fir_idents)
+        for line in fixes_lines(waypoints, fixes_in_airways & fir_idents, fixes_not_in_airways & fir_idents):
+            file.write(line + "\n")
+
+    for section, navaids, firs in (("VOR", vors, vor_firs), ("NDB", ndbs, ndb_firs)):
+        file.write(f"\n[{section}]\n")
+        file.write("//" * 50 + "\n")
+        for fir, fir_navaids in fir_groups(navaids, firs):
+            file.write(f"//FIR {fir or ''}\n")
+            for line in canonical_lines(navaid_lines(fir_navaids), section):
+                file.write(line + "\n")
+
+def load_fir_polygons(base_url=None):
+    """Fetches SETOR_FIR and returns {fir: [outer ring (lat, lon), ...]}."""
+    from geoaisweb.regions import parse_fir_polygons
+
+    return parse_fir_polygons(ET.fromstring(clean_xml(fetch_xml(feature_url(Config.FIR_TYPE, base_url)))))
 
 def print_results(output_file, waypoints, fixes_in_airways, fixes_not_in_airways, vors, ndbs):
     logger.info(f"Output written to {output_file}")
@@ -215,22 +300,26 @@ def print_results(output_file, waypoints, fixes_in_airways, fixes_not_in_airways
     logger.info(f"VORs processed: {len(vors)}")
     logger.info(f"NDBs processed: {len(ndbs)}")
 
-def parse_args():
-    parser = argparse.ArgumentParser(description="Process waypoint, airway, VOR, and NDB data")
-    parser.add_argument("--output-dir", default=os.path.expanduser("~/Desktop"), help="Output directory")
-    return parser.parse_args()
+def load_navaids(base_url=None, stream=True, workers=2, archive_dir=None):
+    """Fetches and parses waypoints, airways, VORs and NDBs.
+
+    With stream (the default) the four layers are downloaded concurrently and
+    parsed while they arrive (see geoaisweb.stream); otherwise each layer is
+    downloaded in full, then parsed. With archive_dir the streamed payloads
+    are also kept there with a per-feature index (see geoaisweb.archive).
 
-def main():
-    args = parse_args()
+    Returns (waypoints, fixes_in_airways, fixes_not_in_airways, vors, ndbs).
+    """
     urls = {
-        'waypoints': f"{Config.BASE_URL}?service=WFS&version=1.0.0&request=GetFeature&typeName={Config.WAYPOINT_TYPE}",
-        'airways': f"{Config.BASE_URL}?service=WFS&version=1.0.0&request=GetFeature&typeName={Config.AIRWAY_TYPE}",
-        'vor': f"{Config.BASE_URL}?service=WFS&version=1.0.0&request=GetFeature&typeName={Config.VOR_TYPE}",
-        'ndb': f"{Config.BASE_URL}?service=WFS&version=1.0.0&request=GetFeature&typeName={Config.NDB_TYPE}"
+        'waypoints': feature_url(Config.WAYPOINT_TYPE, base_url),
+        'airways': feature_url(Config.AIRWAY_TYPE, base_url),
+        'vor': feature_url(Config.VOR_TYPE, base_url),
+        'ndb': feature_url(Config.NDB_TYPE, base_url)
     }
-    output_file = os.path.join(args.output_dir, Config.OUTPUT_FILE)
-    
-    try:
+
+    if stream:
+        waypoints, airways, vors, ndbs = stream_navaids(urls, workers, archive_dir)
+    else:
         # Fetch data
         logger.info("Fetching waypoint data...")
         waypoint_xml = fetch_xml(urls['waypoints'])
@@ -240,7 +329,7 @@ def main():
         vor_xml = fetch_xml(urls['vor'])
         logger.info("Fetching NDB data...")
         ndb_xml = fetch_xml(urls['ndb'])
-        
+
         # Parse data
         logger.info("Parsing waypoint data...")
         waypoints = parse_xml_safely(waypoint_xml, parse_waypoints)
@@ -250,14 +339,79 @@ def main():
         vors = parse_xml_safely(vor_xml, parse_vor)
         logger.info("Parsing NDB data...")
         ndbs = parse_xml_safely(ndb_xml, parse_ndb)
-        
-        # Process fixes
-        fixes_in_airways = {fix for airway in airways.values() for fix in airway}
-        fixes_not_in_airways = set(waypoints.keys()) - fixes_in_airways
+
+    # Process fixes
+    fixes_in_airways = {fix for airway in airways.values() for fix in airway}
+    fixes_not_in_airways = set(waypoints.keys()) - fixes_in_airways
+    return waypoints, fixes_in_airways, fixes_not_in_airways, vors, ndbs
+
+def stream_navaids(urls, workers=2, archive_dir=None):
+    """Streams the four layers at once. Returns (waypoints, airways, vors, ndbs)."""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from geoaisweb.stream import stream_features
+
+    ica = Config.NAMESPACE['ICA']
+    layers = {
+        'waypoints': ('waypoint_aisweb', waypoint_record),
+        'airways': ('airway', airway_record),
+        'vor': ('vor', vor_record),
+        'ndb': ('ndb', ndb_record),
+    }
+    stats = []
+
+    def consume(name):
+        tag, transform = layers[name]
+        logger.info(f"Streaming {name} data...")
+        archive = None
+        if archive_dir:
+            from geoaisweb.archive import writer_for
+            archive = writer_for(f"ICA:{tag}", archive_dir, urls[name])
+        return list(stream_features(urls[name], f"{{{ica}}}{tag}", transform, workers=workers,
+                                    text_filter=clean_xml, stats=stats, archive=archive))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(layers)) as pool:
+        records = dict(zip(layers, pool.map(consume, layers)))
+    elapsed = time.perf_counter() - started
+    for layer in stats:
+        logger.info(f"{layer.features} features, {layer.bytes} bytes: download {layer.download_s:.2f}s, "
+                    f"pipeline {layer.total_s:.2f}s ({layer.url})")
+    logger.info(f"Streamed {len(stats)} layers in {elapsed:.2f}s "
+                f"(largest download alone: {max((layer.download_s for layer in stats), default=0):.2f}s)")
+    for layer_extractor in (WAYPOINT, AIRWAY, VOR, NDB):
+        layer_extractor.log_stats()
+
+    waypoints = waypoints_from_records(records['waypoints'])
+    airways = match_airway_records(records['airways'], waypoints)
+    return waypoints, airways, records['vor'], records['ndb']
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Process waypoint, airway, VOR, and NDB data")
+    parser.add_argument("--output-dir", default=os.path.expanduser("~/Desktop"), help="Output directory")
+    parser.add_argument("--base-url", default=Config.BASE_URL, help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    parser.add_argument("--no-stream", action="store_true", help="Download each layer in full before parsing it")
+    parser.add_argument("--archive-dir", help="Also keep the raw layers there, indexed by feature (see geoaisweb.archive)")
+    parser.add_argument("--group-by-fir", action="store_true", help="Split each section into //FIR groups using the SETOR_FIR polygons")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    output_file = os.path.join(args.output_dir, Config.OUTPUT_FILE)
+    
+    try:
+        waypoints, fixes_in_airways, fixes_not_in_airways, vors, ndbs = load_navaids(
+            args.base_url, stream=not args.no_stream, archive_dir=args.archive_dir)
         
         # Write combined output
-        with open(output_file, 'w', encoding='utf-8') as f:
-            write_output(f, waypoints, fixes_in_airways, fixes_not_in_airways, vors, ndbs)
+        with open(output_file, 'w', encoding='utf-8', newline='\n') as f:
+            if args.group_by_fir:
+                fir_polygons = load_fir_polygons(args.base_url)
+                write_output_by_fir(f, waypoints, fixes_in_airways, fixes_not_in_airways, vors, ndbs, fir_polygons)
+            else:
+                write_output(f, waypoints, fixes_in_airways, fixes_not_in_airways, vors, ndbs)
         
         print_results(output_file, waypoints, fixes_in_airways, fixes_not_in_airways, vors, ndbs)
         
@@ -1,8 +1,8 @@
-import requests
 import xml.etree.ElementTree as ET
-
-# URL of the WFS service for NDB
-url = "https://geoaisweb.decea.mil.br/geoserver/ICA/ows?service=WFS&version=1.0.0&request=GetFeature&typeName=ICA%3Andb"
+import argparse
+from geoaisweb.wfs import feature_url
+from geoaisweb.canonical import write_lines
+from geoaisweb.layers import extractor
 
 # Function to convert GMS to S000.00.00.000 or W000.00.00.000 format
 def gms_to_decimal(gms_str):
@@ -16,40 +16,46 @@ def gms_to_decimal(gms_str):
     formatted_str = f"{degrees.zfill(3)}.{minutes.zfill(2)}.{seconds.zfill(2)}.000"
     return f"{hemisphere}{formatted_str}"
 
-# Send a GET request to the WFS service
-response = requests.get(url)
-
-# Check if the request was successful
-if response.status_code == 200:
-    # Parse the XML content
-    root = ET.fromstring(response.content)
+# Compiled once: qualified tag names and direct child lookups (geoaisweb.layers)
+NDB = extractor("ICA:ndb", "codeid", "valfreq", "latitude_gms", "longitude_gms")
 
-    # Define the namespace (adjusted to match the XML sample)
-    ns = {
-        'gml': 'http://www.opengis.net/gml',
-        'ICA': 'http://10.32.62.212/geoserver/ICA'
-    }
+def extract_ndbs(url, output_file):
+    from geoaisweb.client import get_client
 
-    # Open a file to write the output
-    with open('ndb.txt', 'w') as file:
-        # Find all NDB elements
-        for ndb in root.findall('.//ICA:ndb', ns):
-            ident = ndb.find('ICA:codeid', ns).text.strip()
-            frequency = ndb.find('ICA:valfreq', ns).text.strip()
+    # Send a GET request to the WFS service
+    response = get_client().get(url, check=False)
 
-            # Get the GMS format latitude and longitude
-            latitude_gms = ndb.find('ICA:latitude_gms', ns).text.strip()
-            longitude_gms = ndb.find('ICA:longitude_gms', ns).text.strip()
+    # Check if the request was successful
+    if response.status_code == 200:
+        # Parse the XML content
+        root = ET.fromstring(response.content)
 
+        lines = []
+        # All NDB elements; those missing an attribute are counted and logged, not written
+        for ident, frequency, latitude_gms, longitude_gms in NDB.records(root):
             # Convert GMS to the required format
             latitude_formatted = gms_to_decimal(latitude_gms)
             longitude_formatted = gms_to_decimal(longitude_gms)
 
             # Format the output as requested
-            output = f"{ident};{frequency};{latitude_formatted};{longitude_formatted};\n"
-            # Write the output to the file
-            file.write(output)
+            lines.append(f"{ident};{frequency};{latitude_formatted};{longitude_formatted};")
+
+        # Write the output sorted by ident, whatever order the server returned
+        write_lines(output_file, lines)
+
+        print(f"Data has been successfully written to {output_file}")
+    else:
+        print(f"Failed to retrieve data. HTTP Status code: {response.status_code}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract NDBs from GEOAISWEB to ndb.txt")
+    parser.add_argument("--output", default="ndb.txt", help="Output file")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    extract_ndbs(feature_url("ICA:ndb", args.base_url), args.output)
 
-    print("Data has been successfully written to ndb.txt")
-else:
-    print(f"Failed to retrieve data. HTTP Status code: {response.status_code}")
+if __name__ == "__main__":
+    main()
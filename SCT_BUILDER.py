@@ -0,0 +1,223 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from geoaisweb.wfs import get_base_url
+from geoaisweb.sct import SectorFileWriter
+from geoaisweb.build import (assign_firs, dataset_layers, dataset_sections, fetch_layers, load_dataset, parse_layers,
+                             update_dataset)
+
+logger = logging.getLogger(__name__)
+
+def lod_dataset(dataset, vertex_budget):
+    """A copy of dataset whose sector layers are cut to vertex_budget each, from the rankings kept at parse time.
+
+    Layers without a ranking (a dataset read from a GeoPackage) are ranked
+    from their current lines.
+    """
+    from dataclasses import replace
+    from geoaisweb.simplify import lod_sectors, rank_rings
+    from geoaisweb.validation import sector_rings, validate_layer
+
+    sectors, validation = {}, {}
+    for kind, fir_sectors in dataset.sectors.items():
+        lod = dataset.sector_ranks.get(kind)
+        if lod is None:
+            lod = [(fir, ring) for fir, lines in fir_sectors.items() for ring in rank_rings(sector_rings(kind, lines))]
+        sectors[kind], validation[kind] = validate_layer(kind, lod_sectors(kind, lod, vertex_budget))
+    return replace(dataset, sectors=sectors, validation=validation)
+
+def write_sectorfile(dataset, output_file, fir=None, base_url=None):
+    """Writes one .sct file from the in-memory dataset, sections in canonical order. Returns stats per section."""
+    writer = SectorFileWriter(output_file, max_workers=1, canonical=True)
+    for section, lines in dataset_sections(dataset, fir, base_url=base_url):
+        writer.add(section, lines)
+    return writer.write()
+
+def get_dataset(base_url=None, max_workers=6, helipads=False, vertex_budget=None, max_error_nm=None, arc_error_nm=None,
+                gpkg_in=None, gpkg_out=None, validation_report=None, rank=False):
+    """load_dataset(), or the dataset saved in the GeoPackage gpkg_in; also saved to gpkg_out when given.
+
+    The sector validation report is written to validation_report when given.
+    """
+    from geoaisweb import geopackage
+    from geoaisweb.validation import validate_sectors, write_report
+
+    if gpkg_in:
+        dataset = geopackage.read_dataset(gpkg_in)
+        validate_sectors(dataset)
+    else:
+        dataset = load_dataset(base_url, max_workers, helipads, vertex_budget, max_error_nm, arc_error_nm, rank)
+    if gpkg_out:
+        geopackage.write_dataset(dataset, gpkg_out, get_base_url(base_url))
+    if validation_report:
+        write_report(dataset.validation, validation_report)
+    return dataset
+
+def build(output_file, base_url=None, max_workers=6, helipads=False, vertex_budget=None, max_error_nm=None, arc_error_nm=None,
+          gpkg_in=None, gpkg_out=None, validation_report=None, lod_budgets=None):
+    """Builds one .sct file from every layer. Returns stats per section.
+
+    For each of lod_budgets a <output>.lod<budget>.sct is written too, its
+    sector layers cut to that many vertices each.
+    """
+    dataset = get_dataset(base_url, max_workers, helipads, vertex_budget, max_error_nm, arc_error_nm, gpkg_in, gpkg_out,
+                          validation_report, bool(lod_budgets))
+    write_lod_sectorfiles(dataset, output_file, lod_budgets, base_url)
+    return write_sectorfile(dataset, output_file, base_url=base_url)
+
+def write_lod_sectorfiles(dataset, output_file, lod_budgets, base_url=None):
+    from geoaisweb.simplify import lod_path
+    from geoaisweb.validation import summary
+
+    for budget in lod_budgets or ():
+        lod = lod_dataset(dataset, budget)
+        write_sectorfile(lod, lod_path(output_file, budget), base_url=base_url)
+        logger.info(f"Level of detail {budget} written to {lod_path(output_file, budget)} ({summary(list(lod.validation.values()))})")
+
+def build_regions(output_dir, firs=None, base_url=None, max_workers=6, helipads=False, vertex_budget=None, max_error_nm=None, arc_error_nm=None,
+                  gpkg_in=None, gpkg_out=None, validation_report=None, lod_budgets=None):
+    """Fetches every layer once and writes <FIR>.sct for each FIR in parallel.
+
+    Also writes <FIR>.lod<budget>.sct for each of lod_budgets. Returns {fir: stats per section}.
+    """
+    dataset = get_dataset(base_url, max_workers, helipads, vertex_budget, max_error_nm, arc_error_nm, gpkg_in,
+                          validation_report=validation_report, rank=bool(lod_budgets))
+    assign_firs(dataset)
+    if gpkg_out:
+        # Saved after assign_firs so the points keep their FIR
+        from geoaisweb import geopackage
+        geopackage.write_dataset(dataset, gpkg_out, get_base_url(base_url))
+    for budget in lod_budgets or ():
+        write_regions(lod_dataset(dataset, budget), output_dir, firs, base_url, max_workers, f".lod{budget}")
+    return write_regions(dataset, output_dir, firs, base_url, max_workers)
+
+def write_regions(dataset, output_dir, firs=None, base_url=None, max_workers=6, suffix=""):
+    """Writes <FIR><suffix>.sct for each FIR of a dataset with assigned FIRs. Returns {fir: stats per section}."""
+    firs = firs or dataset.firs
+    os.makedirs(output_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        jobs = {
+            fir: pool.submit(write_sectorfile, dataset, os.path.join(output_dir, f"{fir}{suffix}.sct"), fir, base_url)
+            for fir in firs
+        }
+        return {fir: job.result() for fir, job in jobs.items()}
+
+def watch(interval, output_file=None, output_dir=None, firs=None, base_url=None, max_workers=6, helipads=False,
+          vertex_budget=None, max_error_nm=None, arc_error_nm=None, cycles=None, validation_report=None, lod_budgets=None):
+    """Polls every layer each interval seconds and rebuilds the output when one changed.
+
+    The layers and the Dataset stay in memory between polls: only changed
+    layers are downloaded, and only the parts of the Dataset that depend on
+    them are parsed again (see update_dataset). Writes output_file, or one
+    <FIR>.sct per FIR when output_dir is given (plus the lod_budgets levels
+    of detail), and the sector validation report after each rebuild when
+    validation_report is given. Runs forever
+    unless cycles limits the number of polls.
+    """
+    from geoaisweb.validation import write_report
+    from geoaisweb.watch import LayerPoller
+
+    poller = LayerPoller(base_url)
+    text_layers, byte_layers = dataset_layers(helipads)
+    texts, payloads, dataset = {}, {}, None
+    polls = 0
+    while cycles is None or polls < cycles:
+        if polls:
+            time.sleep(interval)
+        polls += 1
+        changed = poller.poll(text_layers + byte_layers)
+        if not changed:
+            logger.info("No layer changed")
+            continue
+        started = time.perf_counter()
+        # Layers never fetched yet (their first poll failed) come along with the first build
+        missing = {name for name in text_layers + byte_layers if name not in texts and name not in payloads}
+        try:
+            fetched_texts, fetched_payloads = fetch_layers(base_url, max_workers, helipads, set(changed) | missing)
+            texts.update(fetched_texts)
+            payloads.update(fetched_payloads)
+            if dataset is None:
+                dataset = parse_layers(texts, payloads, helipads, vertex_budget, max_error_nm, arc_error_nm, bool(lod_budgets))
+            else:
+                update_dataset(dataset, texts, payloads, set(changed), vertex_budget, max_error_nm, arc_error_nm,
+                               bool(lod_budgets))
+            if output_dir:
+                assign_firs(dataset)
+                for budget in lod_budgets or ():
+                    write_regions(lod_dataset(dataset, budget), output_dir, firs, base_url, max_workers, f".lod{budget}")
+                write_regions(dataset, output_dir, firs, base_url, max_workers)
+            else:
+                write_lod_sectorfiles(dataset, output_file, lod_budgets, base_url)
+                write_sectorfile(dataset, output_file, base_url=base_url)
+            if validation_report:
+                write_report(dataset.validation, validation_report)
+        except Exception as e:
+            # Not accepted: the same layers count as changed at the next poll
+            logger.error(f"Rebuild failed, retrying at the next poll: {e}")
+            continue
+        poller.accept(changed)
+        logger.info(f"Rebuilt {output_dir or output_file} for {', '.join(changed)} in {time.perf_counter() - started:.1f}s")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build a combined Aurora .sct sectorfile from GEOAISWEB")
+    parser.add_argument("--output", default=os.path.join(os.path.expanduser("~"), "Desktop", "brazil.sct"),
+                        help="Output file (default: Desktop/brazil.sct)")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    parser.add_argument("--workers", type=int, default=6, help="Concurrent downloads / regional outputs")
+    parser.add_argument("--helipads", action="store_true", help="Use airport_heliport (airports + helipads) for [AIRPORT]")
+    parser.add_argument("--vertex-budget", type=int, help="Vertex budget per sector layer (adaptive simplification)")
+    parser.add_argument("--max-error-nm", type=float, help="Maximum sector deviation in NM (adaptive simplification)")
+    parser.add_argument("--arc-error-nm", type=float, help="Rebuild circular arcs in sectors within this error in NM")
+    parser.add_argument("--per-fir", action="store_true", help="Write one <FIR>.sct per FIR into --output-dir")
+    parser.add_argument("--output-dir", default=os.path.join(os.path.expanduser("~"), "Desktop"),
+                        help="Output directory for --per-fir (default: Desktop)")
+    parser.add_argument("--firs", help="Comma separated FIRs for --per-fir (default: every FIR in SETOR_FIR)")
+    parser.add_argument("--gpkg-out", help="Also save the parsed dataset to this GeoPackage")
+    parser.add_argument("--gpkg-in", help="Build from a GeoPackage saved with --gpkg-out instead of fetching WFS")
+    parser.add_argument("--validation-report", help="Write the sector validation report (JSON) to this file")
+    parser.add_argument("--lod", help="Comma separated vertex budgets per sector layer: also write <output>.lod<budget>.sct"
+                                      " (or <FIR>.lod<budget>.sct) at each level of detail")
+    parser.add_argument("--watch", type=float, metavar="SECONDS",
+                        help="Keep running: poll the layers every SECONDS and rebuild only when one changed")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    started = time.perf_counter()
+    firs = [fir.strip() for fir in args.firs.split(",") if fir.strip()] if args.firs else None
+    from geoaisweb.simplify import parse_budgets
+    lod_budgets = parse_budgets(args.lod)
+    try:
+        if args.watch:
+            watch(args.watch, args.output, args.output_dir if args.per_fir else None, firs, args.base_url, args.workers,
+                  args.helipads, args.vertex_budget, args.max_error_nm, args.arc_error_nm,
+                  validation_report=args.validation_report, lod_budgets=lod_budgets)
+            return
+        if args.per_fir:
+            results = build_regions(args.output_dir, firs, args.base_url, args.workers, args.helipads,
+                                    args.vertex_budget, args.max_error_nm, args.arc_error_nm, args.gpkg_in, args.gpkg_out,
+                                    args.validation_report, lod_budgets)
+            for fir, stats in results.items():
+                lines = sum(section_stats.lines for section_stats in stats.values())
+                logger.info(f"{fir}.sct: {lines} lines")
+            logger.info(f"{len(results)} sectorfiles written to {args.output_dir} in {time.perf_counter() - started:.1f}s")
+            return
+        stats = build(args.output, args.base_url, args.workers, args.helipads,
+                      args.vertex_budget, args.max_error_nm, args.arc_error_nm, args.gpkg_in, args.gpkg_out,
+                      args.validation_report, lod_budgets)
+    except KeyboardInterrupt:
+        logger.info("Stopped")
+        return
+    except Exception as e:
+        logger.error(f"Error: {e}")
+        sys.exit(1)
+    for section, section_stats in stats.items():
+        logger.info(f"[{section}] {section_stats.lines} lines, {section_stats.bytes} bytes")
+    logger.info(f"Sectorfile written to {args.output} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared helpers for the GEOAISWEB sectorfile extractors."""
@@ -0,0 +1,160 @@
+"""Columnar airport / heliport engine shared by APT_EXTRACTOR and HEL_EXTRACTOR.
+
+The ICA:airport and ICA:airport_heliport layers are parsed straight into one
+NumPy array per attribute. Filtering, the FIR/ident sort, metres to feet,
+DMS formatting and the tipo_util mappings then run on whole columns instead
+of one dict per aerodrome.
+"""
+import io
+import xml.etree.ElementTree as ET
+
+from geoaisweb.layers import extractor
+
+TEXT_FIELDS = ("localidade_id", "nome", "fir", "tipo_util")
+FLOAT_FIELDS = ("elevacao", "latitude_dec", "longitude_dec")
+
+
+def decimal_to_dms(decimal_degrees, direction_positive, direction_negative):
+    degrees = int(abs(decimal_degrees))
+    minutes_not_truncated = (abs(decimal_degrees) - degrees) * 60
+    minutes = int(minutes_not_truncated)
+    seconds = (minutes_not_truncated - minutes) * 60
+    dms_str = (
+        f"{degrees:03d}.{minutes:02d}.{seconds:06.3f}"
+    )
+    return f"{direction_positive}{dms_str}" if decimal_degrees >= 0 else f"{direction_negative}{dms_str}"
+
+
+def meters_to_feet(meters):
+    return round(meters * 3.28084)
+
+
+class AerodromeTable:
+    """Aerodromes as columns: {attribute: array}, all arrays the same length."""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns["localidade_id"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def take(self, index):
+        """Rows selected by a boolean mask or an index array."""
+        return AerodromeTable({name: column[index] for name, column in self.columns.items()})
+
+    def where(self, firs=None, tipo_utils=None):
+        """Rows whose FIR is in firs (None for all) and tipo_util in tipo_utils (None for all)."""
+        import numpy as np
+
+        mask = np.ones(len(self), dtype=bool)
+        if firs is not None:
+            mask &= np.isin(self["fir"], list(firs))
+        if tipo_utils is not None:
+            mask &= np.isin(self["tipo_util"], list(tipo_utils))
+        return self.take(mask)
+
+    def sort(self):
+        """Rows ordered by FIR, then ident (stable, like sorted())."""
+        import numpy as np
+
+        return self.take(np.lexsort((self["localidade_id"], self["fir"])))
+
+    def records(self):
+        """One dict per aerodrome, as the extractors used to return."""
+        names = list(self.columns)
+        return [dict(zip(names, row)) for row in zip(*(self.columns[name].tolist() for name in names))]
+
+
+def parse_aerodromes(content, type_name, text_fields=TEXT_FIELDS):
+    """Parses an ICA aerodrome layer into an AerodromeTable.
+
+    Features missing any requested field are skipped, as before, and counted
+    per field (geoaisweb.layers).
+    """
+    import numpy as np
+
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    fields = tuple(text_fields) + FLOAT_FIELDS
+    layer = extractor(f"ICA:{type_name}", *fields)
+    rows = []
+    for _, element in ET.iterparse(io.BytesIO(content)):
+        if element.tag != layer.tag:
+            continue
+        row = layer(element)
+        element.clear()
+        if row is not None:
+            rows.append(row)
+    layer.log_stats()
+
+    columns = list(zip(*rows)) or [()] * len(fields)
+    table = {field: np.array(column, dtype=str) for field, column in zip(text_fields, columns)}
+    for field, column in zip(FLOAT_FIELDS, columns[len(text_fields):]):
+        table[field] = np.array(column, dtype=np.float64)
+    return AerodromeTable(table)
+
+
+def feet_column(meters):
+    """Vectorized meters_to_feet (round half to even, like round())."""
+    import numpy as np
+
+    return np.rint(np.asarray(meters) * 3.28084).astype(np.int64)
+
+
+def dms_column(values, direction_positive, direction_negative):
+    """Vectorized decimal_to_dms: returns a list of 'S023.26.08.400' style strings."""
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.float64)
+    magnitude = np.abs(values)
+    degrees = np.trunc(magnitude)
+    minutes_not_truncated = (magnitude - degrees) * 60
+    minutes = np.trunc(minutes_not_truncated)
+    seconds = (minutes_not_truncated - minutes) * 60
+    hemisphere = np.where(values >= 0, direction_positive, direction_negative)
+    # Only the final string formatting is per element
+    return [
+        f"{h}{d:03d}.{m:02d}.{s:06.3f}"
+        for h, d, m, s in zip(hemisphere.tolist(), degrees.astype(np.int64).tolist(),
+                              minutes.astype(np.int64).tolist(), seconds.tolist())
+    ]
+
+
+def categorical_column(values, mapping, default):
+    """Maps every value through mapping (default when missing), once per distinct value."""
+    import numpy as np
+
+    distinct, inverse = np.unique(values, return_inverse=True)
+    codes = np.array([mapping.get(value, default) for value in distinct.tolist()])
+    return codes[inverse] if len(distinct) else np.array([], dtype=np.int64)
+
+
+def aerodrome_lines(table, suffixes, numbers=None, blank_line_before_fir=False):
+    """Yields the [AIRPORT] lines of a sorted table with a //FIR header per FIR.
+
+    Lines are 'ident;elevation ft;0;lat;lon;name;suffix;' with ';number'
+    inserted before the final ';' when numbers is given.
+    """
+    if not len(table):
+        return
+    tails = [";"] * len(table) if numbers is None else [f";{number};" for number in numbers.tolist()]
+    lines = [
+        f"{ident};{feet};0;{lat};{lon};{name};{suffix}{end}"
+        for ident, feet, lat, lon, name, suffix, end in zip(
+            table["localidade_id"].tolist(), feet_column(table["elevacao"]).tolist(),
+            dms_column(table["latitude_dec"], "N", "S"), dms_column(table["longitude_dec"], "E", "W"),
+            table["nome"].tolist(), suffixes.tolist(), tails,
+        )
+    ]
+
+    current_fir = None
+    for fir, line in zip(table["fir"].tolist(), lines):
+        if fir != current_fir:
+            current_fir = fir
+            if blank_line_before_fir:
+                yield ""
+            yield f"//FIR {current_fir}"
+        yield line
@@ -0,0 +1,24 @@
+"""AIRAC cycle arithmetic (28-day cycles)."""
+import datetime
+
+# AIRAC 2401 became effective on 25 January 2024.
+REFERENCE_DATE = datetime.date(2024, 1, 25)
+CYCLE_DAYS = 28
+
+
+def effective_date(date=None):
+    """Returns the effective date of the AIRAC cycle in force on date."""
+    date = date or datetime.date.today()
+    cycles = (date - REFERENCE_DATE).days // CYCLE_DAYS
+    return REFERENCE_DATE + datetime.timedelta(days=cycles * CYCLE_DAYS)
+
+
+def cycle(date=None):
+    """Returns the AIRAC cycle identifier (e.g. '2611') in force on date."""
+    effective = effective_date(date)
+    number = 1
+    previous = effective - datetime.timedelta(days=CYCLE_DAYS)
+    while previous.year == effective.year:
+        number += 1
+        previous -= datetime.timedelta(days=CYCLE_DAYS)
+    return f"{effective.year % 100:02d}{number:02d}"
@@ -0,0 +1,134 @@
+"""Upper / lower airway classification from the vertical limits of the airway layer.
+
+Every ICA:airway segment carries its lower and upper limits
+(valdistverlower / uomdistverlower, valdistverupper / uomdistverupper). The
+four columns are read for all segments in one pass, converted to feet with
+NumPy and reduced per designator: an airway is upper when no segment of it
+starts below the upper airspace (FL245). A segment without a lower limit
+counts as lower when its upper limit is at or below FL245. Designators
+without usable limits fall back to the 'U' prefix of txtdesig.
+
+SCT_BUILDER computes the classes once per build (Dataset.airway_upper) for
+the airway tracks, the labels and the GeoPackage airway tables.
+
+    python -m geoaisweb.airway_levels     (classes, and where they differ from the prefix)
+"""
+import argparse
+import logging
+
+from geoaisweb.layers import extractor
+from geoaisweb.wfs import feature_url
+
+logger = logging.getLogger(__name__)
+
+# Every segment counts, with "" for a missing attribute
+LIMITS = extractor("ICA:airway", optional=("txtdesig", "valdistverlower", "uomdistverlower", "valdistverupper", "uomdistverupper"))
+UPPER_FLOOR_FT = 24500.0    # FL245: Brazilian upper airspace (UTA) starts here
+FEET_PER_UNIT = {"FL": 100.0, "FT": 1.0, "M": 3.28084}
+SURFACE = ("SFC", "GND")
+UNLIMITED = ("UNL", "UNLTD")
+
+
+def limit_columns(airway_root):
+    """(txtdesig, lower value, lower unit, upper value, upper unit) text lists, one entry per airway segment."""
+    columns = ([], [], [], [], [])
+    for record in LIMITS.records(airway_root):
+        for column, value in zip(columns, record):
+            column.append(value or "")
+    return columns
+
+
+def _numbers(values):
+    """Float array of value texts; NaN for empty or non-numeric ones (SFC, UNL, ...)."""
+    import numpy as np
+
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        numbers = []
+        for value in values:
+            try:
+                numbers.append(float(value))
+            except ValueError:
+                numbers.append(np.nan)
+        return np.array(numbers, dtype=np.float64)
+
+
+def to_feet(values, units):
+    """Float array of limits in feet; NaN where the value or the unit is missing or unknown."""
+    import numpy as np
+
+    values = np.char.upper(np.array(values, dtype=str))
+    units = np.char.upper(np.array(units, dtype=str))
+    factors = np.full(len(units), np.nan)
+    for unit, factor in FEET_PER_UNIT.items():
+        factors[units == unit] = factor
+    feet = _numbers(np.where(values == "", "nan", values).tolist()) * factors
+    feet[np.isin(values, SURFACE) | np.isin(units, SURFACE)] = 0.0
+    feet[np.isin(values, UNLIMITED)] = np.inf
+    return feet
+
+
+def classify(txtdesigs, lower_ft, upper_floor_ft=UPPER_FLOOR_FT):
+    """{txtdesig: True for upper} from per-segment lower limits in feet (column arrays)."""
+    import numpy as np
+
+    if not len(txtdesigs):
+        return {}
+    names, inverse = np.unique(np.array(txtdesigs, dtype=str), return_inverse=True)
+    # Lowest known lower limit per designator; NaN (unknown) segments are ignored
+    lowest = np.full(len(names), np.inf)
+    known = ~np.isnan(lower_ft)
+    np.minimum.at(lowest, inverse[known], lower_ft[known])
+    has_limits = np.zeros(len(names), dtype=bool)
+    has_limits[inverse[known]] = True
+
+    classes = {}
+    fallback = 0
+    for name, floor, has in zip(names.tolist(), lowest.tolist(), has_limits.tolist()):
+        if has:
+            classes[name] = floor >= upper_floor_ft
+        else:
+            classes[name] = name.startswith('U')
+            fallback += 1
+    if fallback:
+        logger.info(f"{fallback} airways without vertical limits classified by their designator")
+    return classes
+
+
+def airway_classes(airway_root, upper_floor_ft=UPPER_FLOOR_FT):
+    """{txtdesig: True for upper} for a parsed ICA:airway layer."""
+    import numpy as np
+
+    txtdesigs, lower_values, lower_units, upper_values, upper_units = limit_columns(airway_root)
+    lower_ft = to_feet(lower_values, lower_units)
+    upper_ft = to_feet(upper_values, upper_units)
+    lower_ft[np.isnan(lower_ft) & (upper_ft <= upper_floor_ft)] = 0.0
+    return classify(txtdesigs, lower_ft, upper_floor_ft)
+
+
+def is_upper(txtdesig, classes=None):
+    """Class of one airway; the designator prefix when classes (from airway_classes) do not know it."""
+    if classes and txtdesig in classes:
+        return classes[txtdesig]
+    return txtdesig.startswith('U')
+
+
+def main(argv=None):
+    import xml.etree.ElementTree as ET
+    from geoaisweb.client import get_client
+
+    parser = argparse.ArgumentParser(description="Classify the airways as upper or lower from their vertical limits")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    classes = airway_classes(ET.fromstring(get_client().get(feature_url("ICA:airway", args.base_url)).content))
+    for txtdesig, upper in sorted(classes.items()):
+        note = "" if upper == txtdesig.startswith('U') else "  (differs from the designator prefix)"
+        print(f"{txtdesig:8s} {'UPPER' if upper else 'LOWER'}{note}")
+    print(f"{sum(classes.values())} upper, {len(classes) - sum(classes.values())} lower airways")
+
+
+if __name__ == "__main__":
+    main()
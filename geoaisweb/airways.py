@@ -0,0 +1,146 @@
+"""Assembly of airway segments into continuous polylines.
+
+The airway layer has one feature per segment. Segments of a designator that
+share end points are joined into the fewest polylines that use every segment
+once: per connected piece of the airway, odd-degree vertices are paired with
+virtual edges, an Euler circuit is found with Hierholzer's algorithm and the
+circuit is cut at the virtual edges. A simple chain becomes one polyline.
+fix_sequences() then names every polyline vertex after the fix it lies on.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+
+from geoaisweb.snap import DEFAULT_SNAP_NM, FixSnapper
+
+
+@dataclass
+class AirwaySegment:
+    seq: float
+    segments: list   # (lon, lat) vertices
+
+
+def merge_segments(segments):
+    """Returns the polylines (vertex lists) covering every edge of segments once.
+
+    segments are vertex sequences in the order they should be preferred
+    (e.g. sorted by seq). Polylines start at their vertex seen first and are
+    returned in order of first appearance, so a chain keeps its direction.
+    """
+    order = {}
+    edges = []
+    for segment in segments:
+        for vertex in segment:
+            order.setdefault(vertex, len(order))
+        for a, b in zip(segment, segment[1:]):
+            if a != b:
+                edges.append((a, b))
+
+    adjacency = defaultdict(list)
+    for edge_id, (a, b) in enumerate(edges):
+        adjacency[a].append((edge_id, b))
+        adjacency[b].append((edge_id, a))
+
+    polylines = []
+    seen = set()
+    for start in sorted(adjacency, key=order.get):
+        if start in seen:
+            continue
+        component = connected(adjacency, start)
+        seen.update(component)
+        polylines.extend(component_polylines(component, adjacency, edges, order))
+    polylines.sort(key=lambda polyline: min(order[vertex] for vertex in polyline))
+    return polylines
+
+
+def connected(adjacency, start):
+    """Vertices reachable from start."""
+    component, stack = {start}, [start]
+    while stack:
+        for _, neighbour in adjacency[stack.pop()]:
+            if neighbour not in component:
+                component.add(neighbour)
+                stack.append(neighbour)
+    return component
+
+
+def component_polylines(component, adjacency, edges, order):
+    """Fewest trails covering one connected component (Euler circuit split at virtual edges)."""
+    vertices = sorted(component, key=order.get)
+    odd = [vertex for vertex in vertices if len(adjacency[vertex]) % 2]
+    edge_count = len(edges)
+
+    # Virtual edges pair up odd vertices; they are appended after the real
+    # edges so the walk prefers real segments
+    local = {vertex: list(adjacency[vertex]) for vertex in vertices}
+    virtual = set()
+    for a, b in zip(odd[::2], odd[1::2]):
+        edge_id = edge_count + len(virtual)
+        virtual.add(edge_id)
+        local[a].append((edge_id, b))
+        local[b].append((edge_id, a))
+
+    # Hierholzer's algorithm, iterative
+    used = set()
+    position = defaultdict(int)
+    stack = [(odd[0] if odd else vertices[0], None)]
+    circuit = []
+    while stack:
+        vertex, _ = stack[-1]
+        neighbours = local[vertex]
+        while position[vertex] < len(neighbours) and neighbours[position[vertex]][0] in used:
+            position[vertex] += 1
+        if position[vertex] < len(neighbours):
+            edge_id, neighbour = neighbours[position[vertex]]
+            used.add(edge_id)
+            stack.append((neighbour, edge_id))
+        else:
+            circuit.append(stack.pop())
+    circuit.reverse()  # [(vertex, edge used to reach it)], first entry has no edge
+
+    if not virtual:
+        return [orient([vertex for vertex, _ in circuit], order)]
+
+    # Rotate so the walk starts right after a virtual edge, then cut at each one
+    cut = next(i for i, (_, edge_id) in enumerate(circuit) if edge_id in virtual)
+    steps = circuit[cut:] + circuit[1:cut]
+    polylines, current = [], [steps[0][0]]
+    for vertex, edge_id in steps[1:]:
+        if edge_id in virtual:
+            polylines.append(current)
+            current = [vertex]
+        else:
+            current.append(vertex)
+    polylines.append(current)
+    return [orient(polyline, order) for polyline in polylines if len(polyline) > 1]
+
+
+def orient(polyline, order):
+    """Reverses an open polyline so it starts at the end seen first."""
+    if polyline[0] != polyline[-1] and order[polyline[-1]] < order[polyline[0]]:
+        return polyline[::-1]
+    return polyline
+
+
+def fix_sequences(airways, fixes, snap_nm=DEFAULT_SNAP_NM):
+    """Returns ({txtdesig: [[fix ident, ...] per polyline]}, SnapReport).
+
+    airways maps txtdesig to segments with .seq and .segments ((lon, lat)
+    vertices), fixes maps (lon, lat) to a fix ident. Vertices without a fix
+    are left out, and a fix repeated on consecutive vertices is kept once.
+    """
+    # Resolve every distinct vertex once
+    vertices = (vertex for segments in airways.values() for segment in segments for vertex in segment.segments)
+    resolved, report = FixSnapper(fixes, snap_nm).resolve(vertices)
+
+    sequences = {}
+    for txtdesig, segments in airways.items():
+        ordered = sorted(segments, key=lambda x: x.seq)  # Sort by sequence
+        sequences[txtdesig] = []
+        for polyline in merge_segments([segment.segments for segment in ordered]):
+            idents = []
+            for vertex in polyline:
+                fix_ident = resolved.get(vertex)
+                if fix_ident and (not idents or fix_ident != idents[-1]):
+                    idents.append(fix_ident)
+            sequences[txtdesig].append(idents)
+    return sequences, report
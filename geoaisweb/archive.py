@@ -0,0 +1,271 @@
+"""On-disk archive of raw WFS payloads with a per-feature byte-offset index.
+
+Each layer is stored exactly as downloaded (ICA_CTA.xml, the same file names
+as geoaisweb.mock_server recordings) next to an index (ICA_CTA.xml.idx.json)
+of the byte span of every gml:featureMember, keyed by its fid and by a key
+attribute such as nam or ident. The index is built by an expat parser fed the
+same chunks that are written to disk, so archiving costs no extra pass. The
+parser sees the control characters that the extractors strip (clean_xml) as
+spaces, so byte offsets still match the payload on disk.
+
+Reading maps the payload with mmap: one feature is a slice of the file, and a
+subset of features can be written back out as a valid WFS response for any
+extractor (selective re-extraction). Typical use:
+
+    python -m geoaisweb.archive fetch ICA:CTA ICA:waypoint_aisweb
+    python -m geoaisweb.archive show ICA:CTA "AZ CTA 1"
+    python -m geoaisweb.archive extract ICA:CTA "AZ CTA 1" --out-dir subset
+    python -m geoaisweb.mock_server serve --data-dir subset
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from xml.parsers import expat
+
+from geoaisweb import airac
+from geoaisweb.cache import cache_dir
+from geoaisweb.layers import layer_keys
+from geoaisweb.wfs import feature_url, recording_name
+
+logger = logging.getLogger(__name__)
+
+GML_NS = "http://www.opengis.net/gml"
+
+# Attribute used as the lookup key of each layer (besides the fid).
+LAYER_KEYS = layer_keys()
+
+# Control characters not allowed in XML 1.0, seen by the index parser as spaces (same length)
+CONTROL_TO_SPACE = bytes.maketrans(bytes([*range(0x09), 0x0B, 0x0C, *range(0x0E, 0x20)]), b" " * 29)
+
+
+def archive_dir():
+    """Default archive location: one directory per AIRAC cycle in the cache."""
+    return cache_dir("archive", airac.cycle())
+
+
+class ArchiveWriter:
+    """Writes a payload to disk chunk by chunk while indexing its feature members."""
+
+    def __init__(self, path, key_field=None, url=None):
+        self.path = path
+        self.key_field = key_field
+        self.url = url
+        self.file = open(path + ".part", "wb")
+        self.parser = expat.ParserCreate(namespace_separator=" ")
+        self.parser.StartElementHandler = self._start
+        self.parser.EndElementHandler = self._end
+        self.parser.CharacterDataHandler = self._text
+        self.depth = 0
+        self.head_end = None
+        self.tail_start = None
+        self.member = None      # [start, fid, key] of the open feature member
+        self.key_text = None
+        self.features = []      # [fid, key, start, end tag start]
+
+    def _mark_head(self):
+        if self.depth == 1 and self.head_end is None:
+            self.head_end = self.parser.CurrentByteIndex
+
+    def _start(self, name, attributes):
+        self._mark_head()
+        self.depth += 1
+        if self.depth == 2 and name == f"{GML_NS} featureMember":
+            self.member = [self.parser.CurrentByteIndex, None, None]
+        elif self.depth == 3 and self.member is not None:
+            self.member[1] = attributes.get("fid")
+        elif self.depth == 4 and self.member is not None and name.rsplit(" ", 1)[-1] == self.key_field:
+            self.key_text = []
+
+    def _end(self, name):
+        self._mark_head()
+        if self.depth == 4 and self.key_text is not None:
+            if self.member[2] is None:
+                self.member[2] = "".join(self.key_text).strip()
+            self.key_text = None
+        elif self.depth == 2 and self.member is not None:
+            self.features.append(self.member + [self.parser.CurrentByteIndex])
+            self.member = None
+        elif self.depth == 1:
+            self.tail_start = self.parser.CurrentByteIndex
+        self.depth -= 1
+
+    def _text(self, data):
+        self._mark_head()
+        if self.key_text is not None:
+            self.key_text.append(data)
+
+    def feed(self, chunk):
+        self.file.write(chunk)
+        self.parser.Parse(chunk.translate(CONTROL_TO_SPACE), False)
+
+    def close(self):
+        """Finishes the payload and writes the index. Raises on malformed or truncated XML."""
+        try:
+            self.parser.Parse(b"", True)
+        finally:
+            self.file.close()
+        with open(self.path + ".part", "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            # Spans end after the '>' of the closing </gml:featureMember>
+            features = [[fid, key, start, view.find(b">", end) + 1] for start, fid, key, end in self.features]
+            size = len(view)
+        index = {
+            "url": self.url,
+            "key_field": self.key_field,
+            "head": self.head_end if self.head_end is not None else 0,
+            "tail": self.tail_start if self.tail_start is not None else size,
+            "features": features,
+        }
+        os.replace(self.path + ".part", self.path)
+        with open(self.path + ".idx.json", "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        logger.info(f"Archived {len(features)} features, {size} bytes to {self.path}")
+
+    def abort(self):
+        self.file.close()
+        try:
+            os.remove(self.path + ".part")
+        except OSError:
+            pass
+
+
+class FeatureArchive:
+    """Read access to one archived layer through mmap."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path + ".idx.json", encoding="utf-8") as f:
+            index = json.load(f)
+        self.url = index["url"]
+        self.key_field = index["key_field"]
+        self.head, self.tail = index["head"], index["tail"]
+        self.spans = [(start, end) for _, _, start, end in index["features"]]
+        self.by_fid = {}
+        self.by_key = defaultdict(list)
+        for position, (fid, key, _, _) in enumerate(index["features"]):
+            if fid is not None:
+                self.by_fid[fid] = position
+            if key is not None:
+                self.by_key[key].append(position)
+        self.file = open(path, "rb")
+        self.view = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        self.view.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.spans)
+
+    def keys(self):
+        return list(self.by_key)
+
+    def positions(self, key):
+        """Feature positions matching a fid (e.g. 'CTA.1') or a key value (all matches)."""
+        if key in self.by_fid:
+            return [self.by_fid[key]]
+        return list(self.by_key.get(key, ()))
+
+    def raw(self, key):
+        """The <gml:featureMember> bytes of every feature matching key."""
+        return [self.view[start:end] for start, end in (self.spans[i] for i in self.positions(key))]
+
+    def document(self, keys):
+        """A WFS response holding only the features matching keys, in archive order."""
+        positions = sorted({i for key in keys for i in self.positions(key)})
+        members = [self.view[start:end] for start, end in (self.spans[i] for i in positions)]
+        return b"".join([self.view[:self.head], b"\n", *members, self.view[self.tail:]])
+
+    def elements(self, key):
+        """Parsed feature elements (e.g. ICA:CTA) matching key, without parsing the rest of the layer."""
+        root = ET.fromstring(self.document([key]))
+        return [member[0] for member in root.iter(f"{{{GML_NS}}}featureMember") if len(member)]
+
+
+def layer_path(type_name, directory=None):
+    return os.path.join(directory or archive_dir(), recording_name(type_name))
+
+
+def open_layer(type_name, directory=None):
+    return FeatureArchive(layer_path(type_name, directory))
+
+
+def writer_for(type_name, directory=None, url=None):
+    """An ArchiveWriter for a layer, keyed by its LAYER_KEYS attribute."""
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return ArchiveWriter(layer_path(type_name, directory), LAYER_KEYS.get(type_name), url)
+
+
+def fetch_layer(type_name, directory=None, base_url=None, timeout=30, chunk_size=64 * 1024):
+    """Downloads a layer straight into the archive. Returns its path."""
+    from geoaisweb.client import get_client
+
+    url = feature_url(type_name, base_url)
+    writer = writer_for(type_name, directory, url)
+    try:
+        with get_client().stream(url, timeout=timeout, chunk_size=chunk_size) as response:
+            for chunk in response.iter_bytes():
+                writer.feed(chunk)
+        writer.close()
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Archive of raw WFS layers with random access by feature")
+    parser.add_argument("--dir", help="Archive directory (default: per-AIRAC directory in the cache)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fetch = sub.add_parser("fetch", help="Download layers into the archive")
+    fetch.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    fetch.add_argument("layers", nargs="*", default=list(LAYER_KEYS))
+
+    show = sub.add_parser("show", help="Print archived features by fid or key")
+    show.add_argument("layer")
+    show.add_argument("keys", nargs="+")
+
+    extract = sub.add_parser("extract", help="Write a layer holding only the selected features")
+    extract.add_argument("layer")
+    extract.add_argument("keys", nargs="+")
+    extract.add_argument("--out-dir", required=True, help="Written as a mock_server recording of the layer")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    if args.command == "fetch":
+        for type_name in args.layers:
+            fetch_layer(type_name, args.dir, args.base_url)
+        return
+
+    with open_layer(args.layer, args.dir) as archive:
+        missing = [key for key in args.keys if not archive.positions(key)]
+        if missing:
+            logger.warning(f"Not in {archive.path}: {', '.join(missing)}")
+        if args.command == "show":
+            for key in args.keys:
+                for raw in archive.raw(key):
+                    print(raw.decode("utf-8", errors="replace"))
+            return
+        os.makedirs(args.out_dir, exist_ok=True)
+        path = os.path.join(args.out_dir, recording_name(args.layer))
+        with open(path, "wb") as f:
+            f.write(archive.document(args.keys))
+        logger.info(f"Wrote {sum(len(archive.positions(key)) for key in args.keys)} features to {path}")
+
+
+if __name__ == "__main__":
+    main()
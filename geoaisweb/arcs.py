@@ -0,0 +1,241 @@
+"""Circular arc reconstruction for densified sector boundaries.
+
+ATZ and CTR rings from GEOAISWEB are mostly circles or arcs densified to
+hundreds of vertices. This stage finds runs of vertices that lie on one
+circle (least-squares fit over a growing window) and re-emits each run with
+the fewest segments that keep the boundary within a stated error in NM.
+Vertices that are not on an arc are kept unchanged.
+"""
+import math
+
+MIN_ARC_POINTS = 5
+MAX_RADIUS_NM = 50.0  # straight edges fit huge circles; those are not arcs
+MAX_STEP_DEG = 15.0   # never draw a segment longer than this many degrees of arc
+
+
+class LocalProjection:
+    """Equirectangular projection in NM around a ring's mean position."""
+
+    def __init__(self, coords):
+        self.lat0 = sum(lat for lat, _ in coords) / len(coords)
+        self.lon0 = sum(lon for _, lon in coords) / len(coords)
+        self.scale = math.cos(math.radians(self.lat0))
+
+    def forward(self, lat, lon):
+        return (lon - self.lon0) * 60.0 * self.scale, (lat - self.lat0) * 60.0
+
+    def inverse(self, x, y):
+        return self.lat0 + y / 60.0, self.lon0 + x / (60.0 * self.scale)
+
+
+def fit_circle(points):
+    """Least-squares (Kasa) circle fit. Returns (cx, cy, r, max residual) or None."""
+    import numpy as np
+
+    xy = np.asarray(points, dtype=np.float64)
+    a = np.column_stack([xy[:, 0], xy[:, 1], np.ones(len(xy))])
+    b = -(xy[:, 0] ** 2 + xy[:, 1] ** 2)
+    (d, e, f), *_ = np.linalg.lstsq(a, b, rcond=None)
+    cx, cy = -d / 2.0, -e / 2.0
+    r2 = cx * cx + cy * cy - f
+    if r2 <= 0:
+        return None
+    r = math.sqrt(r2)
+    residual = float(np.max(np.abs(np.hypot(xy[:, 0] - cx, xy[:, 1] - cy) - r)))
+    return float(cx), float(cy), r, residual
+
+
+def turns_one_way(points):
+    """True when every consecutive vertex triple turns in the same direction."""
+    sign = 0
+    for a, b, c in zip(points, points[1:], points[2:]):
+        cross = (b[0] - a[0]) * (c[1] - b[1]) - (b[1] - a[1]) * (c[0] - b[0])
+        if cross == 0:
+            continue
+        if sign == 0:
+            sign = 1 if cross > 0 else -1
+        elif (cross > 0) != (sign > 0):
+            return False
+    return sign != 0
+
+
+def arc_step(radius_nm, sagitta_nm):
+    """Largest angle (radians) whose chord stays within sagitta_nm of the circle."""
+    if sagitta_nm >= radius_nm:
+        step = math.pi / 2
+    else:
+        step = 2.0 * math.acos(1.0 - sagitta_nm / radius_nm)
+    return min(step, math.radians(MAX_STEP_DEG))
+
+
+def steps_fit(points, circle, sagitta_nm):
+    """True when no chord between consecutive points spans more than arc_step() of the circle."""
+    cx, cy, r, _ = circle
+    largest = arc_step(r, sagitta_nm)
+    previous = math.atan2(points[0][1] - cy, points[0][0] - cx)
+    for x, y in points[1:]:
+        angle = math.atan2(y - cy, x - cx)
+        if abs((angle - previous + math.pi) % (2 * math.pi) - math.pi) > largest:
+            return False
+        previous = angle
+    return True
+
+
+def arc_fit(points, tolerance_nm, sagitta_nm):
+    """Returns the fitted circle if points are within tolerance_nm of an arc, else None.
+
+    Besides the vertices, every original chord must stay within sagitta_nm
+    of the circle: a long straight edge between two vertices on the circle
+    (the flat side of a D) is not part of the arc.
+    """
+    if len(points) < MIN_ARC_POINTS or not turns_one_way(points):
+        return None
+    circle = fit_circle(points)
+    if circle is None or circle[2] > MAX_RADIUS_NM or circle[3] > tolerance_nm:
+        return None
+    if not steps_fit(points, circle, sagitta_nm):
+        return None
+    return circle
+
+
+def sweep(points, cx, cy):
+    """Signed angle swept from the first to the last point around (cx, cy)."""
+    total = 0.0
+    previous = math.atan2(points[0][1] - cy, points[0][0] - cx)
+    for x, y in points[1:]:
+        angle = math.atan2(y - cy, x - cx)
+        delta = (angle - previous + math.pi) % (2 * math.pi) - math.pi
+        total += delta
+        previous = angle
+    return total
+
+
+def emit_arc(points, circle, sagitta_nm):
+    """Points along the fitted circle from points[0] to points[-1] (both original)."""
+    cx, cy, r, _ = circle
+    swept = sweep(points, cx, cy)
+    count = max(1, math.ceil(abs(swept) / arc_step(r, sagitta_nm)))
+    start = math.atan2(points[0][1] - cy, points[0][0] - cx)
+    arc = [points[0]]
+    for k in range(1, count):
+        angle = start + swept * k / count
+        arc.append((cx + r * math.cos(angle), cy + r * math.sin(angle)))
+    arc.append(points[-1])
+    return arc
+
+
+def longest_arc(points, start, tolerance_nm, sagitta_nm):
+    """Returns (end, circle) for the longest arc beginning at start, or None."""
+    end = start + MIN_ARC_POINTS - 1
+    if end >= len(points):
+        return None
+    circle = arc_fit(points[start:end + 1], tolerance_nm, sagitta_nm)
+    if circle is None:
+        return None
+    # Gallop forward, then binary search the last end that still fits
+    good, step = end, 1
+    while True:
+        candidate = min(good + step, len(points) - 1)
+        fitted = arc_fit(points[start:candidate + 1], tolerance_nm, sagitta_nm) if candidate > good else None
+        if fitted is None:
+            break
+        good, circle, step = candidate, fitted, step * 2
+    low, high = good, min(good + step, len(points) - 1)
+    while low < high:
+        middle = (low + high + 1) // 2
+        fitted = arc_fit(points[start:middle + 1], tolerance_nm, sagitta_nm)
+        if fitted is None:
+            high = middle - 1
+        else:
+            low, circle = middle, fitted
+    return low, circle
+
+
+def corner_index(ring):
+    """Index of the sharpest vertex of a closed ring (without its closing point)."""
+    best, best_turn = 0, -1.0
+    for i in range(len(ring)):
+        a, b, c = ring[i - 1], ring[i], ring[(i + 1) % len(ring)]
+        heading_in = math.atan2(b[1] - a[1], b[0] - a[0])
+        heading_out = math.atan2(c[1] - b[1], c[0] - b[0])
+        turn = abs((heading_out - heading_in + math.pi) % (2 * math.pi) - math.pi)
+        if turn > best_turn:
+            best, best_turn = i, turn
+    return best
+
+
+def rotate(ring, start):
+    """Closed ring starting at ring[start]."""
+    rotated = ring[start:-1] + ring[:start]
+    return rotated + [rotated[0]]
+
+
+def reconstruct_arcs(coords, max_error_nm=0.05):
+    """Replaces circular runs of a (lat, lon) ring with minimal arcs.
+
+    Half of max_error_nm is allowed for the chord sagitta, of the original
+    chords as of the re-emitted ones, and a quarter for the circle fit: the
+    original vertices that start and end an arc are kept, so their distance to
+    the circle counts twice. Every re-emitted vertex and segment stays within
+    max_error_nm of the original boundary. Returns (new coords, max error
+    bound in NM).
+    """
+    coords = list(coords)
+    if len(coords) < MIN_ARC_POINTS:
+        return coords, 0.0
+    projection = LocalProjection(coords)
+    points = [projection.forward(lat, lon) for lat, lon in coords]
+    closed = points[0] == points[-1]
+    tolerance = max_error_nm / 4.0
+    sagitta = max_error_nm / 2.0
+
+    # A whole ring on one circle (closing chord included) is re-emitted as a full circle
+    if closed:
+        circle = arc_fit(points[:-1], tolerance, sagitta)
+        if circle is not None and steps_fit(points[-2:], circle, sagitta):
+            cx, cy, r, residual = circle
+            count = max(3, math.ceil(2 * math.pi / arc_step(r, sagitta)))
+            if count < len(points) - 1:
+                start = math.atan2(points[0][1] - cy, points[0][0] - cx)
+                direction = 1 if sweep(points[:-1], cx, cy) > 0 else -1
+                ring = [points[0]] + [
+                    (cx + r * math.cos(start + direction * 2 * math.pi * k / count),
+                     cy + r * math.sin(start + direction * 2 * math.pi * k / count))
+                    for k in range(1, count)
+                ] + [points[0]]
+                return unproject(projection, ring, coords), 2 * residual + sagitta
+        # Start at a corner so no arc wraps around the seam
+        start = corner_index(points[:-1])
+        points, rotated = rotate(points, start), rotate(coords, start)
+    else:
+        rotated = coords
+
+    output, error, i = [points[0]], 0.0, 0
+    while i < len(points) - 1:
+        found = longest_arc(points, i, tolerance, sagitta)
+        if found is not None:
+            end, circle = found
+            arc = emit_arc(points[i:end + 1], circle, sagitta)
+            if len(arc) < end - i + 1:
+                output.extend(arc[1:])
+                error = max(error, 2 * circle[3] + sagitta)
+                i = end
+                continue
+        output.append(points[i + 1])
+        i += 1
+    if len(output) == len(points):
+        return coords, 0.0  # no arcs; keep the ring as it was
+    return unproject(projection, output, rotated), error
+
+
+def unproject(projection, points, coords):
+    """Back to (lat, lon); vertices kept from the input are returned exactly as given."""
+    original = {projection.forward(lat, lon): (lat, lon) for lat, lon in coords}
+    result = []
+    for x, y in points:
+        if (x, y) in original:
+            result.append(original[(x, y)])
+        else:
+            lat, lon = projection.inverse(x, y)
+            result.append((round(lat, 6), round(lon, 6)))
+    return result
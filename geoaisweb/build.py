@@ -0,0 +1,275 @@
+"""The Dataset behind SCT_BUILDER: every layer fetched once, parsed, located in its FIR and cut into sections.
+
+load_dataset() fetches and parses every layer (update_dataset() re-parses
+only what depends on changed layers, for --watch), assign_firs() places the
+points and airways that carry no FIR attribute, and dataset_sections()
+yields the (section, lines) of the whole sectorfile or of one FIR. The
+parsers are the extractors' own (NAVAIDS, APT/HEL, AWY, AWY LABEL), which
+sit next to the geoaisweb package.
+"""
+import logging
+import os
+import time
+
+from geoaisweb.wfs import feature_url, get_base_url
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_content(url, timeout=120):
+    """Downloads a WFS response and returns the raw bytes."""
+    from geoaisweb.client import get_client
+
+    return get_client().get(url, timeout=timeout).content
+
+
+def load_dataset(base_url=None, max_workers=6, helipads=False, vertex_budget=None, max_error_nm=None, arc_error_nm=None,
+                 rank=False):
+    """Fetches every layer once (concurrently) and parses it into a Dataset.
+
+    vertex_budget (per sector layer) or max_error_nm switch the sector layers
+    from their fixed tolerance to adaptive simplification; arc_error_nm
+    rebuilds circular arcs (ATZ/CTR circles) first. With rank the sector
+    rankings are kept in dataset.sector_ranks for lod_dataset().
+    """
+    texts, payloads = fetch_layers(base_url, max_workers, helipads)
+    return parse_layers(texts, payloads, helipads, vertex_budget, max_error_nm, arc_error_nm, rank)
+
+
+def dataset_layers(helipads=False):
+    """Returns (NAVAIDS text layers, other layers) read by load_dataset."""
+    import NAVAIDS
+    from geoaisweb.sectors import LAYERS as SECTOR_LAYERS
+
+    airport_type = "ICA:airport_heliport" if helipads else "ICA:airport"
+    # NAVAIDS layers are read as text and cleaned, as NAVAIDS.py does
+    text_layers = [NAVAIDS.Config.WAYPOINT_TYPE, NAVAIDS.Config.AIRWAY_TYPE, NAVAIDS.Config.VOR_TYPE, NAVAIDS.Config.NDB_TYPE]
+    byte_layers = ["ICA:waypoint", "ICA:navaids", airport_type] + [layer.type_name for layer in SECTOR_LAYERS.values()]
+    return text_layers, byte_layers
+
+
+def fetch_layers(base_url=None, max_workers=6, helipads=False, layers=None):
+    """Downloads every layer (or only those in layers) concurrently.
+
+    Returns ({NAVAIDS layer: text}, {other layer: bytes}).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    import NAVAIDS
+
+    text_layers, byte_layers = dataset_layers(helipads)
+    if layers is not None:
+        text_layers = [name for name in text_layers if name in layers]
+        byte_layers = [name for name in byte_layers if name in layers]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        text_jobs = {name: pool.submit(NAVAIDS.fetch_xml, feature_url(name, base_url)) for name in text_layers}
+        byte_jobs = {name: pool.submit(fetch_content, feature_url(name, base_url)) for name in byte_layers}
+        texts = {name: job.result() for name, job in text_jobs.items()}
+        payloads = {name: job.result() for name, job in byte_jobs.items()}
+    logger.info(f"Fetched {len(texts) + len(payloads)} layers in {time.perf_counter() - started:.1f}s")
+    from geoaisweb.client import get_client
+    logger.info(f"HTTP: {get_client().summary()}")
+    return texts, payloads
+
+
+def parse_layers(texts, payloads, helipads=False, vertex_budget=None, max_error_nm=None, arc_error_nm=None, rank=False):
+    """Parses the layers returned by fetch_layers into a Dataset."""
+    from geoaisweb.dataset import Dataset
+
+    dataset = Dataset(helipads=helipads)
+    update_dataset(dataset, texts, payloads, None, vertex_budget, max_error_nm, arc_error_nm, rank)
+    return dataset
+
+
+def update_dataset(dataset, texts, payloads, changed=None, vertex_budget=None, max_error_nm=None, arc_error_nm=None,
+                   rank=False):
+    """Re-parses into dataset only what depends on the changed layers (None for all).
+
+    texts and payloads hold every layer, as returned by fetch_layers. Returns
+    the names of the Dataset fields that were rebuilt.
+    """
+    import xml.etree.ElementTree as ET
+
+    import APT_EXTRACTOR
+    import AWY_EXTRACTOR
+    import AWY_LABEL_EXTRACTOR
+    import HEL_EXTRACTOR
+    import NAVAIDS
+    from geoaisweb.airway_levels import airway_classes
+    from geoaisweb.regions import parse_fir_polygons
+    from geoaisweb.sectors import LAYERS as SECTOR_LAYERS, process_layers
+    from geoaisweb.simplify import format_report
+    from geoaisweb.validation import validate_sectors
+
+    def affected(*layers):
+        return changed is None or any(layer in changed for layer in layers)
+
+    airport_type = "ICA:airport_heliport" if dataset.helipads else "ICA:airport"
+    started = time.perf_counter()
+    updated = []
+    if affected(NAVAIDS.Config.WAYPOINT_TYPE):
+        dataset.waypoints = NAVAIDS.parse_xml_safely(texts[NAVAIDS.Config.WAYPOINT_TYPE], NAVAIDS.parse_waypoints)
+        updated.append("waypoints")
+    if affected(NAVAIDS.Config.VOR_TYPE):
+        dataset.vors = NAVAIDS.parse_xml_safely(texts[NAVAIDS.Config.VOR_TYPE], NAVAIDS.parse_vor)
+        updated.append("vors")
+    if affected(NAVAIDS.Config.NDB_TYPE):
+        dataset.ndbs = NAVAIDS.parse_xml_safely(texts[NAVAIDS.Config.NDB_TYPE], NAVAIDS.parse_ndb)
+        updated.append("ndbs")
+
+    # The airway layer is parsed once and shared by the three airway consumers
+    airway_root = None
+    if affected(NAVAIDS.Config.WAYPOINT_TYPE, NAVAIDS.Config.AIRWAY_TYPE):
+        airway_root = ET.fromstring(NAVAIDS.clean_xml(texts[NAVAIDS.Config.AIRWAY_TYPE]))
+        for waypoint in dataset.waypoints.values():
+            waypoint['used_in_airways'].clear()
+        airways = NAVAIDS.match_airway_fixes(airway_root, dataset.waypoints)
+        dataset.fixes_in_airways = {fix for airway in airways.values() for fix in airway}
+        dataset.fixes_not_in_airways = set(dataset.waypoints) - dataset.fixes_in_airways
+        updated.append("fixes_in_airways")
+    if affected("ICA:waypoint", "ICA:navaids"):
+        dataset.airway_fixes = AWY_EXTRACTOR.load_fixes(ET.fromstring(payloads["ICA:waypoint"]), ET.fromstring(payloads["ICA:navaids"]))
+        updated.append("airway_fixes")
+    if affected(NAVAIDS.Config.AIRWAY_TYPE):
+        dataset.airways = AWY_EXTRACTOR.extract_airways(airway_root)
+        dataset.airway_data = AWY_LABEL_EXTRACTOR.airway_data_from_root(airway_root)
+        dataset.airway_upper = airway_classes(airway_root)
+        updated += ["airways", "airway_data", "airway_upper"]
+
+    if affected(airport_type):
+        if dataset.helipads:
+            dataset.airports = HEL_EXTRACTOR.parse_airports(payloads[airport_type])
+        else:
+            dataset.airports = APT_EXTRACTOR.parse_airports(payloads[airport_type], None, APT_EXTRACTOR.TIPO_UTIL_FILTER)
+        updated.append("airports")
+
+    # Sector layers are parsed and simplified in worker processes, one layer each
+    sector_kinds = [kind for kind, layer in SECTOR_LAYERS.items() if affected(layer.type_name)]
+    results = process_layers({kind: payloads[SECTOR_LAYERS[kind].type_name] for kind in sector_kinds},
+                             vertex_budget=vertex_budget, max_error_nm=max_error_nm, arc_error_nm=arc_error_nm, rank=rank)
+    for kind, result in results.items():
+        dataset.sectors[kind] = result.fir_sectors
+        if rank:
+            dataset.sector_ranks[kind] = result.lod
+        if result.report:
+            *details, total = format_report(result.report)
+            for line in details:
+                logger.debug(f"{kind} {line}")
+            logger.info(f"{kind} {total}")
+        logger.debug(result.throughput())
+        updated.append(f"sectors[{kind}]")
+    # Closure, validity (repaired where possible) and sibling overlaps of what was just simplified
+    validate_sectors(dataset, sector_kinds)
+    if affected("ICA:SETOR_FIR"):
+        dataset.fir_polygons = parse_fir_polygons(ET.fromstring(payloads["ICA:SETOR_FIR"]))
+        updated.append("fir_polygons")
+    logger.info(f"Parsed {'dataset' if changed is None else ', '.join(updated) or 'nothing'} in {time.perf_counter() - started:.1f}s")
+    return updated
+
+
+def assign_firs(dataset):
+    """Locates waypoints, navaids and airways, which have no FIR attribute, inside the SETOR_FIR polygons."""
+    from geoaisweb.fir_index import locator
+
+    started = time.perf_counter()
+    index = locator(dataset.fir_polygons)
+
+    # One bulk query for every point, split back per layer afterwards
+    idents = list(dataset.waypoints)
+    points = [dataset.waypoints[ident]['coordinates'] for ident in idents]
+    points += [(vor['lat'], vor['lon']) for vor in dataset.vors]
+    points += [(ndb['lat'], ndb['lon']) for ndb in dataset.ndbs]
+    airway_owners = []
+    for txtdesig, segments in dataset.airways.items():
+        for segment in segments:
+            for lon, lat in segment.segments:
+                points.append((lat, lon))
+                airway_owners.append(txtdesig)
+    label_owners = []
+    for txtdesig, airwayseg, routedist, coord_tuples in dataset.airway_data:
+        points.extend(coord_tuples)
+        label_owners.extend([txtdesig] * len(coord_tuples))
+    firs = index.assign(points)
+
+    offset = len(idents)
+    dataset.waypoint_firs = dict(zip(idents, firs[:offset]))
+    dataset.vor_firs = firs[offset:offset + len(dataset.vors)]
+    offset += len(dataset.vors)
+    dataset.ndb_firs = firs[offset:offset + len(dataset.ndbs)]
+    offset += len(dataset.ndbs)
+
+    # An airway belongs to every FIR one of its vertices falls in
+    dataset.airway_firs = {}
+    for txtdesig, fir in zip(airway_owners, firs[offset:offset + len(airway_owners)]):
+        dataset.airway_firs.setdefault(txtdesig, set()).add(fir)
+    offset += len(airway_owners)
+    dataset.airway_data_firs = {}
+    for txtdesig, fir in zip(label_owners, firs[offset:]):
+        dataset.airway_data_firs.setdefault(txtdesig, set()).add(fir)
+    logger.info(f"Assigned FIRs to {len(points)} points in {time.perf_counter() - started:.2f}s")
+
+
+def info_lines(name, base_url):
+    # SOURCE_DATE_EPOCH pins the date, so that builds of the same data are byte-identical
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    generated = time.gmtime(int(epoch)) if epoch else time.localtime()
+    yield f"//{name}"
+    yield f"//Generated from {base_url} on {time.strftime('%Y-%m-%d %H:%M:%S', generated)}"
+
+
+def airport_lines(dataset, fir=None):
+    import APT_EXTRACTOR
+    import HEL_EXTRACTOR
+
+    if dataset.helipads:
+        fir_filter = {fir: True} if fir else {code: True for code in APT_EXTRACTOR.DEFAULT_FIR_FILTER}
+        return HEL_EXTRACTOR.airport_lines(dataset.airports, fir_filter)
+    fir_filter = {fir} if fir else APT_EXTRACTOR.DEFAULT_FIR_FILTER
+    return APT_EXTRACTOR.airport_lines(dataset.airports.where(fir_filter))
+
+
+def airway_lines(dataset, fir=None):
+    """Returns (upper, lower) track and label lines, limited to airways touching fir."""
+    import AWY_EXTRACTOR
+    import AWY_LABEL_EXTRACTOR
+
+    airways = {
+        txtdesig: segments for txtdesig, segments in dataset.airways.items()
+        if fir is None or fir in dataset.airway_firs.get(txtdesig, ())
+    }
+    upper, lower = AWY_EXTRACTOR.build_airway_lines(airways, dataset.airway_fixes, classes=dataset.airway_upper)
+    airway_data = [
+        record for record in dataset.airway_data
+        if fir is None or fir in dataset.airway_data_firs.get(record[0], ())
+    ]
+    for is_upper, label in AWY_LABEL_EXTRACTOR.airway_labels(airway_data, classes=dataset.airway_upper):
+        (upper if is_upper else lower).append(label)
+    return upper, lower
+
+
+def dataset_sections(dataset, fir=None, name="BRAZIL SECTORFILE", base_url=None):
+    """Yields (section, lines) for the whole dataset, or only the features of one FIR."""
+    import NAVAIDS
+    from geoaisweb.sectors import LAYERS as SECTOR_LAYERS, sector_lines
+
+    def in_fir(point_fir):
+        return fir is None or point_fir == fir
+
+    yield "INFO", info_lines(f"{name} {fir}" if fir else name, get_base_url(base_url))
+
+    fixes_in_airways = {ident for ident in dataset.fixes_in_airways if in_fir(dataset.waypoint_firs.get(ident))}
+    fixes_not_in_airways = {ident for ident in dataset.fixes_not_in_airways if in_fir(dataset.waypoint_firs.get(ident))}
+    yield "FIXES", NAVAIDS.fixes_lines(dataset.waypoints, fixes_in_airways, fixes_not_in_airways)
+    yield "VOR", NAVAIDS.navaid_lines(vor for vor, vor_fir in zip(dataset.vors, dataset.vor_firs or [None] * len(dataset.vors)) if in_fir(vor_fir))
+    yield "NDB", NAVAIDS.navaid_lines(ndb for ndb, ndb_fir in zip(dataset.ndbs, dataset.ndb_firs or [None] * len(dataset.ndbs)) if in_fir(ndb_fir))
+    yield "AIRPORT", airport_lines(dataset, fir)
+
+    for kind, layer in SECTOR_LAYERS.items():
+        fir_sectors = {key: lines for key, lines in dataset.sectors[kind].items() if in_fir(key)}
+        yield layer.section, sector_lines(layer, fir_sectors)
+
+    upper, lower = airway_lines(dataset, fir)
+    yield "HIGH AIRWAY", upper
+    yield "LOW AIRWAY", lower
@@ -0,0 +1,12 @@
+"""Location of on-disk caches shared by the extractors."""
+import os
+
+CACHE_DIR_ENV = "GEOAISWEB_CACHE_DIR"
+
+
+def cache_dir(*parts):
+    """Returns (and creates) a cache directory, $GEOAISWEB_CACHE_DIR or ~/.cache/geoaisweb."""
+    root = os.environ.get(CACHE_DIR_ENV) or os.path.join(os.path.expanduser("~"), ".cache", "geoaisweb")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,167 @@
+"""Canonical ordering of output sections: the same features always give the same bytes.
+
+The WFS returns features in whatever order the server picks, and several
+writers keep that order (VOR/NDB lines, sector rings, the //FIR groups of the
+sector layers, airway polylines). This reorders a section without changing
+what it draws:
+
+* '//FIR <name>' lines open groups (blank lines right before them belong to
+  the group); groups are sorted by FIR name, points outside every FIR last,
+  and groups of the same FIR are merged;
+* inside a group, consecutive lines sharing a run key form one run, kept
+  intact: a sector ring ('T;CTA name;...'), the polylines of one airway
+  ('T;UM78;...'), one label ('L;UM78;...') or one point line (its ident);
+* runs are sorted by type (points, then T tracks, then L labels), run key and
+  text. FIXES keep the fixes on airways (flag 0) before the others.
+
+Comments or blank lines before the first run stay first. Sections too large
+for max_memory are sorted in runs spilled to temporary files and merged back
+(external merge sort), so memory stays bounded whatever the section size.
+
+With SOURCE_DATE_EPOCH set (see reproducible-builds.org), SCT_BUILDER also
+writes that time in the [INFO] header instead of the current time, so two
+builds of the same data are byte-identical and an unchanged sectorfile is
+left untouched on disk.
+"""
+import heapq
+import itertools
+import logging
+import pickle
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+SORT_MAX_MEMORY = 16 << 20   # bytes of records sorted in memory before a run is spilled
+SPILL_BATCH = 64 << 10       # bytes per pickle in a spilled run: what the merge holds of each run
+
+RUN_RANKS = {"T;": 1, "L;": 2}
+
+
+def run_key(line):
+    """'T;CTA AZ CTA 1' for track and label lines, the ident for point lines."""
+    if line[:2] in RUN_RANKS:
+        return ";".join(line.split(";", 2)[:2])
+    return line.split(";", 1)[0]
+
+
+def _fixes_flag(line):
+    fields = line.split(";")
+    return fields[3] if len(fields) > 3 else ""
+
+
+# Extra sort field per section, taken from the first line of each run
+SECTION_KEYS = {"FIXES": _fixes_flag}
+
+
+def _is_data(line):
+    return bool(line.strip()) and not line.startswith("//")
+
+
+def split_preamble(lines):
+    """(preamble, lines): comments before the first group or run, and an iterator over the rest."""
+    lines = iter(lines)
+    leading = []
+    for line in lines:
+        if line.startswith("//FIR") or _is_data(line):
+            lines = itertools.chain([line], lines)
+            break
+        leading.append(line)
+    # Blank lines right before the first group or run belong to it
+    cut = max((i + 1 for i, line in enumerate(leading) if line.strip()), default=0)
+    return leading[:cut], itertools.chain(leading[cut:], lines)
+
+
+def runs(lines, section=None, trailer=None):
+    """Yields ((group, header, rank, extra, run key), run text) records; lines after the last run go to trailer."""
+    section_key = SECTION_KEYS.get(section)
+    group, header = (0, ""), ""
+    pending, run, key, sort = [], [], None, None
+    for line in lines:
+        data = _is_data(line)
+        if data and run and not pending and run_key(line) == key:
+            run.append(line)
+            continue
+        if run:
+            yield sort, "\n".join(run)
+            run = []
+        if line.startswith("//FIR"):
+            fir = line[len("//FIR"):].strip()
+            group, header = ((1, fir) if fir else (2, "")), "\n".join(pending + [line])
+            pending = []
+        elif data:
+            key = run_key(line)
+            sort = (group, header, RUN_RANKS.get(line[:2], 0), section_key(line) if section_key else "", key)
+            run, pending = pending + [line], []
+        else:
+            pending.append(line)
+    if run:
+        yield sort, "\n".join(run)
+    if trailer is not None:
+        trailer.extend(pending)
+
+
+def _spill(records):
+    spill = tempfile.TemporaryFile()
+    batch, size = [], 0
+    for record in records:
+        batch.append(record)
+        size += len(record[1]) + 64
+        if size >= SPILL_BATCH:
+            pickle.dump(batch, spill, pickle.HIGHEST_PROTOCOL)
+            batch, size = [], 0
+    if batch:
+        pickle.dump(batch, spill, pickle.HIGHEST_PROTOCOL)
+    spill.seek(0)
+    return spill
+
+
+def _unspill(spill):
+    while True:
+        try:
+            yield from pickle.load(spill)
+        except EOFError:
+            return
+
+
+def external_sort(records, max_memory=SORT_MAX_MEMORY):
+    """Sorted (key, text) records; runs above max_memory bytes are spilled to temp files and merged."""
+    chunk, used, spills = [], 0, []
+    try:
+        for record in records:
+            chunk.append(record)
+            used += len(record[1]) + 64
+            if used >= max_memory:
+                chunk.sort()
+                spills.append(_spill(chunk))
+                chunk, used = [], 0
+        chunk.sort()
+        if not spills:
+            yield from chunk
+            return
+        logger.debug(f"Merging {len(spills) + 1} sorted runs")
+        yield from heapq.merge(*map(_unspill, spills), chunk)
+    finally:
+        for spill in spills:
+            spill.close()
+
+
+def canonical_lines(lines, section=None, max_memory=SORT_MAX_MEMORY):
+    """Yields the lines of one section in canonical order (see the module docstring)."""
+    preamble, lines = split_preamble(lines)
+    yield from preamble
+    trailer = []
+    current = None
+    for (group, header, *_), text in external_sort(runs(lines, section, trailer), max_memory):
+        if (group, header) != current:
+            current = (group, header)
+            if header:
+                yield from header.split("\n")
+        yield from text.split("\n")
+    yield from trailer
+
+
+def write_lines(path, lines, section=None):
+    """Writes lines in canonical order, one per line ('\\n' line ends, UTF-8)."""
+    with open(path, "w", encoding="utf-8", newline="\n") as output_file:
+        for line in canonical_lines(lines, section):
+            output_file.write(line + "\n")
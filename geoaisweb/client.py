@@ -0,0 +1,265 @@
+"""Shared HTTP client for the WFS requests of every script.
+
+One pooled session per process with connect/read timeouts, retries on
+connection errors and 502/503/504, and compressed transfer: Accept-Encoding
+lists every encoding urllib3 can decode here (gzip, deflate, plus br/zstd
+when brotli/zstandard are installed), and bodies are decompressed while they
+stream into the parser. Every request records wire bytes, body bytes,
+time to first byte and throughput (RequestMetrics; logged at DEBUG).
+
+Set GEOAISWEB_HTTP2=1 to use httpx with HTTP/2 instead of requests when
+httpx and h2 are installed.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+HTTP2_ENV = "GEOAISWEB_HTTP2"
+CONNECT_TIMEOUT = 10.0
+READ_TIMEOUT = 120.0
+POOL_SIZE = 16
+RETRIES = 2
+CHUNK_SIZE = 64 * 1024
+
+
+class HttpError(Exception):
+    """A request that failed: connection, timeout, or (HttpStatusError) an error status."""
+
+
+class HttpTimeout(HttpError):
+    pass
+
+
+class HttpStatusError(HttpError):
+    def __init__(self, response):
+        super().__init__(f"{response.status_code} error for url: {response.url}")
+        self.response = response
+        self.status_code = response.status_code
+
+
+@dataclass
+class RequestMetrics:
+    method: str
+    url: str
+    status: int
+    wire_bytes: int
+    body_bytes: int
+    content_encoding: str
+    http_version: str
+    first_byte_s: float
+    total_s: float
+
+    @property
+    def throughput(self):
+        """Body bytes per second."""
+        return self.body_bytes / self.total_s if self.total_s > 0 else 0.0
+
+    def __str__(self):
+        return (f"{self.method} {self.status} {self.url}: {self.wire_bytes} bytes on the wire, {self.body_bytes} decoded"
+                f" ({self.content_encoding or 'identity'}, {self.http_version}), first byte {self.first_byte_s * 1000:.0f} ms,"
+                f" total {self.total_s:.2f}s, {self.throughput / 1e6:.1f} MB/s")
+
+
+@dataclass
+class Response:
+    url: str
+    status_code: int
+    headers: dict
+    content: bytes
+    encoding: str
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        """Body decoded like requests' Response.text (ISO-8859-1 for text/* without a charset)."""
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HttpStatusError(self)
+
+
+class Stream:
+    """A response whose body is read in decoded chunks; see HttpClient.stream."""
+
+    def __init__(self, url, status_code, headers, encoding, chunks):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.encoding = encoding
+        self._chunks = chunks
+        self.body_bytes = 0
+
+    def iter_bytes(self):
+        for chunk in self._chunks:
+            self.body_bytes += len(chunk)
+            yield chunk
+
+
+def text_encoding(headers):
+    from requests.utils import get_encoding_from_headers
+
+    return get_encoding_from_headers(headers)
+
+
+def accept_encoding():
+    from urllib3.util import make_headers
+
+    return make_headers(accept_encoding=True)["accept-encoding"]
+
+
+class _RequestsBackend:
+    http_version = "HTTP/1.1"
+
+    def __init__(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util import Retry
+
+        self.errors = (requests.RequestException,)
+        self.timeouts = (requests.Timeout,)
+        self.session = requests.Session()
+        retry = Retry(total=RETRIES, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                      allowed_methods=("GET", "HEAD"), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = accept_encoding()
+
+    @contextmanager
+    def open(self, method, url, headers, timeout, chunk_size):
+        with self.session.request(method, url, headers=headers, timeout=timeout, stream=True) as response:
+            yield (response.status_code, response.headers, response.iter_content(chunk_size),
+                   lambda: response.raw.tell())
+
+
+class _HttpxBackend:
+    http_version = "HTTP/2"
+
+    def __init__(self):
+        import httpx
+
+        self.errors = (httpx.HTTPError,)
+        self.timeouts = (httpx.TimeoutException,)
+        self.client = httpx.Client(
+            http2=True, headers={"Accept-Encoding": accept_encoding()},
+            limits=httpx.Limits(max_connections=POOL_SIZE),
+            transport=httpx.HTTPTransport(http2=True, retries=RETRIES),
+        )
+
+    @contextmanager
+    def open(self, method, url, headers, timeout, chunk_size):
+        import httpx
+
+        connect, read = timeout
+        with self.client.stream(method, url, headers=headers, timeout=httpx.Timeout(read, connect=connect)) as response:
+            self.http_version = response.http_version
+            yield response.status_code, response.headers, response.iter_bytes(chunk_size), lambda: response.num_bytes_downloaded
+
+
+class HttpClient:
+    """Pooled HTTP client; thread safe. Use get() for whole bodies and stream() to parse while downloading."""
+
+    def __init__(self, http2=None, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.metrics = []
+        self._lock = threading.Lock()
+        if http2 is None:
+            http2 = os.environ.get(HTTP2_ENV, "") not in ("", "0")
+        self.backend = None
+        if http2:
+            from importlib.util import find_spec
+
+            try:
+                # httpx needs h2 for HTTP/2
+                if find_spec("h2") is None:
+                    raise ImportError("No module named 'h2'")
+                self.backend = _HttpxBackend()
+            except ImportError:
+                logger.warning("httpx/h2 not installed; using requests over HTTP/1.1")
+        if self.backend is None:
+            self.backend = _RequestsBackend()
+
+    def _timeout(self, timeout):
+        return self.connect_timeout, timeout or self.read_timeout
+
+    def _record(self, method, url, status, wire_bytes, body_bytes, headers, started, first_byte):
+        metrics = RequestMetrics(method, url, status, wire_bytes, body_bytes, headers.get("Content-Encoding", ""),
+                                 self.backend.http_version, first_byte - started, time.perf_counter() - started)
+        with self._lock:
+            self.metrics.append(metrics)
+        logger.debug(str(metrics))
+
+    @contextmanager
+    def stream(self, url, timeout=None, headers=None, chunk_size=CHUNK_SIZE, check=True):
+        """Context manager yielding a Stream; its iter_bytes() gives decompressed chunks as they arrive."""
+        started = time.perf_counter()
+        try:
+            with self.backend.open("GET", url, headers, self._timeout(timeout), chunk_size) as (status, response_headers, chunks, wire):
+                first_byte = time.perf_counter()
+                stream = Stream(url, status, response_headers, text_encoding(response_headers), chunks)
+                if check and status >= 400:
+                    raise HttpStatusError(Response(url, status, response_headers, b"", stream.encoding))
+                try:
+                    yield stream
+                finally:
+                    self._record("GET", url, status, wire(), stream.body_bytes, response_headers, started, first_byte)
+        except self.backend.timeouts as e:
+            raise HttpTimeout(f"Request timed out: {url}: {e}") from e
+        except self.backend.errors as e:
+            raise HttpError(f"Request failed: {url}: {e}") from e
+
+    def request(self, method, url, timeout=None, headers=None, check=True):
+        """Sends a GET or HEAD request and returns the Response with the whole (decoded) body."""
+        started = time.perf_counter()
+        try:
+            with self.backend.open(method, url, headers, self._timeout(timeout), CHUNK_SIZE) as (status, response_headers, chunks, wire):
+                first_byte = time.perf_counter()
+                content = b"".join(chunks) if method != "HEAD" else b""
+                self._record(method, url, status, wire(), len(content), response_headers, started, first_byte)
+        except self.backend.timeouts as e:
+            raise HttpTimeout(f"Request timed out: {url}: {e}") from e
+        except self.backend.errors as e:
+            raise HttpError(f"Request failed: {url}: {e}") from e
+        response = Response(url, status, response_headers, content, text_encoding(response_headers))
+        if check:
+            response.raise_for_status()
+        return response
+
+    def get(self, url, timeout=None, headers=None, check=True):
+        return self.request("GET", url, timeout, headers, check)
+
+    def head(self, url, timeout=None, headers=None):
+        return self.request("HEAD", url, timeout, headers, check=False)
+
+    def summary(self):
+        """One line totalling the recorded requests."""
+        with self._lock:
+            metrics = list(self.metrics)
+        wire = sum(m.wire_bytes for m in metrics)
+        body = sum(m.body_bytes for m in metrics)
+        slowest = max((m.total_s for m in metrics), default=0.0)
+        return (f"{len(metrics)} requests, {wire} bytes on the wire for {body} bytes of data"
+                f" ({wire / body if body else 1:.0%}), slowest {slowest:.2f}s")
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide HttpClient."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -0,0 +1,45 @@
+"""In-memory dataset shared by the combined and per-FIR sectorfile builds."""
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Dataset:
+    """Every layer fetched and parsed once, in the shapes the extractors use.
+
+    waypoints / fixes_in_airways / fixes_not_in_airways / vors / ndbs come
+    from NAVAIDS, airports (an AerodromeTable) from APT_EXTRACTOR or
+    HEL_EXTRACTOR, airways and airway_fixes from AWY_EXTRACTOR, airway_data
+    from AWY_LABEL_EXTRACTOR, airway_upper (txtdesig -> True for upper) from
+    geoaisweb.airway_levels and sectors maps a layer kind ('FIR', 'CTA', ...) to {fir: formatted lines}.
+    fir_polygons holds the unsimplified SETOR_FIR outer rings as (lat, lon).
+    validation maps a sector kind to its geoaisweb.validation.LayerValidation.
+    sector_ranks maps a sector kind to its (fir, geoaisweb.simplify.RankedRing)
+    pairs when the build was asked for levels of detail.
+    """
+    waypoints: dict = field(default_factory=dict)
+    fixes_in_airways: set = field(default_factory=set)
+    fixes_not_in_airways: set = field(default_factory=set)
+    vors: list = field(default_factory=list)
+    ndbs: list = field(default_factory=list)
+    airports: object = None
+    helipads: bool = False
+    airways: dict = field(default_factory=dict)
+    airway_fixes: dict = field(default_factory=dict)
+    airway_data: list = field(default_factory=list)
+    airway_upper: dict = field(default_factory=dict)
+    sectors: dict = field(default_factory=dict)
+    fir_polygons: dict = field(default_factory=dict)
+    validation: dict = field(default_factory=dict)
+    sector_ranks: dict = field(default_factory=dict)
+
+    # FIR assignment for layers without a FIR attribute, filled by assign_firs()
+    waypoint_firs: dict = field(default_factory=dict)
+    vor_firs: list = field(default_factory=list)
+    ndb_firs: list = field(default_factory=list)
+    airway_firs: dict = field(default_factory=dict)
+    airway_data_firs: dict = field(default_factory=dict)
+
+    @property
+    def firs(self):
+        """FIR identifiers known from SETOR_FIR, sorted."""
+        return sorted(self.fir_polygons)
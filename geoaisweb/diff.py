@@ -0,0 +1,309 @@
+"""Semantic diff of two builds: what was added, removed, moved or changed.
+
+Line diffs of two outputs are noisy: features change places when the server
+returns them in another order, and coordinates are printed with more or less
+precision. This compares features instead. Every line of a build (.sct,
+navaids.txt, cta.txt, awy.txt, ... in any mix) is read into a feature keyed
+by layer and name:
+
+    FIXES / VOR / NDB / AIRPORT   ident            one point per line
+    FIR / CTA / TMA / CTR / ATZ   sector name      ring vertices ('T;CTA name;lat;lon;')
+    AIRWAY                        designator       fix sequence ('T;UM78;FIX;FIX;')
+    LABEL                         designator       label points ('L;UM78;lat;lon;')
+
+The two builds are joined on those keys with dicts (a hash join), so the cost
+is linear in the number of lines. A feature present on both sides is moved
+when its points are further apart than min_nm (Hausdorff distance in NM, so a
+reshaped sector counts as moved too), and changed when its values (frequency,
+fix sequence, FIR or upper/lower section) differ.
+
+A GeoPackage saved with SCT_BUILDER --gpkg-out is compared through the lines
+of the sectorfile it would build. Directories are compared file by file.
+
+    python -m geoaisweb.diff old/brazil.sct new/brazil.sct
+    python -m geoaisweb.diff old_dir new_dir --json changes.json
+    python -m geoaisweb.diff 2601.gpkg 2602.gpkg --min-nm 0.1
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from dataclasses import asdict, dataclass, field
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_NM = 3440.065
+MIN_MOVE_NM = 0.01  # DMS output keeps 0.001" (about 0.03 m), the decimal sector files 1e-6 deg
+SEQUENCE_LAYERS = {"FIR", "CTA", "TMA", "CTR", "ATZ", "AIRWAY"}  # vertex order is part of the feature
+NAVAID_FILES = {"vor": "VOR", "ndb": "NDB"}
+
+
+@dataclass
+class Feature:
+    points: list = field(default_factory=list)   # (lat, lon)
+    values: list = field(default_factory=list)   # per line: frequency, fix ident, ...
+    groups: set = field(default_factory=set)     # //FIR group or airway section it appeared in
+
+
+@dataclass
+class Change:
+    layer: str
+    key: str
+    change: str                 # added, removed, moved or changed
+    distance_nm: float = None
+    detail: str = ""
+
+
+def dms_to_degrees(text):
+    """'S030.41.49.214' -> -30.697004; None when text is not a DMS coordinate."""
+    if len(text) < 8 or text[0] not in "NSEW":
+        return None
+    parts = text[1:].split(".")
+    if len(parts) != 4:
+        return None
+    try:
+        value = int(parts[0]) + int(parts[1]) / 60 + float(f"{parts[2]}.{parts[3]}") / 3600
+    except ValueError:
+        return None
+    return -value if text[0] in "SW" else value
+
+
+def _float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def read_lines(lines, features=None, default_layer=None):
+    """Adds the features of output lines to {(layer, key): Feature}; returns it."""
+    features = {} if features is None else features
+    section = default_layer
+    group = ""
+
+    def feature(layer, key):
+        found = features.get((layer, key))
+        if found is None:
+            found = features[(layer, key)] = Feature()
+        found.groups.add(group)
+        return found
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("////"):
+            continue
+        if line.startswith("["):
+            section, group = line.strip("[]"), ""
+            continue
+        if line.startswith("//"):
+            if line.startswith("//FIR "):
+                group = line[6:]
+            continue
+        fields = line.split(";")
+        if len(fields) < 3:
+            continue
+        if fields[0] == "T" and len(fields) >= 4:
+            lat, lon = _float(fields[2]), _float(fields[3])
+            if lat is not None and lon is not None:
+                kind, _, name = fields[1].partition(" ")
+                feature(kind, name).points.append((lat, lon))
+            else:
+                airway = feature("AIRWAY", fields[1])
+                airway.values.append(fields[2])
+                if section in ("HIGH AIRWAY", "LOW AIRWAY"):
+                    airway.groups.add(section)
+            continue
+        if fields[0] == "L" and len(fields) >= 4:
+            lat, lon = dms_to_degrees(fields[2]), dms_to_degrees(fields[3])
+            if lat is not None and lon is not None:
+                feature("LABEL", fields[1]).points.append((lat, lon))
+            continue
+        # Point layers: the position of the first DMS pair tells them apart
+        for position, layer in ((1, "FIXES"), (2, section if section in ("VOR", "NDB") else "NAVAID"), (3, "AIRPORT")):
+            if len(fields) > position + 1:
+                lat, lon = dms_to_degrees(fields[position]), dms_to_degrees(fields[position + 1])
+                if lat is not None and lon is not None:
+                    point = feature(layer, fields[0])
+                    point.points.append((lat, lon))
+                    point.values.append(";".join(fields[1:position] + fields[position + 2:]).rstrip(";"))
+                    break
+    return features
+
+
+def read_build(path):
+    """{(layer, key): Feature} of one output file or GeoPackage."""
+    if path.endswith(".gpkg"):
+        return read_dataset_build(path)
+    stem = os.path.splitext(os.path.basename(path))[0].split(".")[0].lower()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return read_lines(f, default_layer=NAVAID_FILES.get(stem))
+
+
+def read_dataset_build(path):
+    """Features of the sectorfile a GeoPackage dataset builds (geoaisweb.build.dataset_sections)."""
+    from geoaisweb import geopackage
+    from geoaisweb.build import dataset_sections
+
+    dataset = geopackage.read_dataset(path)
+    features = {}
+    for section, lines in dataset_sections(dataset, base_url=path):
+        if section != "INFO":
+            read_lines([f"[{section}]", *lines], features)
+    return features
+
+
+def _nearest_nm(points, others):
+    """Distance in NM from each projected point to the nearest of others (shapely STRtree)."""
+    import shapely
+
+    tree = shapely.STRtree(shapely.points(others))
+    _, distances = tree.query_nearest(shapely.points(points), return_distance=True, all_matches=False)
+    return distances
+
+
+def hausdorff_nm(first, second, chunk=1024):
+    """Symmetric Hausdorff distance in NM between two (lat, lon) point lists.
+
+    With shapely, nearest neighbours come from an STRtree on a local
+    equirectangular projection (NM); otherwise haversine between every pair
+    of points, chunk rows at a time so that long FIR rings do not need a
+    full distance matrix.
+    """
+    import numpy as np
+
+    a = np.asarray(first, dtype=np.float64)
+    b = np.asarray(second, dtype=np.float64)
+    try:
+        import shapely  # noqa: F401
+    except ImportError:
+        shapely = None
+    if shapely is not None:
+        scale = 60.0 * math.cos(math.radians((a[:, 0].mean() + b[:, 0].mean()) / 2))
+        a_nm = np.column_stack((a[:, 1] * scale, a[:, 0] * 60.0))
+        b_nm = np.column_stack((b[:, 1] * scale, b[:, 0] * 60.0))
+        return float(max(_nearest_nm(a_nm, b_nm).max(), _nearest_nm(b_nm, a_nm).max()))
+
+    a, b = np.radians(a), np.radians(b)
+    nearest_b = np.full(len(b), np.inf)
+    farthest_a = 0.0
+    for start in range(0, len(a), chunk):
+        rows = a[start:start + chunk]
+        dlat = rows[:, None, 0] - b[None, :, 0]
+        dlon = rows[:, None, 1] - b[None, :, 1]
+        h = np.sin(dlat / 2) ** 2 + np.cos(rows[:, None, 0]) * np.cos(b[None, :, 0]) * np.sin(dlon / 2) ** 2
+        distances = 2 * EARTH_RADIUS_NM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+        farthest_a = max(farthest_a, float(distances.min(axis=1).max()))
+        np.minimum(nearest_b, distances.min(axis=0), out=nearest_b)
+    return max(farthest_a, float(nearest_b.max()))
+
+
+def _values(layer, feature):
+    return feature.values if layer in SEQUENCE_LAYERS else sorted(feature.values)
+
+
+def compare(old, new, min_nm=MIN_MOVE_NM):
+    """Changes between two {(layer, key): Feature}, sorted by layer, change and key."""
+    changes = []
+    for layer, key in old.keys() - new.keys():
+        changes.append(Change(layer, key, "removed"))
+    for layer, key in new.keys() - old.keys():
+        changes.append(Change(layer, key, "added"))
+    for layer, key in old.keys() & new.keys():
+        before, after = old[(layer, key)], new[(layer, key)]
+        # Same points in another order (a ring starting elsewhere) is not a move
+        if before.points != after.points and before.points and after.points and \
+                sorted(before.points) != sorted(after.points):
+            distance = hausdorff_nm(before.points, after.points)
+            if distance > min_nm:
+                changes.append(Change(layer, key, "moved", round(distance, 3),
+                                      f"{len(before.points)} -> {len(after.points)} points"
+                                      if len(before.points) != len(after.points) else ""))
+        details = []
+        if _values(layer, before) != _values(layer, after):
+            details.append(_value_detail(layer, before, after))
+        if before.groups != after.groups:
+            details.append(f"{'/'.join(sorted(before.groups - {''})) or '-'} -> {'/'.join(sorted(after.groups - {''})) or '-'}")
+        if details:
+            changes.append(Change(layer, key, "changed", detail="; ".join(details)))
+    changes.sort(key=lambda change: (change.layer, change.change, change.key))
+    return changes
+
+
+def _value_detail(layer, before, after):
+    if layer == "AIRWAY":
+        dropped = [fix for fix in before.values if fix not in set(after.values)]
+        added = [fix for fix in after.values if fix not in set(before.values)]
+        if dropped or added:
+            return f"fixes -{','.join(dropped) or '0'} +{','.join(added) or '0'}"
+        return "fix order"
+    return f"{' | '.join(_values(layer, before))} -> {' | '.join(_values(layer, after))}"
+
+
+def build_pairs(old, new):
+    """(name, old path, new path) for two files, or for the files of two directories (None when missing)."""
+    if not (os.path.isdir(old) and os.path.isdir(new)):
+        return [(os.path.basename(new), old, new)]
+    names = sorted(set(os.listdir(old)) | set(os.listdir(new)))
+    return [
+        (name, os.path.join(old, name) if os.path.exists(os.path.join(old, name)) else None,
+         os.path.join(new, name) if os.path.exists(os.path.join(new, name)) else None)
+        for name in names
+        if os.path.isfile(os.path.join(old, name)) or os.path.isfile(os.path.join(new, name))
+    ]
+
+
+def diff_builds(old, new, min_nm=MIN_MOVE_NM):
+    """{file name: [Change]} between two builds (files, GeoPackages or directories)."""
+    results = {}
+    for name, old_path, new_path in build_pairs(old, new):
+        started = time.perf_counter()
+        before = read_build(old_path) if old_path else {}
+        after = read_build(new_path) if new_path else {}
+        results[name] = compare(before, after, min_nm)
+        logger.info(f"{name}: {len(before)} / {len(after)} features, {len(results[name])} changes "
+                    f"in {time.perf_counter() - started:.2f}s")
+    return results
+
+
+def summary_lines(results):
+    """Counts per file, layer and change, then every change."""
+    for name, changes in results.items():
+        counts = {}
+        for change in changes:
+            counts.setdefault(change.layer, {}).setdefault(change.change, 0)
+            counts[change.layer][change.change] += 1
+        yield f"{name}: {len(changes)} changes" + "".join(
+            f"\n  {layer}: " + ", ".join(f"{count} {kind}" for kind, count in sorted(kinds.items()))
+            for layer, kinds in sorted(counts.items()))
+        for change in changes:
+            distance = f" {change.distance_nm:.3f} NM" if change.distance_nm is not None else ""
+            detail = f" ({change.detail})" if change.detail else ""
+            yield f"    {change.change:8s} {change.layer} {change.key}{distance}{detail}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two builds feature by feature (added / removed / moved / changed)")
+    parser.add_argument("old", help="Output file, GeoPackage (--gpkg-out) or directory of outputs")
+    parser.add_argument("new", help="The same for the newer build")
+    parser.add_argument("--min-nm", type=float, default=MIN_MOVE_NM, help=f"Smallest move reported (default: {MIN_MOVE_NM} NM)")
+    parser.add_argument("--json", help="Also write the changes to this JSON file")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    started = time.perf_counter()
+    results = diff_builds(args.old, args.new, args.min_nm)
+    for line in summary_lines(results):
+        print(line)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({name: [asdict(change) for change in changes] for name, changes in results.items()},
+                      f, indent=2, ensure_ascii=False)
+            f.write("\n")
+    total = sum(len(changes) for changes in results.values())
+    print(f"{total} changes in {len(results)} files, compared in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Bulk FIR assignment for point layers (waypoints, VOR, NDB).
+
+Prepares the SETOR_FIR polygons once and resolves all points per polygon with
+a NumPy bounding-box prefilter and one vectorized shapely intersects_xy call,
+instead of a Python loop per point. With a handful of large FIR polygons this
+beats an STRtree point query, which has to build a Point object per point.
+
+Results are cached on disk per AIRAC cycle, keyed by a digest of the polygons
+and points, so repeated builds in the same cycle skip the geometry work.
+
+    python -m geoaisweb.fir_index --points 50000
+"""
+import argparse
+import hashlib
+import logging
+import os
+import time
+
+from geoaisweb import airac
+from geoaisweb.cache import cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+class FirIndex:
+    """Prepared FIR polygons with vectorized point assignment.
+
+    fir_polygons is {fir: [ring, ...]} with rings as (lat, lon) lists, as
+    returned by geoaisweb.regions.parse_fir_polygons.
+    """
+
+    def __init__(self, fir_polygons, use_cache=True):
+        import numpy as np
+        import shapely
+        from shapely.geometry import Polygon
+
+        self.firs = sorted(fir_polygons)
+        geometries, owners = [], []
+        for code, fir in enumerate(self.firs):
+            for ring in fir_polygons[fir]:
+                polygon = Polygon([(lon, lat) for lat, lon in ring])
+                if not polygon.is_valid:
+                    polygon = polygon.buffer(0)
+                geometries.append(polygon)
+                owners.append(code)
+        self._geometries = np.array(geometries, dtype=object)
+        self._owners = np.array(owners, dtype=np.int32)
+        self._bounds = shapely.bounds(self._geometries) if geometries else np.empty((0, 4))
+        shapely.prepare(self._geometries)
+        self.use_cache = use_cache
+
+        digest = hashlib.sha1()
+        for geometry, owner in zip(geometries, owners):
+            digest.update(self.firs[owner].encode("utf-8"))
+            digest.update(shapely.to_wkb(geometry))
+        self._polygon_digest = digest.hexdigest()
+
+    def assign_codes(self, lats, lons):
+        """Returns an int array of FIR codes (index into self.firs), -1 when outside every FIR."""
+        import numpy as np
+        import shapely
+
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        cache_file = self._cache_file(lats, lons) if self.use_cache else None
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with np.load(cache_file) as cached:
+                    return cached["codes"]
+            except (OSError, KeyError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable FIR cache {cache_file}: {e}")
+
+        codes = np.full(len(lats), -1, dtype=np.int32)
+        # Polygons are in FIR code order, so where FIRs overlap the lowest code wins
+        for geometry, owner, (min_x, min_y, max_x, max_y) in zip(self._geometries, self._owners, self._bounds):
+            candidates = np.flatnonzero(
+                (codes == -1) & (lons >= min_x) & (lons <= max_x) & (lats >= min_y) & (lats <= max_y)
+            )
+            if len(candidates):
+                # intersects_xy keeps points lying exactly on a FIR boundary
+                inside = shapely.intersects_xy(geometry, lons[candidates], lats[candidates])
+                codes[candidates[inside]] = owner
+
+        if cache_file:
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp.npz"
+            np.savez_compressed(tmp_file, codes=codes)
+            os.replace(tmp_file, cache_file)
+        return codes
+
+    def assign(self, points):
+        """Returns the FIR (or None) for every (lat, lon) in points."""
+        points = list(points)
+        if not points:
+            return []
+        lats, lons = zip(*points)
+        firs = self.firs + [None]
+        return [firs[code] for code in self.assign_codes(lats, lons).tolist()]
+
+    def _cache_file(self, lats, lons):
+        digest = hashlib.sha1(self._polygon_digest.encode("ascii"))
+        digest.update(lats.tobytes())
+        digest.update(lons.tobytes())
+        return os.path.join(cache_dir("fir_index", airac.cycle()), f"{digest.hexdigest()}.npz")
+
+
+def locator(fir_polygons, use_cache=True):
+    """Returns a FirIndex, or the per-point FirLocator when shapely < 2 is installed."""
+    import shapely
+
+    if int(shapely.__version__.split(".")[0]) >= 2:
+        return FirIndex(fir_polygons, use_cache)
+    from geoaisweb.regions import FirLocator
+    logger.warning("shapely < 2 has no vectorized queries; using the per-point FIR locator")
+    return FirLocator(fir_polygons)
+
+
+def benchmark(fir_polygons, count, seed=0):
+    """Times FirIndex against the per-point FirLocator on random points in the FIR extent."""
+    import numpy as np
+    from geoaisweb.regions import FirLocator
+
+    rng = np.random.default_rng(seed)
+    rings = [ring for rings in fir_polygons.values() for ring in rings]
+    lats = np.array([lat for ring in rings for lat, _ in ring])
+    lons = np.array([lon for ring in rings for _, lon in ring])
+    point_lats = rng.uniform(lats.min(), lats.max(), count)
+    point_lons = rng.uniform(lons.min(), lons.max(), count)
+
+    started = time.perf_counter()
+    index = FirIndex(fir_polygons, use_cache=False)
+    build_s = time.perf_counter() - started
+    started = time.perf_counter()
+    vectorized = index.assign(zip(point_lats, point_lons))
+    vectorized_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    looped = FirLocator(fir_polygons).locate_all(zip(point_lats, point_lons))
+    looped_s = time.perf_counter() - started
+
+    mismatches = sum(1 for a, b in zip(vectorized, looped) if a != b)
+    print(f"{count} points, {len(rings)} FIR polygons")
+    print(f"index build:            {build_s * 1000:8.1f} ms")
+    print(f"vectorized assignment:  {vectorized_s * 1000:8.1f} ms")
+    print(f"per-point locator:      {looped_s * 1000:8.1f} ms")
+    print(f"mismatches:             {mismatches}")
+
+
+def main(argv=None):
+    import xml.etree.ElementTree as ET
+    from geoaisweb.regions import parse_fir_polygons
+    from geoaisweb.wfs import feature_url
+
+    parser = argparse.ArgumentParser(description="Benchmark vectorized FIR assignment against SETOR_FIR")
+    parser.add_argument("--points", type=int, default=50000, help="Random points to assign")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    parser.add_argument("--setor-fir", help="Local SETOR_FIR GML file instead of fetching it")
+    args = parser.parse_args(argv)
+
+    if args.setor_fir:
+        root = ET.parse(args.setor_fir).getroot()
+    else:
+        from geoaisweb.client import get_client
+        response = get_client().get(feature_url("ICA:SETOR_FIR", args.base_url), timeout=120)
+        root = ET.fromstring(response.content)
+    benchmark(parse_fir_polygons(root), args.points)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""GeoPackage (SQLite) export and import of a parsed Dataset.
+
+The whole dataset is written in one transaction with executemany: points
+(fixes, VOR, NDB), aerodromes, airway segments, sectors with their kind and
+FIR, and the unsimplified FIR boundaries. Every feature table has a GeoPackage
+R-tree spatial index and indexes on its ident / designator / name columns,
+so the file opens in QGIS/GDAL and answers ad-hoc SQL:
+
+    SELECT ident, kind FROM points p JOIN rtree_points_geom r ON p.fid = r.id
+     WHERE r.minx > -47 AND r.maxx < -46 AND r.miny > -24 AND r.maxy < -23;
+
+read_dataset() rebuilds the Dataset, so SCT_BUILDER can build from the file
+instead of fetching WFS again (--gpkg-out / --gpkg-in). Sector rings are
+stored as they are in the Dataset, i.e. already simplified.
+"""
+import logging
+import os
+import sqlite3
+import struct
+import time
+
+from geoaisweb import airac
+from geoaisweb.airway_levels import is_upper
+
+logger = logging.getLogger(__name__)
+
+SRS_ID = 4326
+WGS84_WKT = (
+    'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563]],'
+    'PRIMEM["Greenwich",0],UNIT["degree",0.0174532925199433],AUTHORITY["EPSG","4326"]]'
+)
+POINT, LINESTRING, POLYGON = 1, 2, 3
+GEOMETRY_NAMES = {POINT: "POINT", LINESTRING: "LINESTRING", POLYGON: "POLYGON"}
+
+# table -> (geometry type, columns after fid, indexed columns)
+TABLES = {
+    "points": (POINT, "kind TEXT NOT NULL, ident TEXT NOT NULL, frequency TEXT, latitude TEXT, longitude TEXT, "
+                      "fir TEXT, airways TEXT", ("ident", "kind", "fir")),
+    "aerodromes": (POINT, "localidade_id TEXT NOT NULL, nome TEXT, fir TEXT, tipo_util TEXT, elevacao REAL, "
+                          "latitude_dec REAL, longitude_dec REAL", ("localidade_id", "fir")),
+    "airway_fixes": (POINT, "ident TEXT NOT NULL", ("ident",)),
+    "airways": (LINESTRING, "txtdesig TEXT NOT NULL, seq REAL, class TEXT", ("txtdesig",)),
+    "airway_routes": (LINESTRING, "txtdesig TEXT NOT NULL, airwayseg REAL, routedist REAL, class TEXT", ("txtdesig",)),
+    "sectors": (POLYGON, "kind TEXT NOT NULL, name TEXT NOT NULL, fir TEXT, ring_closed INTEGER", ("name", "kind", "fir")),
+    "fir_boundaries": (POLYGON, "fir TEXT NOT NULL", ("fir",)),
+}
+
+
+def geometry_blob(geometry_type, points):
+    """GeoPackage binary (little-endian header, xy envelope except for points, WKB) from (x, y) pairs."""
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    if geometry_type == POINT:
+        header = struct.pack("<2sBBi", b"GP", 0, 0b0001, SRS_ID)
+        return header + struct.pack("<BIdd", 1, POINT, xs[0], ys[0])
+    header = struct.pack("<2sBBi4d", b"GP", 0, 0b0011, SRS_ID, min(xs), max(xs), min(ys), max(ys))
+    coordinates = struct.pack(f"<{2 * len(points)}d", *(value for point in points for value in point))
+    if geometry_type == LINESTRING:
+        return header + struct.pack("<BII", 1, LINESTRING, len(points)) + coordinates
+    return header + struct.pack("<BIII", 1, POLYGON, 1, len(points)) + coordinates
+
+
+def geometry_points(blob):
+    """(x, y) pairs of a blob written by geometry_blob (first ring for polygons)."""
+    flags = blob[3]
+    offset = 8 + (0, 32, 48, 48, 64)[(flags >> 1) & 0b111]
+    _, geometry_type = struct.unpack_from("<BI", blob, offset)
+    offset += 5
+    if geometry_type == POINT:
+        return [struct.unpack_from("<dd", blob, offset)]
+    if geometry_type == POLYGON:
+        offset += 4  # ring count
+    (count,) = struct.unpack_from("<I", blob, offset)
+    values = struct.unpack_from(f"<{2 * count}d", blob, offset + 4)
+    return list(zip(values[::2], values[1::2]))
+
+
+def envelope(blob):
+    """(minx, maxx, miny, maxy) of a geometry blob."""
+    if (blob[3] >> 1) & 0b111:
+        return struct.unpack_from("<4d", blob, 8)
+    (x, y), = geometry_points(blob)
+    return x, x, y, y
+
+
+def airway_class(txtdesig, classes=None):
+    return "UPPER" if is_upper(txtdesig, classes) else "LOWER"
+
+
+def create_schema(connection):
+    connection.execute(f"PRAGMA application_id = {0x47504B47}")
+    connection.execute("PRAGMA user_version = 10200")
+    # Statement by statement: executescript() would commit the open transaction
+    schema = """
+        CREATE TABLE gpkg_spatial_ref_sys (srs_name TEXT NOT NULL, srs_id INTEGER PRIMARY KEY,
+            organization TEXT NOT NULL, organization_coordsys_id INTEGER NOT NULL, definition TEXT NOT NULL,
+            description TEXT);
+        CREATE TABLE gpkg_contents (table_name TEXT NOT NULL PRIMARY KEY, data_type TEXT NOT NULL,
+            identifier TEXT UNIQUE, description TEXT DEFAULT '', last_change DATETIME NOT NULL DEFAULT
+            (strftime('%Y-%m-%dT%H:%M:%fZ','now')), min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE,
+            srs_id INTEGER);
+        CREATE TABLE gpkg_geometry_columns (table_name TEXT NOT NULL, column_name TEXT NOT NULL,
+            geometry_type_name TEXT NOT NULL, srs_id INTEGER NOT NULL, z TINYINT NOT NULL, m TINYINT NOT NULL,
+            CONSTRAINT pk_geom_cols PRIMARY KEY (table_name, column_name));
+        CREATE TABLE gpkg_extensions (table_name TEXT, column_name TEXT, extension_name TEXT NOT NULL,
+            definition TEXT NOT NULL, scope TEXT NOT NULL);
+        CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT);
+    """
+    for statement in schema.split(";"):
+        if statement.strip():
+            connection.execute(statement)
+    connection.executemany("INSERT INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)", [
+        ("Undefined cartesian SRS", -1, "NONE", -1, "undefined", None),
+        ("Undefined geographic SRS", 0, "NONE", 0, "undefined", None),
+        ("WGS 84 geodetic", SRS_ID, "EPSG", 4326, WGS84_WKT, None),
+    ])
+    connection.execute("INSERT INTO gpkg_contents (table_name, data_type, identifier) VALUES ('metadata', 'attributes', 'metadata')")
+    for table, (geometry_type, columns, indexed) in TABLES.items():
+        connection.execute(f"CREATE TABLE {table} (fid INTEGER PRIMARY KEY, {columns}, geom BLOB)")
+        for column in indexed:
+            connection.execute(f"CREATE INDEX {table}_{column} ON {table} ({column})")
+        connection.execute(f"CREATE VIRTUAL TABLE rtree_{table}_geom USING rtree(id, minx, maxx, miny, maxy)")
+        connection.execute("INSERT INTO gpkg_contents (table_name, data_type, identifier, srs_id) VALUES (?, 'features', ?, ?)",
+                           (table, table, SRS_ID))
+        connection.execute("INSERT INTO gpkg_geometry_columns VALUES (?, 'geom', ?, ?, 0, 0)",
+                           (table, GEOMETRY_NAMES[geometry_type], SRS_ID))
+        connection.execute("INSERT INTO gpkg_extensions VALUES (?, 'geom', 'gpkg_rtree_index', "
+                           "'http://www.geopackage.org/spec120/#extension_rtree', 'write-only')", (table,))
+
+
+def dataset_rows(dataset):
+    """{table: iterator of rows (without fid)} for a Dataset; geometries are (lon, lat)."""
+    from geoaisweb.query import dataset_sectors
+
+    def points():
+        for ident, waypoint in dataset.waypoints.items():
+            lat, lon = waypoint['coordinates']
+            yield ("FIX", ident, None, None, None, dataset.waypoint_firs.get(ident),
+                   ",".join(sorted(waypoint['used_in_airways'])), geometry_blob(POINT, [(lon, lat)]))
+        for kind, navaids, firs in (("VOR", dataset.vors, dataset.vor_firs), ("NDB", dataset.ndbs, dataset.ndb_firs)):
+            for i, navaid in enumerate(navaids):
+                yield (kind, navaid['ident'], navaid['frequency'], navaid['latitude'], navaid['longitude'],
+                       firs[i] if i < len(firs) else None, None, geometry_blob(POINT, [(navaid['lon'], navaid['lat'])]))
+
+    def aerodromes():
+        table = dataset.airports
+        if table is None or not len(table):
+            return
+        tipo_utils = table["tipo_util"].tolist() if "tipo_util" in table.columns else [None] * len(table)
+        yield from (
+            (ident, name, fir, tipo_util, elevation, lat, lon, geometry_blob(POINT, [(lon, lat)]))
+            for ident, name, fir, tipo_util, elevation, lat, lon in zip(
+                table["localidade_id"].tolist(), table["nome"].tolist(), table["fir"].tolist(), tipo_utils,
+                table["elevacao"].tolist(), table["latitude_dec"].tolist(), table["longitude_dec"].tolist())
+        )
+
+    def sectors():
+        for sector in dataset_sectors(dataset):
+            ring = [(lon, lat) for lat, lon in sector.ring]
+            closed = ring[0] == ring[-1]
+            yield (sector.kind, sector.name, sector.fir, int(closed),
+                   geometry_blob(POLYGON, ring if closed else ring + ring[:1]))
+
+    return {
+        "points": points(),
+        "aerodromes": aerodromes(),
+        "airway_fixes": ((ident, geometry_blob(POINT, [vertex])) for vertex, ident in dataset.airway_fixes.items()),
+        "airways": (
+            (txtdesig, segment.seq, airway_class(txtdesig, dataset.airway_upper), geometry_blob(LINESTRING, segment.segments))
+            for txtdesig, segments in dataset.airways.items() for segment in segments if segment.segments
+        ),
+        "airway_routes": (
+            (txtdesig, airwayseg, routedist, airway_class(txtdesig, dataset.airway_upper),
+             geometry_blob(LINESTRING, [(lon, lat) for lat, lon in coord_tuples]))
+            for txtdesig, airwayseg, routedist, coord_tuples in dataset.airway_data if coord_tuples
+        ),
+        "sectors": sectors(),
+        "fir_boundaries": (
+            (fir, geometry_blob(POLYGON, [(lon, lat) for lat, lon in ring]))
+            for fir, rings in dataset.fir_polygons.items() for ring in rings
+        ),
+    }
+
+
+def write_dataset(dataset, path, base_url=None):
+    """Writes dataset to a new GeoPackage at path in one transaction. Returns {table: rows}."""
+    started = time.perf_counter()
+    temporary = path + ".part"
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    connection = sqlite3.connect(temporary, isolation_level=None)
+    counts = {}
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute("BEGIN")
+        create_schema(connection)
+        for table, rows in dataset_rows(dataset).items():
+            columns = TABLES[table][1].count(",") + 2  # + geom
+            placeholders = ", ".join("?" * columns)
+            connection.executemany(f"INSERT INTO {table} VALUES (NULL, {placeholders})", rows)
+            # Spatial index and extent in bulk from the stored envelopes
+            boxes = [(fid, *envelope(blob)) for fid, blob in connection.execute(f"SELECT fid, geom FROM {table}")]
+            connection.executemany(f"INSERT INTO rtree_{table}_geom VALUES (?, ?, ?, ?, ?)", boxes)
+            connection.execute(f"UPDATE gpkg_contents SET min_x = (SELECT min(minx) FROM rtree_{table}_geom), "
+                               f"max_x = (SELECT max(maxx) FROM rtree_{table}_geom), min_y = (SELECT min(miny) FROM "
+                               f"rtree_{table}_geom), max_y = (SELECT max(maxy) FROM rtree_{table}_geom) "
+                               f"WHERE table_name = ?", (table,))
+            counts[table] = len(boxes)
+        connection.executemany("INSERT INTO metadata VALUES (?, ?)", [
+            ("base_url", base_url or ""),
+            ("airac_cycle", airac.cycle()),
+            ("created", time.strftime('%Y-%m-%d %H:%M:%S')),
+            ("helipads", "1" if dataset.helipads else "0"),
+        ])
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.close()
+        os.remove(temporary)
+        raise
+    connection.close()
+    os.replace(temporary, path)
+    logger.info(f"Wrote {sum(counts.values())} features to {path} in {time.perf_counter() - started:.2f}s")
+    return counts
+
+
+def read_dataset(path):
+    """Rebuilds the Dataset written by write_dataset (FIR assignments of points included)."""
+    import numpy as np
+    from geoaisweb.aerodromes import AerodromeTable
+    from geoaisweb.airways import AirwaySegment
+    from geoaisweb.dataset import Dataset
+
+    started = time.perf_counter()
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        metadata = dict(connection.execute("SELECT key, value FROM metadata"))
+        dataset = Dataset(helipads=metadata.get("helipads") == "1")
+
+        for kind, ident, frequency, latitude, longitude, fir, airways, blob in connection.execute(
+                "SELECT kind, ident, frequency, latitude, longitude, fir, airways, geom FROM points ORDER BY fid"):
+            (lon, lat), = geometry_points(blob)
+            if kind == "FIX":
+                used = set(airways.split(",")) if airways else set()
+                dataset.waypoints[ident] = {'coordinates': (lat, lon), 'used_in_airways': used}
+                if used:
+                    dataset.fixes_in_airways.add(ident)
+                if fir is not None:
+                    dataset.waypoint_firs[ident] = fir
+                continue
+            navaid = {'ident': ident, 'frequency': frequency, 'latitude': latitude, 'longitude': longitude,
+                      'lat': lat, 'lon': lon}
+            (dataset.vors if kind == "VOR" else dataset.ndbs).append(navaid)
+            # Parallel to vors / ndbs: a navaid outside every FIR keeps its None
+            (dataset.vor_firs if kind == "VOR" else dataset.ndb_firs).append(fir)
+        dataset.fixes_not_in_airways = set(dataset.waypoints) - dataset.fixes_in_airways
+
+        rows = connection.execute("SELECT localidade_id, nome, fir, tipo_util, elevacao, latitude_dec, longitude_dec "
+                                  "FROM aerodromes ORDER BY fid").fetchall()
+        columns = list(zip(*rows)) or [()] * 7
+        table = {name: np.array(column, dtype=str) for name, column in
+                 zip(("localidade_id", "nome", "fir", "tipo_util"), columns[:4])}
+        if dataset.helipads:
+            del table["tipo_util"]
+        for name, column in zip(("elevacao", "latitude_dec", "longitude_dec"), columns[4:]):
+            table[name] = np.array(column, dtype=np.float64)
+        dataset.airports = AerodromeTable(table)
+
+        dataset.airway_fixes = {
+            geometry_points(blob)[0]: ident
+            for ident, blob in connection.execute("SELECT ident, geom FROM airway_fixes ORDER BY fid")
+        }
+        for txtdesig, seq, class_name, blob in connection.execute(
+                "SELECT txtdesig, seq, class, geom FROM airways ORDER BY fid"):
+            dataset.airways.setdefault(txtdesig, []).append(AirwaySegment(seq, geometry_points(blob)))
+            dataset.airway_upper[txtdesig] = class_name == "UPPER"
+        dataset.airway_data = [
+            (txtdesig, airwayseg, routedist, [(lat, lon) for lon, lat in geometry_points(blob)])
+            for txtdesig, airwayseg, routedist, blob in connection.execute(
+                "SELECT txtdesig, airwayseg, routedist, geom FROM airway_routes ORDER BY fid")
+        ]
+        for kind, name, fir, closed, blob in connection.execute(
+                "SELECT kind, name, fir, ring_closed, geom FROM sectors ORDER BY fid"):
+            ring = geometry_points(blob)
+            if not closed:
+                ring = ring[:-1]
+            dataset.sectors.setdefault(kind, {}).setdefault(fir, []).extend(
+                f"T;{kind} {name};{lat};{lon};" for lon, lat in ring)
+        for fir, blob in connection.execute("SELECT fir, geom FROM fir_boundaries ORDER BY fid"):
+            dataset.fir_polygons.setdefault(fir, []).append([(lat, lon) for lon, lat in geometry_points(blob)])
+    finally:
+        connection.close()
+    if metadata.get("airac_cycle") != airac.cycle():
+        logger.warning(f"{path} was written for AIRAC {metadata.get('airac_cycle')}, current cycle is {airac.cycle()}")
+    logger.info(f"Read dataset from {path} in {time.perf_counter() - started:.2f}s")
+    return dataset
+
+
+def benchmark(path, base_url=None, repeat=3):
+    """Times parsing the fetched WFS layers against writing and reading the GeoPackage."""
+    from geoaisweb.build import fetch_layers, parse_layers
+
+    texts, payloads = fetch_layers(base_url)
+    timings = {"XML parse (SCT_BUILDER)": [], "GeoPackage write": [], "GeoPackage read": []}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        dataset = parse_layers(texts, payloads)
+        timings["XML parse (SCT_BUILDER)"].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        write_dataset(dataset, path, base_url)
+        timings["GeoPackage write"].append(time.perf_counter() - started)
+        started = time.perf_counter()
+        read_dataset(path)
+        timings["GeoPackage read"].append(time.perf_counter() - started)
+    print(f"{os.path.getsize(path)} bytes, best of {repeat}")
+    for label, values in timings.items():
+        print(f"{label:25s} {min(values) * 1000:8.1f} ms")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the GEOAISWEB dataset to a GeoPackage")
+    parser.add_argument("output", help="GeoPackage file to write")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    parser.add_argument("--helipads", action="store_true", help="Use airport_heliport (airports + helipads)")
+    parser.add_argument("--benchmark", action="store_true", help="Time XML parsing against GeoPackage write/read")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING if args.benchmark else logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.benchmark:
+        benchmark(args.output, args.base_url)
+        return
+    from geoaisweb.build import assign_firs, load_dataset
+    from geoaisweb.wfs import get_base_url
+
+    dataset = load_dataset(args.base_url, helipads=args.helipads)
+    assign_firs(dataset)
+    write_dataset(dataset, args.output, get_base_url(args.base_url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Bulk parsing of gml:coordinates strings.
+
+A gml:coordinates text ('lon,lat lon,lat ...' from GeoServer WFS 1.0.0) is
+converted to an (N, 2) NumPy array of (lat, lon) rows in one call instead of
+a split() / split(',') / float() per value:
+
+    from geoaisweb.gml import parse_coordinates
+    ring = parse_coordinates(element.text)          # array([[lat, lon], ...])
+    ring.tolist()                                   # [[lat, lon], ...] as Python floats
+
+WFS 1.0.0 and EPSG:4326 without a URN give lon,lat; pass axis_order=LAT_LON
+for servers answering in the EPSG axis order. 3D coordinates (dims=3) drop
+the height. Values are the same floats Python's float() gives.
+
+python -m geoaisweb.gml --benchmark times it against the per-value parsing
+on the coordinates of the FIR, CTA and airway layers.
+"""
+import argparse
+import logging
+import re
+import time
+
+from geoaisweb.wfs import feature_url
+
+logger = logging.getLogger(__name__)
+
+LON_LAT = "lonlat"
+LAT_LON = "latlon"
+GML_COORDINATES = re.compile(rb"<gml:coordinates[^>]*>([^<]*)</gml:coordinates>")
+
+
+class CoordinateError(ValueError):
+    """A gml:coordinates string that is malformed or out of range."""
+
+
+def _empty():
+    import numpy as np
+
+    return np.zeros((0, 2), dtype=np.float64)
+
+
+def _rows(values, dims, axis_order):
+    """(lat, lon) rows of a flat value array."""
+    values = values.reshape(-1, dims)[:, :2]
+    return values[:, ::-1] if axis_order == LON_LAT else values
+
+
+def _out_of_range(coordinates):
+    """Mask of (lat, lon) rows outside [-90, 90] x [-180, 180], NaN included."""
+    import numpy as np
+
+    return ~(np.abs(coordinates) <= (90.0, 180.0)).all(axis=1)
+
+
+def _parse_pairs(text, dims, axis_order, cs, ts):
+    """Slow path: one tuple at a time, dropping the malformed ones."""
+    import numpy as np
+
+    rows = []
+    for pair in text.split(ts):
+        try:
+            values = [float(value) for value in pair.split(cs)]
+        except ValueError:
+            logger.warning(f"Invalid coordinates: {pair!r}")
+            continue
+        if len(values) != dims:
+            logger.warning(f"Invalid coordinates: {pair!r}")
+            continue
+        rows.append(values)
+    if not rows:
+        return _empty()
+    return _rows(np.array(rows, dtype=np.float64).ravel(), dims, axis_order)
+
+
+def parse_coordinates(text, axis_order=LON_LAT, dims=2, strict=True, cs=",", ts=None):
+    """(N, 2) float64 array of (lat, lon) rows from a gml:coordinates string.
+
+    cs and ts are the gml:coordinates tuple and coordinate separators (ts=None
+    means any whitespace). With strict (the default) a malformed or
+    out-of-range string raises CoordinateError; otherwise the bad tuples are
+    logged and left out.
+    """
+    import numpy as np
+
+    if not text or not text.strip():
+        return _empty()
+    flat = text.replace(cs, " ") if ts is None else text.replace(cs, " ").replace(ts, " ")
+    try:
+        values = np.array(flat.split(), dtype=np.float64)
+    except ValueError:
+        values = None
+    if values is None or len(values) % dims:
+        if strict:
+            raise CoordinateError(f"Malformed gml:coordinates ({dims}D): {text[:80]!r}")
+        coordinates = _parse_pairs(text, dims, axis_order, cs, ts)
+    else:
+        coordinates = _rows(values, dims, axis_order)
+
+    bad = _out_of_range(coordinates)
+    if bad.any():
+        swapped = coordinates[:, ::-1]
+        hint = " (wrong axis order?)" if not _out_of_range(swapped).any() else ""
+        if strict:
+            first = coordinates[bad][0].tolist()
+            raise CoordinateError(f"{int(bad.sum())} coordinates out of range{hint}, first (lat, lon) = {first}")
+        for lat, lon in coordinates[bad].tolist():
+            logger.warning(f"Invalid coordinates: ({lat}, {lon}){hint}")
+        coordinates = coordinates[~bad]
+    return coordinates
+
+
+def parse_point(text, axis_order=LON_LAT):
+    """(lat, lon) of a single 'lon,lat' tuple, or None; cheaper than an array for one point."""
+    try:
+        first, second = (float(value) for value in text.split(","))
+    except (ValueError, AttributeError):
+        return None
+    lat, lon = (second, first) if axis_order == LON_LAT else (first, second)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        logger.warning(f"Invalid coordinates: ({lat}, {lon})")
+        return None
+    return lat, lon
+
+
+def coordinate_lists(texts, axis_order=LON_LAT, dims=2, strict=True, cs=",", ts=None):
+    """[[lat, lon], ...] Python lists for each of texts, parsed with one bulk conversion.
+
+    For layers of many short strings (airway legs) where a NumPy call per
+    string would cost more than it saves. Falls back to parse_coordinates per
+    string when any of them is bad, so strict and the logging are the same.
+    """
+    import numpy as np
+
+    texts = [text or "" for text in texts]
+    # Tuples per string from its separators (dims - 1 per tuple); checked against the total below
+    counts = [text.count(cs) // (dims - 1) for text in texts]
+    joined = " ".join(texts).replace(cs, " ")
+    if ts is not None:
+        joined = joined.replace(ts, " ")
+    try:
+        values = np.array(joined.split(), dtype=np.float64)
+        if len(values) != sum(counts) * dims:
+            raise ValueError("incomplete tuple")
+        coordinates = _rows(values, dims, axis_order)
+        if _out_of_range(coordinates).any():
+            raise ValueError("out of range")
+    except ValueError:
+        return [parse_coordinates(text, axis_order, dims, strict, cs, ts).tolist() for text in texts]
+    rows = coordinates.tolist()
+    lists = []
+    start = 0
+    for count in counts:
+        lists.append(rows[start:start + count])
+        start += count
+    return lists
+
+
+def coordinate_texts(payload):
+    """Every gml:coordinates text in a WFS response (bytes), without building a tree."""
+    return [match.decode("ascii", errors="replace") for match in GML_COORDINATES.findall(payload)]
+
+
+def _per_value(text):
+    # What the extractors did before: split, split(','), float() per value
+    return [(float(lat), float(lon)) for lon, lat in (pair.split(",") for pair in text.split())]
+
+
+def _split_array(text):
+    # NumPy converting the split strings: float() per value again, but no tuples
+    import numpy as np
+
+    return np.array(text.replace(",", " ").split(), dtype=np.float64).reshape(-1, 2)[:, ::-1]
+
+
+def benchmark(texts, repeat=5):
+    """Times the per-value parsing against the bulk parsers over texts; checks they agree."""
+    import numpy as np
+
+    reference = [_per_value(text) for text in texts]
+    for expected, text, batched in zip(reference, texts, coordinate_lists(texts)):
+        if not parse_coordinates(text).tolist() == batched == [list(pair) for pair in expected]:
+            raise AssertionError(f"Bulk parsing disagrees on {text[:80]!r}")
+    vertices = sum(len(pairs) for pairs in reference)
+    print(f"{len(texts)} coordinate strings, {vertices} vertices")
+    parsers = {
+        "split/float per value": _per_value,
+        "parse_coordinates": parse_coordinates,
+        "coordinate_lists (batch)": None,
+        "np.array(str.split())": _split_array,
+    }
+    baseline = None
+    for label, parse in parsers.items():
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            if parse is None:
+                coordinate_lists(texts)
+            else:
+                for text in texts:
+                    parse(text)
+            best = min(best, time.perf_counter() - started)
+        baseline = baseline or best
+        print(f"{label:24s} {best * 1000:8.1f} ms  {vertices / best / 1e6:6.2f} M vertices/s  x{baseline / best:.1f}")
+    # Long rings are where the bulk parser pays off; a single point is cheaper without NumPy
+    longest = max(texts, key=len)
+    for label, parse in (("longest, per value", _per_value), ("longest, bulk", parse_coordinates)):
+        started = time.perf_counter()
+        for _ in range(100):
+            parse(longest)
+        print(f"{label:24s} {(time.perf_counter() - started) * 10:8.2f} ms  ({len(longest.split())} vertices)")
+    np.testing.assert_array_equal(_split_array(longest), parse_coordinates(longest))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk gml:coordinates parser; --benchmark compares it with per-value parsing")
+    parser.add_argument("--benchmark", action="store_true", help="Time the parsers on downloaded layers")
+    parser.add_argument("--layers", nargs="+", default=["ICA:SETOR_FIR", "ICA:CTA", "ICA:airway"])
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    parser.add_argument("files", nargs="*", help="Saved WFS responses to use instead of downloading")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    texts = []
+    if args.files:
+        for path in args.files:
+            with open(path, "rb") as f:
+                texts.extend(coordinate_texts(f.read()))
+    else:
+        from geoaisweb.client import get_client
+
+        for type_name in args.layers:
+            texts.extend(coordinate_texts(get_client().get(feature_url(type_name, args.base_url)).content))
+    benchmark(texts)
+
+
+if __name__ == "__main__":
+    main()
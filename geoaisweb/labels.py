@@ -0,0 +1,81 @@
+"""Along-track label placement for airways.
+
+All airway polylines are flattened into one array of vertices with a global
+cumulative geodesic length. A label at distance d along polyline i is then
+one np.searchsorted into that array plus a great-circle interpolation on the
+edge found, for every label of every airway at once.
+"""
+EARTH_RADIUS_NM = 3440.065
+
+
+class AlongTrackIndex:
+    """Cumulative great-circle length of a list of (lat, lon) polylines."""
+
+    def __init__(self, polylines):
+        import numpy as np
+
+        sizes = np.array([len(polyline) for polyline in polylines], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)])
+        flat = np.array([point for polyline in polylines for point in polyline], dtype=np.float64).reshape(-1, 2)
+        lat, lon = np.radians(flat[:, 0]), np.radians(flat[:, 1])
+        self.vectors = np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+        # Edge lengths, zero across the boundary between two polylines
+        edges = np.zeros(len(flat))
+        if len(flat) > 1:
+            dot = np.clip(np.einsum("ij,ij->i", self.vectors[:-1], self.vectors[1:]), -1.0, 1.0)
+            edges[1:] = np.arccos(dot) * EARTH_RADIUS_NM
+            edges[self.offsets[1:-1]] = 0.0
+        self.cumulative = np.cumsum(edges)
+        self.lengths = np.zeros(len(sizes))
+        filled = sizes > 0
+        self.lengths[filled] = self.cumulative[self.offsets[1:][filled] - 1] - self.cumulative[self.offsets[:-1][filled]]
+
+    def positions(self, polyline_indices, distances_nm):
+        """Returns (lats, lons) at distances_nm along the given polylines (clamped to their ends)."""
+        import numpy as np
+
+        polyline_indices = np.asarray(polyline_indices, dtype=np.int64)
+        first = self.offsets[polyline_indices]
+        last = self.offsets[polyline_indices + 1] - 1
+        start = self.cumulative[first]
+        targets = start + np.clip(distances_nm, 0.0, self.lengths[polyline_indices])
+
+        # Binary search for the edge [edge, edge + 1] holding each target
+        edge = np.searchsorted(self.cumulative, targets, side="right") - 1
+        edge = np.clip(edge, first, np.maximum(last - 1, first))
+        following = np.minimum(edge + 1, last)
+        edge_length = self.cumulative[following] - self.cumulative[edge]
+        fraction = np.divide(targets - self.cumulative[edge], edge_length,
+                             out=np.zeros_like(targets), where=edge_length > 0)
+
+        # Spherical linear interpolation between the edge's end points
+        a, b = self.vectors[edge], self.vectors[following]
+        omega = edge_length / EARTH_RADIUS_NM
+        sin_omega = np.sin(omega)
+        safe = sin_omega > 1e-12
+        wa = np.where(safe, np.sin((1 - fraction) * omega) / np.where(safe, sin_omega, 1.0), 1 - fraction)
+        wb = np.where(safe, np.sin(fraction * omega) / np.where(safe, sin_omega, 1.0), fraction)
+        point = wa[:, None] * a + wb[:, None] * b
+        lats = np.degrees(np.arctan2(point[:, 2], np.hypot(point[:, 0], point[:, 1])))
+        lons = np.degrees(np.arctan2(point[:, 1], point[:, 0]))
+        return lats, lons
+
+    def label_positions(self, every_nm=None):
+        """Returns (polyline index, lats, lons) for every label.
+
+        One label at the along-track midpoint of each polyline, or with
+        every_nm one label per every_nm of length, evenly spaced and centred.
+        """
+        import numpy as np
+
+        if every_nm:
+            counts = np.maximum(1, np.floor(self.lengths / every_nm)).astype(np.int64)
+        else:
+            counts = np.ones(len(self.lengths), dtype=np.int64)
+        counts[self.offsets[1:] == self.offsets[:-1]] = 0  # empty polylines get no label
+        polylines = np.repeat(np.arange(len(counts)), counts)
+        rank = np.arange(len(polylines)) - np.repeat(np.cumsum(counts) - counts, counts)
+        distances = self.lengths[polylines] * (rank + 0.5) / counts[polylines]
+        lats, lons = self.positions(polylines, distances)
+        return polylines, lats, lons
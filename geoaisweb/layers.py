@@ -0,0 +1,263 @@
+"""Registry of the WFS layers the scripts read, compiled into one feature extractor per consumer.
+
+Each layer is described once by a LayerSpec: its typeName, the attribute
+naming a feature (the lookup key of geoaisweb.archive and geoaisweb.watch),
+the attributes the scripts read and which of them are numbers. extractor()
+compiles a spec for one consumer, once per process: the qualified tag names
+('{http://10.32.62.212/geoserver/ICA}ident') are built up front, and the
+direct children of a feature are walked once, each dispatched to its slot
+through a dict, instead of an ElementPath find() per attribute per feature.
+
+    from geoaisweb.layers import extractor
+    VOR = extractor("ICA:vor", "ident", "frequency", "latitude_gms", "longitude_gms")
+    for ident, frequency, lat_gms, lon_gms in VOR.records(root):
+        ...
+
+A feature comes out as a tuple of the requested attributes (stripped text,
+float for numeric ones; None for a missing optional one), followed by the
+text of its first gml:coordinates with geometry=True. Features without a
+required attribute, or whose numeric attribute does not parse, are dropped
+and counted per attribute instead of skipped silently; log_stats() (called
+by records()) reports the counts, as a warning when features were dropped.
+
+    python -m geoaisweb.layers                  (the registry)
+    python -m geoaisweb.layers --benchmark      (compiled extractors against find() per attribute)
+"""
+import argparse
+import functools
+import logging
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from geoaisweb.wfs import feature_url
+
+logger = logging.getLogger(__name__)
+
+ICA_NS = "http://10.32.62.212/geoserver/ICA"
+GML_NS = "http://www.opengis.net/gml"
+NAMESPACES = {"ICA": ICA_NS, "gml": GML_NS}
+COORDINATES_TAG = f"{{{GML_NS}}}coordinates"
+GEOMETRY = "coordinates"    # name the geometry is counted under
+
+
+@dataclass(frozen=True)
+class LayerSpec:
+    type_name: str
+    key: str            # attribute naming a feature
+    fields: tuple       # attributes read by the scripts
+    numeric: tuple = ()  # attributes converted with float()
+
+    @property
+    def tag(self):
+        prefix, name = self.type_name.split(":")
+        return f"{{{NAMESPACES[prefix]}}}{name}"
+
+
+SECTOR_FIELDS = ("nam", "relatedfir")
+AIRWAY_FIELDS = ("txtdesig", "name", "seq", "airwayseg_", "routedis",
+                 "valdistverlower", "uomdistverlower", "valdistverupper", "uomdistverupper")
+AERODROME_FIELDS = ("localidade_id", "nome", "fir", "tipo_util", "elevacao", "latitude_dec", "longitude_dec")
+AERODROME_NUMERIC = ("elevacao", "latitude_dec", "longitude_dec")
+
+LAYERS = {spec.type_name: spec for spec in (
+    LayerSpec("ICA:SETOR_FIR", "nam", SECTOR_FIELDS),
+    LayerSpec("ICA:CTA", "nam", SECTOR_FIELDS),
+    LayerSpec("ICA:TMA", "nam", SECTOR_FIELDS),
+    LayerSpec("ICA:CTR", "nam", SECTOR_FIELDS),
+    LayerSpec("ICA:ATZ", "nam", SECTOR_FIELDS),
+    LayerSpec("ICA:airway", "txtdesig", AIRWAY_FIELDS, numeric=("seq", "airwayseg_", "routedis")),
+    LayerSpec("ICA:waypoint", "ident", ("ident",)),
+    LayerSpec("ICA:waypoint_aisweb", "ident", ("ident",)),
+    LayerSpec("ICA:navaids", "designator", ("designator",)),
+    LayerSpec("ICA:vor", "ident", ("ident", "frequency", "latitude_gms", "longitude_gms")),
+    LayerSpec("ICA:ndb", "codeid", ("codeid", "valfreq", "latitude_gms", "longitude_gms")),
+    LayerSpec("ICA:airport", "localidade_id", AERODROME_FIELDS, numeric=AERODROME_NUMERIC),
+    LayerSpec("ICA:airport_heliport", "localidade_id", AERODROME_FIELDS, numeric=AERODROME_NUMERIC),
+)}
+
+
+def layer_keys():
+    """{typeName: attribute naming a feature} for every registered layer."""
+    return {type_name: spec.key for type_name, spec in LAYERS.items()}
+
+
+@dataclass
+class ExtractStats:
+    type_name: str
+    features: int = 0
+    dropped: int = 0
+    missing: Counter = field(default_factory=Counter)  # attribute -> features without it
+    invalid: Counter = field(default_factory=Counter)  # numeric attribute -> features where float() failed
+
+    def summary(self):
+        counts = [f"missing {name}: {count}" for name, count in sorted(self.missing.items())]
+        counts += [f"invalid {name}: {count}" for name, count in sorted(self.invalid.items())]
+        text = f"{self.type_name}: {self.features - self.dropped} of {self.features} features kept"
+        return f"{text} ({', '.join(counts)})" if counts else text
+
+
+class Extractor:
+    """A LayerSpec compiled for one set of required / optional attributes.
+
+    Call it with a feature element for its tuple (None when dropped), or use
+    records() for every feature of a parsed response. Counting is thread-safe,
+    so an Extractor can be the transform of geoaisweb.stream.stream_features.
+    """
+
+    def __init__(self, spec, required, optional=(), geometry=False):
+        names = tuple(required) + tuple(optional)
+        unknown = sorted(set(names) - set(spec.fields))
+        if unknown:
+            raise ValueError(f"{spec.type_name} has no attribute {', '.join(unknown)} in the registry")
+        self.spec = spec
+        self.tag = spec.tag
+        self.names = names + ((GEOMETRY,) if geometry else ())
+        self.stats = ExtractStats(spec.type_name)
+        self._lock = threading.Lock()
+        self._extract = self._compile(len(names), len(required), geometry)
+
+    def _compile(self, width, required_count, geometry):
+        slots = {f"{{{ICA_NS}}}{name}": slot for slot, name in enumerate(self.names[:width])}
+        numeric = tuple((slot, name) for slot, name in enumerate(self.names) if name in self.spec.numeric)
+        required = tuple(range(required_count)) + ((width,) if geometry else ())
+        names = self.names
+        stats = self.stats
+        lock = self._lock
+
+        def extract(element):
+            values = [None] * width
+            for child in element:
+                slot = slots.get(child.tag)
+                if slot is not None:
+                    text = child.text
+                    if text and not text.isspace():
+                        values[slot] = text.strip()
+            if geometry:
+                coordinates = next(element.iter(COORDINATES_TAG), None)
+                text = None if coordinates is None else coordinates.text
+                values.append(text if text and not text.isspace() else None)
+            invalid = []
+            for slot, name in numeric:
+                if values[slot] is not None:
+                    try:
+                        values[slot] = float(values[slot])
+                    except ValueError:
+                        values[slot] = None
+                        invalid.append(name)
+            if None not in values:
+                with lock:
+                    stats.features += 1
+                return tuple(values)
+
+            dropped = any(values[slot] is None for slot in required)
+            with lock:
+                stats.features += 1
+                stats.dropped += dropped
+                stats.invalid.update(invalid)
+                stats.missing.update(names[slot] for slot, value in enumerate(values)
+                                     if value is None and names[slot] not in invalid)
+            return None if dropped else tuple(values)
+
+        return extract
+
+    def __call__(self, element):
+        return self._extract(element)
+
+    def records(self, root):
+        """Tuples of every feature of the layer under root (a parsed response), dropped ones left out."""
+        records = [record for record in map(self._extract, root.iter(self.tag)) if record is not None]
+        self.log_stats()
+        return records
+
+    def take_stats(self):
+        """The counts since the last call, and a fresh start."""
+        with self._lock:
+            stats = ExtractStats(self.stats.type_name, self.stats.features, self.stats.dropped,
+                                 Counter(self.stats.missing), Counter(self.stats.invalid))
+            self.stats.features = self.stats.dropped = 0
+            self.stats.missing.clear()
+            self.stats.invalid.clear()
+        return stats
+
+    def log_stats(self):
+        stats = self.take_stats()
+        if stats.dropped:
+            logger.warning(stats.summary())
+        else:
+            logger.debug(stats.summary())
+        return stats
+
+
+@functools.lru_cache(maxsize=None)
+def extractor(type_name, *required, optional=(), geometry=False):
+    """The Extractor for type_name's required (then optional) attributes, compiled once per process."""
+    return Extractor(LAYERS[type_name], required, tuple(optional), geometry)
+
+
+def _find_per_attribute(spec, names, geometry):
+    # What the scripts did before: an ElementPath find() per attribute per feature
+    def extract(element):
+        values = []
+        for name in names:
+            child = element.find(f"ICA:{name}", NAMESPACES)
+            text = child.text.strip() if child is not None and child.text else None
+            values.append(float(text) if text and name in spec.numeric else text or None)
+        if geometry:
+            coordinates = element.find(".//gml:coordinates", NAMESPACES)
+            values.append(coordinates.text if coordinates is not None else None)
+        return tuple(values)
+
+    return extract
+
+
+def benchmark(payloads, repeat=5):
+    """Times find() per attribute against the compiled extractors on {typeName: response bytes}; checks they agree."""
+    import xml.etree.ElementTree as ET
+
+    print(f"{'layer':22s} {'features':>8s} {'find()':>10s} {'compiled':>10s}")
+    totals = [0.0, 0.0]
+    for type_name, payload in payloads.items():
+        spec = LAYERS[type_name]
+        root = ET.fromstring(payload)
+        elements = list(root.iter(spec.tag))
+        compiled = Extractor(spec, (), spec.fields, geometry=True)
+        dynamic = _find_per_attribute(spec, spec.fields, True)
+        if [compiled(element) for element in elements] != [dynamic(element) for element in elements]:
+            raise AssertionError(f"Compiled extractor disagrees with find() on {type_name}")
+        best = []
+        for extract in (dynamic, compiled):
+            seconds = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                for element in elements:
+                    extract(element)
+                seconds = min(seconds, time.perf_counter() - started)
+            best.append(seconds)
+        totals = [total + seconds for total, seconds in zip(totals, best)]
+        print(f"{type_name:22s} {len(elements):8d} {best[0] * 1000:8.1f} ms {best[1] * 1000:8.1f} ms  x{best[0] / best[1]:.1f}")
+    print(f"{'total':22s} {'':8s} {totals[0] * 1000:8.1f} ms {totals[1] * 1000:8.1f} ms  x{totals[0] / totals[1]:.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="The layer registry; --benchmark times the compiled extractors")
+    parser.add_argument("--benchmark", action="store_true", help="Time find() per attribute against the compiled extractors")
+    parser.add_argument("--layers", nargs="+", default=list(LAYERS), help="Layers to benchmark (default: all)")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if not args.benchmark:
+        for spec in LAYERS.values():
+            numeric = f"  (numeric: {', '.join(spec.numeric)})" if spec.numeric else ""
+            print(f"{spec.type_name:22s} key {spec.key:14s} {', '.join(spec.fields)}{numeric}")
+        return
+
+    from geoaisweb.client import get_client
+
+    benchmark({type_name: get_client().get(feature_url(type_name, args.base_url)).content for type_name in args.layers})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Local stand-in for the GEOAISWEB WFS endpoint.
+
+Replays recorded GetFeature responses from a directory (gzip-compressed when
+the client accepts it) so the extractors can be exercised offline, with optional latency, bandwidth, truncation and 5xx
+fault injection. Typical use:
+
+    python -m geoaisweb.mock_server record --data-dir recordings
+    python -m geoaisweb.mock_server serve --data-dir recordings --latency 0.2
+    GEOAISWEB_BASE_URL=http://127.0.0.1:8765/geoserver/ICA/ows python NAVAIDS.py
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from geoaisweb.client import get_client
+from geoaisweb.layers import LAYERS
+from geoaisweb.wfs import feature_url, recording_name
+
+logger = logging.getLogger(__name__)
+
+# Layers used by the extractors; recorded by default.
+DEFAULT_LAYERS = list(LAYERS)
+
+MEMBER_RE = re.compile(rb"<gml:featureMember\b.*?</gml:featureMember>", re.S)
+CHUNK_SIZE = 8192
+
+
+@dataclass
+class Faults:
+    """Fault injection settings applied to every GetFeature response."""
+    latency: float = 0.0          # seconds before the first byte
+    jitter: float = 0.0           # +/- seconds added to latency
+    bandwidth: int = 0            # bytes per second, 0 for unlimited
+    error_rate: float = 0.0       # probability of answering with error_status
+    error_status: int = 503
+    truncate_rate: float = 0.0    # probability of cutting the body short
+    truncate_at: float = 0.5      # fraction of the body sent when truncating
+    seed: int = 0
+
+
+@dataclass
+class Recording:
+    """A recorded layer split into header, feature members and footer."""
+    body: bytes
+    header: bytes
+    members: list
+    footer: bytes
+    etag: str
+    mtime: float
+    _gzipped: bytes = None
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            body = f.read()
+        spans = [m.span() for m in MEMBER_RE.finditer(body)]
+        if spans:
+            header, footer = body[:spans[0][0]], body[spans[-1][1]:]
+            members = [body[start:end] for start, end in spans]
+        else:
+            header, footer, members = body, b"", []
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        return cls(body, header, members, footer, etag, os.path.getmtime(path))
+
+    def page(self, start, count):
+        """Returns the body restricted to members[start:start + count]."""
+        if not start and count is None:
+            return self.body
+        stop = None if count is None else start + count
+        return self.header + b"".join(self.members[start:stop]) + self.footer
+
+    def gzipped(self):
+        """The full body gzip-compressed, computed once."""
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+    def hits(self):
+        """Returns a resultType=hits document with the feature count."""
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<wfs:FeatureCollection xmlns:wfs="http://www.opengis.net/wfs" '
+            f'numberOfFeatures="{len(self.members)}" '
+            f'timeStamp="{time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(self.mtime))}"/>'
+        ).encode("utf-8")
+
+
+@dataclass
+class Stats:
+    requests: int = 0
+    bytes_sent: int = 0
+    errors_injected: int = 0
+    truncated: int = 0
+    not_modified: int = 0
+    by_layer: dict = field(default_factory=dict)
+
+
+class MockWFSServer:
+    """Threaded HTTP server replaying recordings from data_dir."""
+
+    def __init__(self, data_dir, host="127.0.0.1", port=0, faults=None):
+        self.data_dir = data_dir
+        self.faults = faults or Faults()
+        self.stats = Stats()
+        self._recordings = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.faults.seed)
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/geoserver/ICA/ows"
+
+    def recording(self, type_name):
+        """Returns the cached recording for a layer, or None if not recorded."""
+        path = os.path.join(self.data_dir, recording_name(type_name))
+        with self._lock:
+            cached = self._recordings.get(type_name)
+            if cached is not None and os.path.exists(path) and os.path.getmtime(path) == cached.mtime:
+                return cached
+            if not os.path.exists(path):
+                return None
+            self._recordings[type_name] = Recording.load(path)
+            return self._recordings[type_name]
+
+    def roll(self, probability):
+        """Draws from the seeded generator so fault sequences are reproducible."""
+        if probability <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < probability
+
+    def delay(self):
+        faults = self.faults
+        if faults.latency <= 0 and faults.jitter <= 0:
+            return 0.0
+        with self._lock:
+            return max(0.0, faults.latency + self._rng.uniform(-faults.jitter, faults.jitter))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        logger.debug("%s - %s", self.address_string(), fmt % args)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        mock = self.server.mock
+        parts = urlsplit(self.path)
+        if parts.path == "/__stats":
+            payload = json.dumps(mock.stats.__dict__).encode("utf-8")
+            return self._respond(200, payload, "application/json", send_body)
+
+        # WFS parameter names are case-insensitive.
+        params = {key.lower(): value for key, value in parse_qsl(parts.query)}
+        type_name = params.get("typename")
+        recording = mock.recording(type_name) if type_name else None
+        with mock._lock:
+            mock.stats.requests += 1
+            if type_name:
+                mock.stats.by_layer[type_name] = mock.stats.by_layer.get(type_name, 0) + 1
+
+        time.sleep(mock.delay())
+
+        if recording is None:
+            message = f"No recording for typeName={type_name!r}".encode("utf-8")
+            return self._respond(404, message, "text/plain", send_body)
+
+        if mock.roll(mock.faults.error_rate):
+            with mock._lock:
+                mock.stats.errors_injected += 1
+            message = b"Injected server error"
+            return self._respond(mock.faults.error_status, message, "text/plain", send_body)
+
+        if self.headers.get("If-None-Match") == recording.etag:
+            with mock._lock:
+                mock.stats.not_modified += 1
+            return self._respond(304, b"", None, False, recording)
+
+        if params.get("resulttype", "").lower() == "hits":
+            body = recording.hits()
+        else:
+            try:
+                start = int(params.get("startindex", 0))
+                count = params.get("count") or params.get("maxfeatures")
+                count = int(count) if count is not None else None
+            except ValueError:
+                return self._respond(400, b"Invalid paging parameters", "text/plain", send_body)
+            body = recording.page(start, count)
+
+        # Compressed like GeoServer when the client accepts gzip
+        content_encoding = None
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = recording.gzipped() if body is recording.body else gzip.compress(body, compresslevel=6)
+            content_encoding = "gzip"
+
+        truncate = send_body and mock.roll(mock.faults.truncate_rate)
+        self._respond(200, body, "text/xml; subtype=gml/2.1.2", send_body, recording, truncate, content_encoding)
+
+    def _respond(self, status, body, content_type, send_body, recording=None, truncate=False, content_encoding=None):
+        mock = self.server.mock
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        if recording is not None:
+            self.send_header("ETag", recording.etag)
+            self.send_header("Last-Modified", formatdate(recording.mtime, usegmt=True))
+            self.send_header("Vary", "Accept-Encoding")
+        if content_encoding:
+            self.send_header("Content-Encoding", content_encoding)
+        self.send_header("Content-Length", str(len(body)))
+        if truncate:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        if not send_body:
+            return
+
+        limit = int(len(body) * mock.faults.truncate_at) if truncate else len(body)
+        sent = self._send_throttled(body[:limit], mock.faults.bandwidth)
+        with mock._lock:
+            mock.stats.bytes_sent += sent
+            if truncate:
+                mock.stats.truncated += 1
+        if truncate:
+            # Advertised Content-Length was the full body; dropping the
+            # connection here surfaces as an incomplete read on the client.
+            self.close_connection = True
+
+    def _send_throttled(self, data, bandwidth):
+        sent = 0
+        started = time.monotonic()
+        try:
+            for offset in range(0, len(data), CHUNK_SIZE):
+                chunk = data[offset:offset + CHUNK_SIZE]
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                if bandwidth > 0:
+                    ahead = sent / bandwidth - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        return sent
+
+
+def record_layers(data_dir, layers, base_url=None, timeout=120):
+    """Downloads each layer from the live (or given) WFS into data_dir."""
+    os.makedirs(data_dir, exist_ok=True)
+    for type_name in layers:
+        url = feature_url(type_name, base_url)
+        logger.info(f"Recording {type_name}...")
+        response = get_client().get(url, timeout=timeout)
+        path = os.path.join(data_dir, recording_name(type_name))
+        with open(path, "wb") as f:
+            f.write(response.content)
+        logger.info(f"Saved {len(response.content)} bytes to {path}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local mock of the GEOAISWEB WFS service")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="Record live layer responses")
+    record.add_argument("--data-dir", default="recordings")
+    record.add_argument("--base-url", help="WFS endpoint to record from")
+    record.add_argument("layers", nargs="*", default=DEFAULT_LAYERS)
+
+    serve = sub.add_parser("serve", help="Replay recorded responses")
+    serve.add_argument("--data-dir", default="recordings")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0, help="Seconds before first byte")
+    serve.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds on latency")
+    serve.add_argument("--bandwidth", type=int, default=0, help="Bytes per second (0 = unlimited)")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 5xx answer")
+    serve.add_argument("--error-status", type=int, default=503)
+    serve.add_argument("--truncate-rate", type=float, default=0.0, help="Probability of a cut body")
+    serve.add_argument("--truncate-at", type=float, default=0.5, help="Fraction of body sent when cut")
+    serve.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    if args.command == "record":
+        record_layers(args.data_dir, args.layers, args.base_url)
+        return
+
+    faults = Faults(
+        latency=args.latency, jitter=args.jitter, bandwidth=args.bandwidth,
+        error_rate=args.error_rate, error_status=args.error_status,
+        truncate_rate=args.truncate_rate, truncate_at=args.truncate_at, seed=args.seed,
+    )
+    server = MockWFSServer(args.data_dir, args.host, args.port, faults)
+    logger.info(f"Serving {args.data_dir} at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Indexed queries over a parsed Dataset, for tools that need more than the text files.
+
+    from geoaisweb.build import load_dataset
+    from geoaisweb.query import AeronauticalIndex
+
+    index = AeronauticalIndex.from_dataset(load_dataset())
+    index.find("SBGR")                 # hash lookup by ident
+    index.near("SBGR", 50)             # everything within 50 NM, nearest first
+    index.bbox(-24, -47, -23, -46)     # everything inside a lat/lon box
+    index.airways_through("BSI")       # inverted airway -> fix membership
+    index.sectors_at(-23.43, -46.47)   # sectors containing a point
+
+Points (fixes, VOR, NDB, aerodromes) are held in NumPy columns with a SciPy
+cKDTree over unit vectors for radius queries (brute force when SciPy is not
+installed) and a latitude-sorted order for bounding boxes.
+"""
+import argparse
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from geoaisweb.snap import DEFAULT_SNAP_NM, EARTH_RADIUS_NM, chord_length, unit_vectors
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Point:
+    kind: str       # 'FIX', 'VOR', 'NDB' or 'AD'
+    ident: str
+    lat: float
+    lon: float
+    name: str = ""
+    frequency: str = ""
+    fir: str = ""
+
+
+@dataclass
+class Sector:
+    kind: str       # 'FIR', 'CTA', 'TMA', 'CTR' or 'ATZ'
+    name: str
+    fir: str
+    ring: list = field(default_factory=list)   # [(lat, lon)], as written to the sectorfile
+
+    def contains(self, lat, lon):
+        """Even-odd rule on the (lat, lon) ring."""
+        inside = False
+        for (lat1, lon1), (lat2, lon2) in zip(self.ring, self.ring[1:] + self.ring[:1]):
+            if (lat1 > lat) != (lat2 > lat) and lon < lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1):
+                inside = not inside
+        return inside
+
+
+def dataset_points(dataset):
+    """Yields a Point for every waypoint, VOR, NDB, aerodrome and airway-only fix of a Dataset."""
+    for ident, waypoint in dataset.waypoints.items():
+        lat, lon = waypoint['coordinates']
+        yield Point("FIX", ident, lat, lon, fir=dataset.waypoint_firs.get(ident) or "")
+    for kind, navaids, firs in (("VOR", dataset.vors, dataset.vor_firs), ("NDB", dataset.ndbs, dataset.ndb_firs)):
+        for i, navaid in enumerate(navaids):
+            fir = firs[i] if i < len(firs) else ""
+            yield Point(kind, navaid['ident'], navaid['lat'], navaid['lon'], frequency=navaid['frequency'], fir=fir or "")
+    if dataset.airports is not None and len(dataset.airports):
+        table = dataset.airports
+        for ident, name, fir, lat, lon in zip(table["localidade_id"].tolist(), table["nome"].tolist(), table["fir"].tolist(),
+                                              table["latitude_dec"].tolist(), table["longitude_dec"].tolist()):
+            yield Point("AD", ident, lat, lon, name=name, fir=fir)
+
+    # Fixes only known from the ICA:waypoint / ICA:navaids layers used for airways
+    known = set(dataset.waypoints) | {navaid['ident'] for navaid in dataset.vors + dataset.ndbs}
+    for (lon, lat), ident in dataset.airway_fixes.items():
+        if ident not in known:
+            known.add(ident)
+            yield Point("FIX", ident, lat, lon)
+
+
+def dataset_sectors(dataset):
+    """Yields a Sector per run of 'T;<KIND> name;lat;lon;' lines in dataset.sectors."""
+    from geoaisweb.validation import sector_rings
+
+    for kind, fir_sectors in dataset.sectors.items():
+        for fir, lines in fir_sectors.items():
+            for name, ring in sector_rings(kind, lines):
+                yield Sector(kind, name, fir, ring)
+
+
+class AeronauticalIndex:
+    """Hash, spatial and airway membership indexes over points, airways and sectors."""
+
+    def __init__(self, points, airways=None, sectors=()):
+        import numpy as np
+
+        self.points = list(points)
+        self.by_ident = defaultdict(list)
+        for i, point in enumerate(self.points):
+            self.by_ident[point.ident].append(i)
+        self.kinds = np.array([point.kind for point in self.points], dtype=str)
+        self.lats = np.array([point.lat for point in self.points], dtype=np.float64)
+        self.lons = np.array([point.lon for point in self.points], dtype=np.float64)
+        self.vectors = unit_vectors(np.column_stack([self.lons, self.lats])) if self.points else np.zeros((0, 3))
+        self.tree = None
+        try:
+            from scipy.spatial import cKDTree
+            if self.points:
+                self.tree = cKDTree(self.vectors)
+        except ImportError:
+            logger.info("SciPy not installed; radius queries scan every point")
+
+        # Latitude order for bounding boxes
+        self.lat_order = np.argsort(self.lats, kind="stable")
+        self.sorted_lats = self.lats[self.lat_order]
+
+        # airway -> fix sequences, and the inverted fix -> airways
+        self.airways = dict(airways or {})
+        self.fix_airways = defaultdict(set)
+        for designator, polylines in self.airways.items():
+            for polyline in polylines:
+                for ident in polyline:
+                    self.fix_airways[ident].add(designator)
+
+        self.sectors = list(sectors)
+        self.sector_by_name = defaultdict(list)
+        for sector in self.sectors:
+            self.sector_by_name[sector.name].append(sector)
+        # Bounding box of each sector (south, west, north, east) for point queries
+        boxes = [(min(lat for lat, _ in s.ring), min(lon for _, lon in s.ring),
+                  max(lat for lat, _ in s.ring), max(lon for _, lon in s.ring)) for s in self.sectors]
+        self.sector_boxes = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+
+    @classmethod
+    def from_dataset(cls, dataset, snap_nm=DEFAULT_SNAP_NM):
+        """Builds the index from a geoaisweb.dataset.Dataset (see geoaisweb.build.load_dataset)."""
+        from geoaisweb.airways import fix_sequences
+
+        airways, _ = fix_sequences(dataset.airways, dataset.airway_fixes, snap_nm)
+        return cls(dataset_points(dataset), airways, dataset_sectors(dataset))
+
+    def _select(self, indices, kinds):
+        points = [self.points[i] for i in indices]
+        return [point for point in points if point.kind in kinds] if kinds else points
+
+    def find(self, ident, kinds=None):
+        """Points with this ident (a VOR and an NDB may share one), optionally of the given kinds."""
+        return self._select(self.by_ident.get(ident, ()), kinds)
+
+    def within(self, lat, lon, radius_nm, kinds=None):
+        """[(distance NM, Point)] within radius_nm of (lat, lon), nearest first."""
+        import numpy as np
+
+        if not self.points:
+            return []
+        center = unit_vectors([(lon, lat)])[0]
+        if self.tree is not None:
+            candidates = np.asarray(self.tree.query_ball_point(center, chord_length(radius_nm)), dtype=np.int64)
+        else:
+            chords = np.linalg.norm(self.vectors - center, axis=1)
+            candidates = np.flatnonzero(chords <= chord_length(radius_nm))
+        if kinds:
+            candidates = candidates[np.isin(self.kinds[candidates], list(kinds))]
+        dot = np.clip(self.vectors[candidates] @ center, -1.0, 1.0)
+        distances = np.arccos(dot) * EARTH_RADIUS_NM
+        order = np.argsort(distances, kind="stable")
+        return [(distance, self.points[i]) for distance, i in zip(distances[order].tolist(), candidates[order].tolist())]
+
+    def near(self, ident, radius_nm, kinds=None):
+        """within() around the first point with this ident; the point itself is left out."""
+        found = self.find(ident)
+        if not found:
+            raise KeyError(ident)
+        origin = found[0]
+        return [(distance, point) for distance, point in self.within(origin.lat, origin.lon, radius_nm, kinds)
+                if point is not origin]
+
+    def bbox(self, south, west, north, east, kinds=None):
+        """Points with south <= lat <= north and west <= lon <= east (west > east crosses 180)."""
+        import numpy as np
+
+        start = np.searchsorted(self.sorted_lats, south, side="left")
+        stop = np.searchsorted(self.sorted_lats, north, side="right")
+        candidates = self.lat_order[start:stop]
+        lons = self.lons[candidates]
+        if west <= east:
+            candidates = candidates[(lons >= west) & (lons <= east)]
+        else:
+            candidates = candidates[(lons >= west) | (lons <= east)]
+        return self._select(np.sort(candidates).tolist(), kinds)
+
+    def airway(self, designator):
+        """Fix idents of each polyline of an airway."""
+        return self.airways.get(designator, [])
+
+    def airways_through(self, ident):
+        """Designators of the airways that use a fix or navaid, sorted."""
+        return sorted(self.fix_airways.get(ident, ()))
+
+    def sector(self, name):
+        """Sectors with this name (without the kind prefix, e.g. 'AZ CTA 1')."""
+        return list(self.sector_by_name.get(name, ()))
+
+    def sectors_at(self, lat, lon, kinds=None):
+        """Sectors whose ring contains (lat, lon)."""
+        import numpy as np
+
+        boxes = self.sector_boxes
+        candidates = np.flatnonzero((boxes[:, 0] <= lat) & (lat <= boxes[:, 2]) & (boxes[:, 1] <= lon) & (lon <= boxes[:, 3]))
+        sectors = [self.sectors[i] for i in candidates.tolist()]
+        return [sector for sector in sectors if (not kinds or sector.kind in kinds) and sector.contains(lat, lon)]
+
+
+def benchmark(index, repeat=1000, radius_nm=50.0):
+    """Times each kind of lookup on points of the index; prints microseconds per query."""
+    import random
+
+    rng = random.Random(0)
+    sample = [index.points[rng.randrange(len(index.points))] for _ in range(repeat)]
+    fixes = list(index.fix_airways) or [point.ident for point in sample]
+    queries = {
+        "find(ident)": lambda point: index.find(point.ident),
+        f"within({radius_nm:g} NM)": lambda point: index.within(point.lat, point.lon, radius_nm),
+        "bbox(1 deg)": lambda point: index.bbox(point.lat - 0.5, point.lon - 0.5, point.lat + 0.5, point.lon + 0.5),
+        "airways_through": lambda point: index.airways_through(fixes[hash(point.ident) % len(fixes)]),
+        "sectors_at": lambda point: index.sectors_at(point.lat, point.lon),
+    }
+    print(f"{len(index.points)} points, {len(index.airways)} airways, {len(index.sectors)} sectors")
+    for label, query in queries.items():
+        started = time.perf_counter()
+        for point in sample:
+            query(point)
+        print(f"{label:20s} {(time.perf_counter() - started) / repeat * 1e6:8.1f} us")
+
+
+def main(argv=None):
+    from geoaisweb.build import assign_firs, load_dataset
+
+    parser = argparse.ArgumentParser(description="Query the GEOAISWEB dataset by ident, position and airway")
+    parser.add_argument("ident", nargs="?", help="Fix, navaid or aerodrome to look up")
+    parser.add_argument("--radius-nm", type=float, help="Also list everything within this distance of ident")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    parser.add_argument("--benchmark", action="store_true", help="Time each kind of lookup")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    dataset = load_dataset(args.base_url)
+    assign_firs(dataset)
+    index = AeronauticalIndex.from_dataset(dataset)
+    if args.benchmark:
+        benchmark(index)
+    if not args.ident:
+        return
+    found = index.find(args.ident)
+    for point in found:
+        print(f"{point.kind} {point.ident} {point.lat:.6f} {point.lon:.6f} {point.name or point.frequency} {point.fir}".rstrip())
+        for sector in index.sectors_at(point.lat, point.lon):
+            print(f"    in {sector.kind} {sector.name}")
+    airways = index.airways_through(args.ident)
+    if airways:
+        print(f"Airways: {', '.join(airways)}")
+    if args.radius_nm and found:
+        for distance, point in index.near(args.ident, args.radius_nm):
+            print(f"{distance:7.1f} NM  {point.kind} {point.ident} {point.name}".rstrip())
+
+
+if __name__ == "__main__":
+    main()
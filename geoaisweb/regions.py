@@ -0,0 +1,80 @@
+"""FIR polygons and point-in-polygon FIR assignment for layers without a FIR attribute."""
+import logging
+from collections import defaultdict
+
+from geoaisweb.layers import extractor
+
+logger = logging.getLogger(__name__)
+
+NAMESPACES = {
+    'ICA': 'http://10.32.62.212/geoserver/ICA',
+    'gml': 'http://www.opengis.net/gml'
+}
+
+
+def parse_ring(text):
+    """Parses a gml:coordinates 'lon,lat lon,lat ...' string into [(lat, lon)]."""
+    from geoaisweb.gml import parse_coordinates
+
+    return [(lat, lon) for lat, lon in parse_coordinates(text).tolist()]
+
+
+def parse_fir_polygons(root, type_name="SETOR_FIR"):
+    """Returns {fir: [outer ring, ...]} from a parsed ICA:SETOR_FIR layer.
+
+    Rings are lists of (lat, lon). The FIR key is relatedfir, falling back to
+    nam; sectors of the same FIR are collected under one key.
+    """
+    names = extractor(f"ICA:{type_name}", optional=("relatedfir", "nam"))
+    polygons = defaultdict(list)
+    for sector in root.iter(names.tag):
+        relatedfir, nam = names(sector)
+        fir = relatedfir or nam or ''
+        outer = sector.findall('.//gml:outerBoundaryIs//gml:coordinates', NAMESPACES)
+        # Plain polygons without outerBoundaryIs wrappers
+        for coordinates in outer or sector.findall('.//gml:coordinates', NAMESPACES):
+            ring = parse_ring(coordinates.text or "")
+            if len(ring) >= 3:
+                polygons[fir].append(ring)
+    names.log_stats()
+    return dict(polygons)
+
+
+class FirLocator:
+    """Finds the FIR containing a point using prepared shapely polygons."""
+
+    def __init__(self, fir_polygons):
+        from shapely.geometry import Polygon
+        from shapely.prepared import prep
+
+        self._polygons = []
+        for fir, rings in fir_polygons.items():
+            for ring in rings:
+                # Shapely works in x/y, i.e. (lon, lat)
+                polygon = Polygon([(lon, lat) for lat, lon in ring])
+                if not polygon.is_valid:
+                    polygon = polygon.buffer(0)
+                self._polygons.append((fir, polygon.bounds, prep(polygon)))
+
+    @property
+    def firs(self):
+        return sorted({fir for fir, _, _ in self._polygons})
+
+    def locate(self, lat, lon):
+        """Returns the FIR containing (lat, lon), or None if outside every FIR."""
+        from shapely.geometry import Point
+
+        point = None
+        for fir, (min_x, min_y, max_x, max_y), prepared in self._polygons:
+            if min_x <= lon <= max_x and min_y <= lat <= max_y:
+                if point is None:
+                    point = Point(lon, lat)
+                if prepared.covers(point):
+                    return fir
+        return None
+
+    def locate_all(self, points):
+        """Returns the FIR (or None) for every (lat, lon) in points."""
+        return [self.locate(lat, lon) for lat, lon in points]
+
+    assign = locate_all
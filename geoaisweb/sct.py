@@ -0,0 +1,157 @@
+"""Streaming assembler for Aurora .sct sectorfiles.
+
+Each section is fed by one or more line producers. Producers run concurrently
+in a thread pool and spool their lines to temporary files, so only a bounded
+amount of each section is held in memory; the final file is then written by
+copying the spools in section order. With canonical, each part of a section
+is put in canonical order on the way out (geoaisweb.canonical), so the file
+does not depend on the order the server returned the features in. An
+existing file with the same content is left untouched, modification time
+included.
+"""
+import filecmp
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# Order in which sections are written; sections not listed follow in the
+# order they were first added.
+SECTION_ORDER = [
+    "INFO", "DEFINE", "VOR", "NDB", "FIXES", "AIRPORT", "RUNWAY", "SID", "STAR",
+    "ARTCC", "ARTCC HIGH", "ARTCC LOW", "HIGH AIRWAY", "LOW AIRWAY",
+    "GEO", "REGIONS", "LABELS",
+]
+
+# Spools stay in memory up to this size, then roll over to a temp file.
+SPOOL_MAX_MEMORY = 1 << 20
+
+
+@dataclass
+class SectionStats:
+    lines: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class _Part:
+    section: str
+    spool: tempfile.SpooledTemporaryFile
+    stats: SectionStats = field(default_factory=SectionStats)
+
+    def write_lines(self, lines):
+        for line in lines:
+            data = line + "\n"
+            self.spool.write(data)
+            self.stats.lines += 1
+            self.stats.bytes += len(data.encode("utf-8"))
+
+
+class SectorFileWriter:
+    """Collects section producers and writes them into one .sct file.
+
+    Producers are either an iterable of lines, or a callable returning one.
+    Callables run in the worker pool, so fetching and parsing for independent
+    sections happen at the same time. Within a section, parts are written in
+    the order they were added, or in canonical order with canonical.
+    """
+
+    def __init__(self, path, max_workers=4, spool_max_memory=SPOOL_MAX_MEMORY, canonical=False):
+        self.path = path
+        self.max_workers = max_workers
+        self.spool_max_memory = spool_max_memory
+        self.canonical = canonical
+        self._sections = {}
+        self._jobs = []
+
+    def _new_part(self, section):
+        spool = tempfile.SpooledTemporaryFile(max_size=self.spool_max_memory, mode="w+", encoding="utf-8")
+        part = _Part(section, spool)
+        self._sections.setdefault(section, []).append(part)
+        return part
+
+    def add(self, section, producer):
+        """Registers lines (or a callable returning lines) for a section."""
+        part = self._new_part(section)
+
+        def job():
+            part.write_lines(producer() if callable(producer) else producer)
+
+        self._jobs.append((section, job))
+
+    def add_group(self, sections, producer):
+        """Registers a callable producing several sections from one fetch.
+
+        The callable returns one iterable of lines per name in sections.
+        """
+        parts = [self._new_part(section) for section in sections]
+
+        def job():
+            outputs = producer()
+            if len(outputs) != len(parts):
+                raise ValueError(f"Producer returned {len(outputs)} sections, expected {len(parts)}")
+            for part, lines in zip(parts, outputs):
+                part.write_lines(lines)
+
+        self._jobs.append((", ".join(sections), job))
+
+    def ordered_sections(self):
+        known = [name for name in SECTION_ORDER if name in self._sections]
+        extra = [name for name in self._sections if name not in SECTION_ORDER]
+        return known + extra
+
+    def _write_canonical(self, section, out, section_stats):
+        from geoaisweb.canonical import canonical_lines
+
+        # Parts (e.g. the TMA, CTR and ATZ layers of [ARTCC LOW]) stay in the order they were added
+        for part in self._sections[section]:
+            part.spool.seek(0)
+            lines = (line[:-1] if line.endswith("\n") else line for line in part.spool)
+            for line in canonical_lines(lines, section):
+                data = line + "\n"
+                out.write(data)
+                section_stats.lines += 1
+                section_stats.bytes += len(data.encode("utf-8"))
+
+    def write(self):
+        """Runs all producers and writes the sectorfile. Returns stats per section."""
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [(name, pool.submit(job)) for name, job in self._jobs]
+                for name, future in futures:
+                    try:
+                        future.result()
+                    except Exception:
+                        logger.error(f"Producer for [{name}] failed")
+                        raise
+
+            stats = {}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8", newline="\n") as out:
+                for index, section in enumerate(self.ordered_sections()):
+                    if index:
+                        out.write("\n")
+                    out.write(f"[{section}]\n")
+                    section_stats = stats.setdefault(section, SectionStats())
+                    if self.canonical:
+                        self._write_canonical(section, out, section_stats)
+                        continue
+                    for part in self._sections[section]:
+                        part.spool.seek(0)
+                        shutil.copyfileobj(part.spool, out)
+                        section_stats.lines += part.stats.lines
+                        section_stats.bytes += part.stats.bytes
+            if os.path.exists(self.path) and filecmp.cmp(tmp_path, self.path, shallow=False):
+                os.remove(tmp_path)
+                logger.info(f"{self.path} unchanged")
+            else:
+                os.replace(tmp_path, self.path)
+            return stats
+        finally:
+            for parts in self._sections.values():
+                for part in parts:
+                    part.spool.close()
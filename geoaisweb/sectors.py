@@ -0,0 +1,340 @@
+"""One extraction engine for the sector layers (FIR, CTA, TMA, CTR, ATZ).
+
+The five layers differ only in a SectorLayer spec: WFS typeName, label,
+default tolerance, fixed-tolerance simplifier and the blank lines before each
+//FIR group. parse_sectors() does the parsing, simplification and grouping
+by FIR for any of them; the <KIND>_EXTRACTOR scripts call it for their own
+layer.
+
+extract_layers() processes several layers together: the downloads run in
+threads, and each layer is parsed and simplified in a process pool as soon
+as its download completes. Results carry their download and processing
+times for a throughput report:
+
+    python -m geoaisweb.sectors --output-dir out          (fir.txt, cta.txt, ... in one run)
+    python -m geoaisweb.sectors --layers CTA,TMA --workers 2
+"""
+import argparse
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from geoaisweb.wfs import feature_url
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SectorLayer:
+    kind: str               # label prefix ('T;CTA name;...') and validation kind
+    type_name: str
+    tolerance: float        # degrees, for the fixed-tolerance simplifier
+    simplifier: str         # key of SIMPLIFIERS
+    section: str            # .sct section
+    output: str             # default output file of the extractor script
+    separated: bool = True  # two blank lines before each //FIR header
+
+
+LAYERS = {
+    "FIR": SectorLayer("FIR", "ICA:SETOR_FIR", 0.01, "rdp", "ARTCC", "fir.txt"),
+    "CTA": SectorLayer("CTA", "ICA:CTA", 0.01, "rdp", "ARTCC HIGH", "cta.txt"),
+    "TMA": SectorLayer("TMA", "ICA:TMA", 0.01, "rdp", "ARTCC LOW", "tma.txt"),
+    "CTR": SectorLayer("CTR", "ICA:CTR", 0.01, "rdp", "ARTCC LOW", "ctr.txt"),
+    "ATZ": SectorLayer("ATZ", "ICA:ATZ", 0.001, "shapely", "ARTCC LOW", "atz.txt", separated=False),
+}
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    # Calculate the great-circle distance between two points
+    R = 6371  # Earth radius in kilometers
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * R * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def simplify_rdp(coords, tolerance):
+    """Simplifies a list of coordinates using a tolerance in degrees."""
+    def perpendicular_distance(point, start, end):
+        """Calculate the perpendicular distance from `point` to the line defined by `start` and `end`."""
+        if start == end:
+            return haversine(point[0], point[1], start[0], start[1])
+        x0, y0 = point
+        x1, y1 = start
+        x2, y2 = end
+        num = abs((y2 - y1) * x0 - (x2 - x1) * y0 + x2 * y1 - y2 * x1)
+        denom = math.sqrt((y2 - y1) ** 2 + (x2 - x1) ** 2)
+        return num / denom
+
+    def rdp(points, epsilon):
+        """Ramer-Douglas-Peucker algorithm to reduce points."""
+        if len(points) < 3:
+            return points
+        start, end = points[0], points[-1]
+        max_dist = 0
+        index = 0
+        for i in range(1, len(points) - 1):
+            dist = perpendicular_distance(points[i], start, end)
+            if dist > max_dist:
+                index = i
+                max_dist = dist
+        if max_dist > epsilon:
+            results1 = rdp(points[:index + 1], epsilon)
+            results2 = rdp(points[index:], epsilon)
+            return results1[:-1] + results2
+        else:
+            return [start, end]
+
+    return rdp(coords, tolerance)
+
+
+def simplify_shapely(coords, tolerance):
+    """Simplifies a list of coordinates using Shapely's simplify method."""
+    from shapely.geometry import LineString
+
+    line = LineString(coords)
+    simplified_line = line.simplify(tolerance, preserve_topology=False)
+    return list(simplified_line.coords)
+
+
+SIMPLIFIERS = {"rdp": simplify_rdp, "shapely": simplify_shapely}
+
+
+def parse_sectors(layer, content, tolerance=None, vertex_budget=None, max_error_nm=None, arc_error_nm=None, report=None,
+                  lod=None):
+    """Parses a sector layer from GML, simplifies coordinates, and groups the formatted lines by FIR.
+
+    tolerance defaults to the layer's. With vertex_budget (total vertices for
+    all sectors) or max_error_nm the fixed tolerance is replaced by adaptive
+    Visvalingam-Whyatt simplification; arc_error_nm first rebuilds circular
+    arcs with minimal segments. Per-sector statistics are appended to report
+    when a list is given, and (FIR, RankedRing) per sector to lod for
+    geoaisweb.simplify.lod_sectors.
+    """
+    import xml.etree.ElementTree as ET
+    from geoaisweb.gml import coordinate_lists
+    from geoaisweb.layers import extractor
+    from geoaisweb.simplify import simplify_sectors
+
+    tolerance = layer.tolerance if tolerance is None else tolerance
+    simplify = SIMPLIFIERS[layer.simplifier]
+
+    # (name, FIR, coordinates) per sector; sectors without a name or coordinates are counted and logged
+    parsed = [(name_text, related_fir_text or "", coordinates_text) for name_text, related_fir_text, coordinates_text
+              in extractor(layer.type_name, "nam", optional=("relatedfir",), geometry=True).records(ET.fromstring(content))]
+
+    # Extract coordinates as [lat, lon] pairs, correctly ordered, in one bulk conversion for the layer
+    parsed = [(name_text, related_fir_text, coordinates) for (name_text, related_fir_text, _), coordinates
+              in zip(parsed, coordinate_lists([text for _, _, text in parsed]))]
+
+    ranked = [] if lod is not None else None
+    simplified = simplify_sectors(
+        [(name_text, coordinates) for name_text, _, coordinates in parsed],
+        lambda coordinates: simplify(coordinates, tolerance),
+        vertex_budget, max_error_nm, arc_error_nm, report, ranked,
+    )
+    if lod is not None:
+        lod.extend((related_fir_text, ring) for (_, related_fir_text, _), ring in zip(parsed, ranked))
+
+    fir_sectors = {}  # Dict to group sectors by FIR
+    for (name_text, related_fir_text, _), simplified_coordinates in zip(parsed, simplified):
+        fir_sectors.setdefault(related_fir_text, []).extend(
+            f"T;{layer.kind} {name_text};{lat};{lon};" for lat, lon in simplified_coordinates
+        )
+    return fir_sectors
+
+
+def sector_lines(layer, fir_sectors):
+    """Yields the sector lines with a //FIR header before each FIR group."""
+    for fir, sector_list in fir_sectors.items():
+        if layer.separated:
+            yield ""
+            yield ""
+        yield f"//FIR {fir}"
+        yield from sector_list
+
+
+def write_lines(path, lines, section=None):
+    """Writes the lines in canonical order (FIR groups and rings sorted, see geoaisweb.canonical)."""
+    from geoaisweb.canonical import write_lines as write_canonical
+
+    write_canonical(path, lines, section)
+
+
+def extract_to_file(layer, url, output_file_path, tolerance=None, vertex_budget=None, max_error_nm=None, arc_error_nm=None,
+                    lod_budgets=None, before_write=None):
+    """What each <KIND>_EXTRACTOR script does: download, parse, simplify, validate and write one layer.
+
+    before_write, when given, is called before the output is opened (ATZ
+    checks that the Desktop is writable). Errors are printed, not raised.
+    """
+    from geoaisweb.client import get_client
+    from geoaisweb.simplify import format_report, lod_path, lod_sectors
+    from geoaisweb.validation import summary, validate_layer
+
+    kind = layer.kind
+    try:
+        response = get_client().get(url)
+        report = []
+        lod = [] if lod_budgets else None
+        fir_sectors = parse_sectors(layer, response.content, tolerance, vertex_budget, max_error_nm, arc_error_nm, report, lod)
+        for line in format_report(report) if report else ():
+            print(line)
+        fir_sectors, validation = validate_layer(kind, fir_sectors)
+        print(summary([validation]))
+        if before_write is not None:
+            before_write()
+
+        write_lines(output_file_path, sector_lines(layer, fir_sectors), layer.section)
+        print(f"{kind} sectors extracted, simplified, and grouped by FIR, saved to {output_file_path}")
+
+        # Coarser / finer versions from the same ranking, without simplifying again
+        for budget in lod_budgets or ():
+            lod_fir_sectors, validation = validate_layer(kind, lod_sectors(kind, lod, budget))
+            write_lines(lod_path(output_file_path, budget), sector_lines(layer, lod_fir_sectors), layer.section)
+            print(f"{kind} level of detail {budget} vertices saved to {lod_path(output_file_path, budget)} ({summary([validation])})")
+
+    except Exception as e:
+        print(f"An error occurred: {e}")
+
+
+@dataclass
+class LayerResult:
+    kind: str
+    fir_sectors: dict
+    report: list = field(default_factory=list)
+    lod: list = None
+    bytes: int = 0
+    sectors: int = 0
+    vertices_in: int = 0
+    vertices_out: int = 0
+    fetch_s: float = 0.0
+    process_s: float = 0.0
+    validation: object = None
+
+    def throughput(self):
+        """One report line: download (when it was timed) and processing rates of the layer."""
+        vertex_rate = self.vertices_in / self.process_s / 1e3 if self.process_s else 0.0
+        fetched = f" in {self.fetch_s:.2f}s ({self.bytes / self.fetch_s / 1e6:.1f} MB/s)" if self.fetch_s else ""
+        return (f"{self.kind}: {self.bytes} bytes{fetched}, {self.sectors} sectors,"
+                f" {self.vertices_in} -> {self.vertices_out} vertices in {self.process_s:.2f}s ({vertex_rate:.0f}k vertices/s)")
+
+
+def process_layer(kind, content, tolerance=None, vertex_budget=None, max_error_nm=None, arc_error_nm=None, rank=False):
+    """Parses and simplifies one layer into a LayerResult; the unit of work of the process pool."""
+    from geoaisweb.gml import coordinate_texts
+
+    started = time.perf_counter()
+    report = []
+    lod = [] if rank else None
+    fir_sectors = parse_sectors(LAYERS[kind], content, tolerance, vertex_budget, max_error_nm, arc_error_nm, report, lod)
+    texts = coordinate_texts(content)
+    return LayerResult(
+        kind, fir_sectors, report, lod, bytes=len(content), sectors=len(texts),
+        vertices_in=sum(text.count(",") for text in texts),
+        vertices_out=sum(len(lines) for lines in fir_sectors.values()),
+        process_s=time.perf_counter() - started,
+    )
+
+
+def process_layers(contents, tolerances=None, vertex_budget=None, max_error_nm=None, arc_error_nm=None, rank=False,
+                   workers=None):
+    """{kind: LayerResult} for {kind: WFS response bytes}, one layer per worker process.
+
+    workers defaults to the CPU count (at most one per layer); with a single
+    worker the layers are processed in this process.
+    """
+    tolerances = tolerances or {}
+    workers = min(workers or os.cpu_count() or 1, len(contents))
+    if workers <= 1:
+        return {kind: process_layer(kind, content, tolerances.get(kind), vertex_budget, max_error_nm, arc_error_nm, rank)
+                for kind, content in contents.items()}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = {kind: pool.submit(process_layer, kind, content, tolerances.get(kind), vertex_budget, max_error_nm,
+                                  arc_error_nm, rank)
+                for kind, content in contents.items()}
+        return {kind: job.result() for kind, job in jobs.items()}
+
+
+def extract_layers(kinds=None, base_url=None, workers=None, download_workers=None, tolerances=None, vertex_budget=None,
+                   max_error_nm=None, arc_error_nm=None, rank=False):
+    """Downloads the layers concurrently and processes each in the process pool as soon as it arrives.
+
+    Returns {kind: LayerResult} in LAYERS order, validated (repaired) like the extractors.
+    """
+    from geoaisweb.client import get_client
+    from geoaisweb.validation import validate_layer
+
+    kinds = [kind for kind in LAYERS if kinds is None or kind in kinds]
+    tolerances = tolerances or {}
+    workers = min(workers or os.cpu_count() or 1, len(kinds)) or 1
+
+    def fetch(kind):
+        started = time.perf_counter()
+        content = get_client().get(feature_url(LAYERS[kind].type_name, base_url)).content
+        return content, time.perf_counter() - started
+
+    results, fetch_times, jobs = {}, {}, {}
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        with ThreadPoolExecutor(max_workers=download_workers or len(kinds)) as downloads:
+            fetches = {downloads.submit(fetch, kind): kind for kind in kinds}
+            for future in as_completed(fetches):
+                kind = fetches[future]
+                content, fetch_times[kind] = future.result()
+                args = (kind, content, tolerances.get(kind), vertex_budget, max_error_nm, arc_error_nm, rank)
+                if pool is None:
+                    results[kind] = process_layer(*args)
+                else:
+                    jobs[kind] = pool.submit(process_layer, *args)
+        for kind, job in jobs.items():
+            results[kind] = job.result()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    ordered = {}
+    for kind in kinds:
+        result = results[kind]
+        result.fetch_s = fetch_times[kind]
+        result.fir_sectors, result.validation = validate_layer(kind, result.fir_sectors)
+        ordered[kind] = result
+    return ordered
+
+
+def main(argv=None):
+    from geoaisweb.validation import summary
+
+    parser = argparse.ArgumentParser(description="Extract every sector layer (FIR, CTA, TMA, CTR, ATZ) in one run")
+    parser.add_argument("--layers", help="Comma separated layers (default: FIR,CTA,TMA,CTR,ATZ)")
+    parser.add_argument("--output-dir", default=".", help="Directory for fir.txt, cta.txt, ... (default: current)")
+    parser.add_argument("--workers", type=int, help="Processes parsing / simplifying layers (default: CPU count)")
+    parser.add_argument("--vertex-budget", type=int, help="Total vertices per layer (adaptive, replaces the tolerances)")
+    parser.add_argument("--max-error-nm", type=float, help="Maximum deviation in NM per sector (adaptive, replaces the tolerances)")
+    parser.add_argument("--arc-error-nm", type=float, help="Rebuild circular arcs with minimal segments within this error in NM")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    kinds = [kind.strip().upper() for kind in args.layers.split(",") if kind.strip()] if args.layers else None
+    unknown = [kind for kind in kinds or () if kind not in LAYERS]
+    if unknown:
+        parser.error(f"Unknown layers: {', '.join(unknown)} (known: {', '.join(LAYERS)})")
+    started = time.perf_counter()
+    results = extract_layers(kinds, args.base_url, args.workers, vertex_budget=args.vertex_budget,
+                             max_error_nm=args.max_error_nm, arc_error_nm=args.arc_error_nm)
+    os.makedirs(args.output_dir, exist_ok=True)
+    for kind, result in results.items():
+        write_lines(os.path.join(args.output_dir, LAYERS[kind].output), sector_lines(LAYERS[kind], result.fir_sectors),
+                    LAYERS[kind].section)
+        print(result.throughput())
+    print(summary([result.validation for result in results.values()]))
+    print(f"{len(results)} layers written to {args.output_dir} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Adaptive polygon simplification for the sector extractors.
+
+Instead of one fixed tolerance in degrees for every sector, each ring is
+ranked once with Visvalingam-Whyatt (heap-based, in a local NM projection)
+and then cut to either:
+
+* a vertex budget for the whole section, shared between sectors by their
+  scale-relative vertex importance, so small CTRs keep their shape while
+  large FIRs give up redundant vertices; or
+* a maximum deviation in NM, choosing the fewest vertices per sector that
+  keep every dropped vertex within that distance of the simplified ring.
+
+Both modes report vertices in/out and the maximum deviation per sector.
+
+The ranks are nested (a vertex kept at one threshold is kept at every lower
+one), so a layer ranked once as RankedRing lists can be cut to any number of
+levels of detail afterwards (level_of_detail) without simplifying again.
+"""
+import heapq
+import math
+import os
+from dataclasses import dataclass
+
+MIN_VERTICES = 4  # a closed ring needs at least a triangle plus the closing point
+
+
+@dataclass
+class RankedRing:
+    """A ring with the Visvalingam rank of each vertex, to be cut to any level of detail."""
+    name: str
+    coords: list    # [(lat, lon)]
+    ranks: list
+    extent: float   # NM; ranks / extent^2 is the scale-relative importance
+
+    @property
+    def importances(self):
+        return [rank / self.extent ** 2 for rank in self.ranks]
+
+    def simplified(self, count):
+        """The ring cut to its count most important vertices."""
+        return [coord for coord, kept in zip(self.coords, keep_mask(self.ranks, count)) if kept]
+
+
+@dataclass
+class SectorReport:
+    name: str
+    vertices_in: int
+    vertices_out: int
+    max_deviation_nm: float
+
+
+def project_nm(coords):
+    """Projects (lat, lon) to local equirectangular (x, y) in NM around the mean latitude."""
+    if not coords:
+        return []
+    lat0 = sum(lat for lat, _ in coords) / len(coords)
+    scale = math.cos(math.radians(lat0))
+    return [(lon * 60.0 * scale, lat * 60.0) for lat, lon in coords]
+
+
+def triangle_area(a, b, c):
+    return abs((b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])) / 2.0
+
+
+def visvalingam_ranks(points):
+    """Returns the effective area (importance) of every vertex, endpoints infinite.
+
+    Vertices are removed smallest-area first with a heap and lazy invalidation;
+    a vertex's rank is the area at its removal, made non-decreasing so that
+    keeping every vertex with rank >= threshold gives nested simplifications.
+    """
+    n = len(points)
+    ranks = [math.inf] * n
+    if n < 3:
+        return ranks
+    prev = list(range(-1, n - 1))
+    nxt = list(range(1, n + 1))
+    areas = [math.inf] * n
+    heap = []
+    for i in range(1, n - 1):
+        areas[i] = triangle_area(points[i - 1], points[i], points[i + 1])
+        heap.append((areas[i], i))
+    heapq.heapify(heap)
+
+    removed = [False] * n
+    last = 0.0
+    while heap:
+        area, i = heapq.heappop(heap)
+        if removed[i] or area != areas[i]:
+            continue  # stale entry
+        last = max(last, area)
+        ranks[i] = last
+        removed[i] = True
+        p, q = prev[i], nxt[i]
+        nxt[p] = q
+        prev[q] = p
+        for j in (p, q):
+            if 0 < j < n - 1:
+                areas[j] = triangle_area(points[prev[j]], points[j], points[nxt[j]])
+                heapq.heappush(heap, (areas[j], j))
+    return ranks
+
+
+def segment_distance(p, a, b):
+    """Distance from p to segment ab (planar)."""
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length2 = dx * dx + dy * dy
+    if length2 == 0:
+        return math.hypot(p[0] - a[0], p[1] - a[1])
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length2))
+    return math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+
+
+def max_deviation(points, keep):
+    """Largest distance from a dropped vertex to the simplified segment spanning it."""
+    worst = 0.0
+    anchor = 0
+    for i in range(1, len(points)):
+        if keep[i]:
+            for j in range(anchor + 1, i):
+                worst = max(worst, segment_distance(points[j], points[anchor], points[i]))
+            anchor = i
+    return worst
+
+
+def keep_mask(ranks, count):
+    """Keeps the count highest-ranked vertices (endpoints always kept)."""
+    count = max(min(count, len(ranks)), min(2, len(ranks)))
+    order = sorted(range(len(ranks)), key=lambda i: ranks[i], reverse=True)
+    keep = [False] * len(ranks)
+    for i in order[:count]:
+        keep[i] = True
+    return keep
+
+
+def subsequence_mask(coords, kept):
+    """Keep mask of coords for a simplification that only drops vertices."""
+    keep, j = [False] * len(coords), 0
+    for i, coord in enumerate(coords):
+        if j < len(kept) and coord == kept[j]:
+            keep[i] = True
+            j += 1
+    return keep
+
+
+def fewest_vertices_within(points, ranks, max_error_nm):
+    """Smallest vertex count whose simplification stays within max_error_nm."""
+    low, high = min(MIN_VERTICES, len(points)), len(points)
+    while low < high:
+        middle = (low + high) // 2
+        if max_deviation(points, keep_mask(ranks, middle)) <= max_error_nm:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def allocate_budget(importances, budget):
+    """Splits a vertex budget between rings by their scale-relative importance.
+
+    importances holds, per ring, the vertex ranks divided by the square of the
+    ring's extent, so the same threshold means the same relative detail for a
+    small CTR and a large FIR. Returns the vertex count per ring.
+    """
+    counts = [min(MIN_VERTICES, len(ranks)) for ranks in importances]
+    remaining = budget - sum(counts)
+    if remaining <= 0:
+        return counts
+    # Candidates beyond each ring's minimum, most important first
+    candidates = []
+    for ring, ranks in enumerate(importances):
+        ordered = sorted(ranks, reverse=True)
+        candidates.extend((value, ring) for value in ordered[counts[ring]:])
+    for _, ring in heapq.nlargest(remaining, candidates):
+        counts[ring] += 1
+    return counts
+
+
+def extent_nm(points):
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return max(math.hypot(max(xs) - min(xs), max(ys) - min(ys)), 1e-9)
+
+
+def rank_rings(sectors):
+    """One RankedRing per (name, [(lat, lon), ...]) sector."""
+    rings = []
+    for name, coords in sectors:
+        points = project_nm(coords)
+        rings.append(RankedRing(name, coords, visvalingam_ranks(points), extent_nm(points) if points else 1.0))
+    return rings
+
+
+def level_of_detail(rings, vertex_budget):
+    """Coordinates of every RankedRing of a layer cut to a vertex budget shared like simplify_section's."""
+    counts = allocate_budget([ring.importances for ring in rings], vertex_budget)
+    return [ring.simplified(count) for ring, count in zip(rings, counts)]
+
+
+def simplify_section(sectors, vertex_budget=None, max_error_nm=None, rings=None):
+    """Simplifies a whole section of rings adaptively.
+
+    sectors is a list of (name, [(lat, lon), ...]); rings, when given, are
+    their rank_rings() computed earlier. Returns the simplified coordinate
+    lists (same order) and one SectorReport per sector.
+    """
+    if vertex_budget is None and max_error_nm is None:
+        raise ValueError("Either vertex_budget or max_error_nm is required")
+
+    projected = [project_nm(coords) for _, coords in sectors]
+    ranks = [ring.ranks for ring in rings] if rings is not None else [visvalingam_ranks(points) for points in projected]
+
+    counts = [len(points) for points in projected]
+    if max_error_nm is not None:
+        counts = [fewest_vertices_within(points, ring_ranks, max_error_nm) for points, ring_ranks in zip(projected, ranks)]
+    if vertex_budget is not None:
+        importances = [
+            [rank / extent_nm(points) ** 2 for rank in ring_ranks] if points else []
+            for points, ring_ranks in zip(projected, ranks)
+        ]
+        counts = [min(count, budget) for count, budget in zip(counts, allocate_budget(importances, vertex_budget))]
+
+    simplified, report = [], []
+    for (name, coords), points, ring_ranks, count in zip(sectors, projected, ranks, counts):
+        keep = keep_mask(ring_ranks, count)
+        simplified.append([coord for coord, kept in zip(coords, keep) if kept])
+        report.append(SectorReport(name, len(coords), sum(keep), max_deviation(points, keep)))
+    return simplified, report
+
+
+def format_report(report):
+    """Yields human readable report lines, one per sector plus a total."""
+    for entry in report:
+        yield f"{entry.name}: {entry.vertices_in} -> {entry.vertices_out} vertices, max deviation {entry.max_deviation_nm:.3f} NM"
+    total_in = sum(entry.vertices_in for entry in report)
+    total_out = sum(entry.vertices_out for entry in report)
+    worst = max((entry.max_deviation_nm for entry in report), default=0.0)
+    yield f"Total: {total_in} -> {total_out} vertices, max deviation {worst:.3f} NM"
+
+
+def simplify_sectors(sectors, simplify, vertex_budget=None, max_error_nm=None, arc_error_nm=None, report=None, ranked=None):
+    """Simplifies the rings of one sector layer the way the extractors were asked to.
+
+    sectors is a list of (name, [(lat, lon), ...]) and simplify the layer's
+    fixed-tolerance function, used unless vertex_budget or max_error_nm is
+    given. With arc_error_nm, circular arcs are rebuilt first (see
+    geoaisweb.arcs). Per-sector statistics are appended to report, if given,
+    whenever one of the optional stages runs. When ranked is a list, a
+    RankedRing per sector (after arc reconstruction) is appended to it for
+    level_of_detail().
+    """
+    arc_errors = [0.0] * len(sectors)
+    vertices_in = [len(coords) for _, coords in sectors]
+    if arc_error_nm is not None:
+        from geoaisweb.arcs import reconstruct_arcs
+        rebuilt = [reconstruct_arcs(coords, arc_error_nm) for _, coords in sectors]
+        sectors = [(name, coords) for (name, _), (coords, _) in zip(sectors, rebuilt)]
+        arc_errors = [error for _, error in rebuilt]
+
+    rings = None
+    if ranked is not None:
+        rings = rank_rings(sectors)
+        ranked.extend(rings)
+
+    if vertex_budget is not None or max_error_nm is not None:
+        simplified, sector_report = simplify_section(sectors, vertex_budget, max_error_nm, rings)
+    elif arc_error_nm is not None:
+        # Rings without arcs still get the layer's fixed tolerance
+        simplified, sector_report = [], []
+        for (name, coords), error in zip(sectors, arc_errors):
+            result = coords if error else simplify(coords)
+            deviation = 0.0 if error else max_deviation(project_nm(coords), subsequence_mask(coords, result))
+            simplified.append(result)
+            sector_report.append(SectorReport(name, len(coords), len(result), deviation))
+    else:
+        return [simplify(coords) for _, coords in sectors]
+
+    if report is not None:
+        for entry, count, error in zip(sector_report, vertices_in, arc_errors):
+            entry.vertices_in = count
+            entry.max_deviation_nm += error
+            report.append(entry)
+    return simplified
+
+
+def parse_budgets(text):
+    """'4000,1000,250' -> [4000, 1000, 250] (the --lod option)."""
+    return [int(budget) for budget in text.split(",") if budget.strip()] if text else []
+
+
+def lod_sectors(kind, lod, vertex_budget):
+    """{fir: 'T;<KIND> name;lat;lon;' lines} for the (fir, RankedRing) pairs of a layer cut to vertex_budget."""
+    fir_sectors = {}
+    simplified = level_of_detail([ring for _, ring in lod], vertex_budget)
+    for (fir, ring), coords in zip(lod, simplified):
+        fir_sectors.setdefault(fir, []).extend(f"T;{kind} {ring.name};{lat};{lon};" for lat, lon in coords)
+    return fir_sectors
+
+
+def lod_path(path, vertex_budget):
+    """cta.txt -> cta.lod500.txt"""
+    stem, extension = os.path.splitext(path)
+    return f"{stem}.lod{vertex_budget}{extension}"
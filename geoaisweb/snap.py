@@ -0,0 +1,142 @@
+"""Nearest-fix snapping for airway vertices.
+
+Airway vertices are matched to waypoints/navaids by exact rounded
+coordinates first. Vertices without an exact match are snapped to the
+nearest fix within a threshold in NM using a SciPy cKDTree over unit vectors
+(chord distance is monotonic in great-circle distance), or a lat/lon grid
+when SciPy is not installed. Vertices with no fix in range, or with more
+than one different fix in range, are reported.
+"""
+import logging
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_NM = 3440.065
+DEFAULT_SNAP_NM = 0.05
+
+
+@dataclass
+class SnapReport:
+    exact: int = 0
+    snapped: int = 0
+    unmatched: list = field(default_factory=list)   # [(lon, lat)]
+    ambiguous: list = field(default_factory=list)   # [((lon, lat), [ident, ...])]
+
+    def log(self):
+        logger.info(f"Fix matching: {self.exact} exact, {self.snapped} snapped, "
+                    f"{len(self.unmatched)} unmatched, {len(self.ambiguous)} ambiguous")
+        for lon, lat in self.unmatched:
+            logger.debug(f"No fix within range of {lat:.6f},{lon:.6f}")
+        for (lon, lat), idents in self.ambiguous:
+            logger.warning(f"Ambiguous fix at {lat:.6f},{lon:.6f}: {', '.join(idents)}")
+
+
+def chord_length(threshold_nm):
+    """Chord length on the unit sphere for a great-circle distance in NM."""
+    return 2.0 * math.sin(min(threshold_nm / EARTH_RADIUS_NM, math.pi) / 2.0)
+
+
+def unit_vectors(points):
+    """(lon, lat) degrees -> array of 3D unit vectors."""
+    import numpy as np
+
+    coords = np.radians(np.asarray(points, dtype=np.float64).reshape(-1, 2))
+    lon, lat = coords[:, 0], coords[:, 1]
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+class GridIndex:
+    """Fallback neighbour search: fixes bucketed in lat/lon cells of the threshold size."""
+
+    def __init__(self, points, threshold_nm):
+        self.points = list(points)
+        self.cell = max(threshold_nm / 60.0, 1e-6)  # degrees of latitude
+        self.cells = defaultdict(list)
+        for i, (lon, lat) in enumerate(self.points):
+            self.cells[self.key(lon, lat)].append(i)
+        self.threshold_nm = threshold_nm
+
+    def key(self, lon, lat):
+        return math.floor(lat / self.cell), math.floor(lon * math.cos(math.radians(lat)) / self.cell)
+
+    def query(self, lon, lat):
+        """Indices of fixes within the threshold, nearest first."""
+        row, column = self.key(lon, lat)
+        candidates = []
+        for d_row in (-1, 0, 1):
+            for d_column in (-2, -1, 0, 1, 2):  # cos(lat) differs slightly between neighbouring rows
+                for i in self.cells.get((row + d_row, column + d_column), ()):
+                    distance = great_circle_nm((lon, lat), self.points[i])
+                    if distance <= self.threshold_nm:
+                        candidates.append((distance, i))
+        return [i for _, i in sorted(candidates)]
+
+
+def great_circle_nm(a, b):
+    lon1, lat1, lon2, lat2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * math.asin(min(1.0, math.sqrt(h)))
+
+
+class FixSnapper:
+    """Resolves (lon, lat) vertices to fix idents, exactly or by nearest fix within threshold_nm."""
+
+    def __init__(self, fixes, threshold_nm=DEFAULT_SNAP_NM):
+        self.fixes = fixes
+        self.threshold_nm = threshold_nm
+        self.points = list(fixes)
+        self.idents = [fixes[point] for point in self.points]
+        self.tree = None
+        self.grid = None
+        if threshold_nm > 0 and self.points:
+            try:
+                from scipy.spatial import cKDTree
+                self.tree = cKDTree(unit_vectors(self.points))
+            except ImportError:
+                logger.info("SciPy not installed; using the grid index for fix snapping")
+                self.grid = GridIndex(self.points, threshold_nm)
+
+    def resolve(self, vertices):
+        """Returns ({vertex: ident}, SnapReport) for an iterable of (lon, lat) vertices."""
+        report = SnapReport()
+        resolved = {}
+        missing = []
+        for vertex in dict.fromkeys(vertices):
+            ident = self.fixes.get(vertex)
+            if ident:
+                resolved[vertex] = ident
+                report.exact += 1
+            else:
+                missing.append(vertex)
+
+        for vertex, neighbours in zip(missing, self.neighbours(missing)):
+            idents = list(dict.fromkeys(self.idents[i] for i in neighbours))
+            if not idents:
+                report.unmatched.append(vertex)
+                continue
+            resolved[vertex] = idents[0]  # nearest
+            report.snapped += 1
+            if len(idents) > 1:
+                report.ambiguous.append((vertex, idents))
+        return resolved, report
+
+    def neighbours(self, vertices):
+        """Fix indices within the threshold of each vertex, nearest first."""
+        if not vertices or (self.tree is None and self.grid is None):
+            return [[] for _ in vertices]
+        if self.grid is not None:
+            return [self.grid.query(lon, lat) for lon, lat in vertices]
+
+        import numpy as np
+
+        # k=4 nearest is plenty to detect ambiguity; beyond the radius distances are inf
+        k = min(4, len(self.points))
+        distances, indices = self.tree.query(unit_vectors(vertices), k=k,
+                                             distance_upper_bound=chord_length(self.threshold_nm))
+        distances = np.asarray(distances).reshape(len(vertices), k)
+        indices = np.asarray(indices).reshape(len(vertices), k)
+        within = np.isfinite(distances).tolist()
+        return [[i for i, ok in zip(row, row_within) if ok] for row, row_within in zip(indices.tolist(), within)]
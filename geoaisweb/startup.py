@@ -0,0 +1,78 @@
+"""Startup budget check for the extractor entry points.
+
+Imports each script under ``python -X importtime`` in a fresh interpreter and
+reports the cumulative import time of the script module, failing when it is
+over budget or when a heavy dependency is imported eagerly:
+
+    python -m geoaisweb.startup --budget-ms 60
+"""
+import argparse
+import glob
+import os
+import subprocess
+import sys
+
+# Dependencies that must only be imported once a run actually needs them.
+HEAVY_MODULES = ("requests", "bs4", "lxml", "shapely", "geopy", "numpy", "scipy")
+DEFAULT_BUDGET_MS = 60.0
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def entry_points(root=REPO_ROOT):
+    """Returns the module names of the uppercase extractor scripts."""
+    return sorted(os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(root, "[A-Z]*.py")))
+
+
+def measure(module, root=REPO_ROOT):
+    """Imports module with -X importtime; returns (cumulative_ms, heavy modules seen)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=root, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip()}")
+
+    cumulative_us = None
+    heavy = set()
+    for line in result.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = [field.strip() for field in line[len("import time:"):].split("|")]
+        if len(fields) != 3 or not fields[1].isdigit():
+            continue
+        name = fields[2].strip()
+        if name.split(".")[0] in HEAVY_MODULES:
+            heavy.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(fields[1])
+    return (cumulative_us or 0) / 1000.0, sorted(heavy)
+
+
+def check(modules, budget_ms=DEFAULT_BUDGET_MS, root=REPO_ROOT):
+    """Prints a report and returns True when every module is within budget."""
+    ok = True
+    for module in modules:
+        elapsed_ms, heavy = measure(module, root)
+        status = "ok"
+        if heavy:
+            status = "EAGER " + ",".join(heavy)
+            ok = False
+        elif elapsed_ms > budget_ms:
+            status = "OVER BUDGET"
+            ok = False
+        print(f"{module:<22} {elapsed_ms:8.1f} ms  {status}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the import-time budget of the extractor scripts")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Maximum cumulative import time per script (default: {DEFAULT_BUDGET_MS:g} ms)")
+    parser.add_argument("modules", nargs="*", help="Script modules to check (default: all)")
+    args = parser.parse_args(argv)
+    sys.exit(0 if check(args.modules or entry_points(), args.budget_ms) else 1)
+
+
+if __name__ == "__main__":
+    main()
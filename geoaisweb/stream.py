@@ -0,0 +1,217 @@
+"""Streaming WFS pipeline: download, parse, transform and consume at the same time.
+
+    download thread --chunks--> parser thread --features--> transform workers
+        --records--> caller (in document order)
+
+Every hand-off is a bounded queue, so a slow stage holds back the ones before
+it instead of buffering the whole layer. The HTTP body is decoded and fed to
+an incremental XMLPullParser as it arrives; each completed feature element is
+detached from the tree and handed to a worker, and results are re-ordered by
+feature position before they are yielded.
+"""
+import codecs
+import logging
+import queue
+import threading
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+QUEUE_SIZE = 64
+_DONE = object()
+
+
+@dataclass
+class StreamStats:
+    url: str
+    bytes: int = 0
+    features: int = 0
+    download_s: float = 0.0
+    total_s: float = 0.0
+
+
+class _Pipeline:
+    def __init__(self, url, feature_tag, transform, workers, queue_size, chunk_size, text_filter, timeout, archive):
+        self.url = url
+        self.archive = archive
+        self.feature_tag = feature_tag
+        self.transform = transform
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.text_filter = text_filter
+        self.timeout = timeout
+        self.chunks = queue.Queue(queue_size)
+        self.features = queue.Queue(queue_size)
+        self.results = queue.Queue(queue_size)
+        self.stop = threading.Event()
+        self.error = None
+        self.stats = StreamStats(url)
+
+    def put(self, target, item):
+        """Blocking put that gives up once the pipeline is stopping."""
+        while not self.stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def take(self, source):
+        """Blocking get that returns _DONE once the pipeline is stopping."""
+        while True:
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                if self.stop.is_set():
+                    return _DONE
+
+    def fail(self, error):
+        if self.error is None:
+            self.error = error
+        self.stop.set()
+
+    def archive_chunk(self, chunk=None):
+        """Feeds the archive (closes it when chunk is None). An archive error drops the archive, not the layer."""
+        try:
+            if chunk is None:
+                self.archive.close()
+            else:
+                self.archive.feed(chunk)
+                return
+        except Exception as e:
+            logger.warning(f"Not archiving {self.url}: {e}")
+            self.archive.abort()
+        self.archive = None
+
+    def download(self):
+        from geoaisweb.client import HttpError, HttpTimeout, get_client
+
+        started = time.perf_counter()
+        try:
+            with get_client().stream(self.url, timeout=self.timeout, chunk_size=self.chunk_size) as response:
+                # Same decoding as response.text (ISO-8859-1 when no charset is sent)
+                decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+                carry = ""
+                for chunk in response.iter_bytes():
+                    self.stats.bytes += len(chunk)
+                    if self.archive is not None:
+                        self.archive_chunk(chunk)
+                    text = carry + decoder.decode(chunk)
+                    # Hold back one character so two-character filters never see a split pair
+                    text, carry = text[:-1], text[-1:]
+                    if text and not self.put(self.chunks, self.text_filter(text) if self.text_filter else text):
+                        return
+                text = carry + decoder.decode(b"", final=True)
+                if text:
+                    self.put(self.chunks, self.text_filter(text) if self.text_filter else text)
+            if self.archive is not None:
+                self.archive_chunk()
+        except HttpTimeout:
+            self.fail(Exception(f"Request timed out after {self.timeout} seconds: {self.url}"))
+        except HttpError as e:
+            self.fail(Exception(f"Failed to fetch URL {self.url}: {str(e)}"))
+        except Exception as e:
+            self.fail(e)
+        finally:
+            if self.archive is not None:
+                self.archive.abort()
+            self.stats.download_s = time.perf_counter() - started
+            self.put(self.chunks, _DONE)
+
+    def parse(self):
+        parser = ET.XMLPullParser(events=("start", "end"))
+        root = None
+        position = 0
+        try:
+            while True:
+                chunk = self.take(self.chunks)
+                if chunk is _DONE:
+                    break
+                parser.feed(chunk)
+                for event, element in parser.read_events():
+                    if event == "start":
+                        if root is None:
+                            root = element
+                        continue
+                    if element.tag == self.feature_tag:
+                        if not self.put(self.features, (position, element)):
+                            return
+                        position += 1
+                    # Drop finished top-level members so the tree never holds the whole layer
+                    if root is not None and len(root) and root[-1] is element:
+                        del root[-1]
+            if self.error is None:
+                parser.close()
+        except Exception as e:
+            self.fail(e)
+        finally:
+            self.stats.features = position
+            for _ in range(self.workers):
+                self.put(self.features, _DONE)
+
+    def work(self):
+        try:
+            while True:
+                item = self.take(self.features)
+                if item is _DONE:
+                    break
+                position, element = item
+                if not self.put(self.results, (position, self.transform(element))):
+                    return
+        except Exception as e:
+            self.fail(e)
+        finally:
+            self.put(self.results, _DONE)
+
+    def run(self):
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self.download, daemon=True), threading.Thread(target=self.parse, daemon=True)]
+        threads += [threading.Thread(target=self.work, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            pending, following, finished = {}, 0, 0
+            while finished < self.workers:
+                item = self.take(self.results)
+                if item is _DONE:
+                    finished += 1
+                    continue
+                position, result = item
+                pending[position] = result
+                # Re-order: yield as soon as the next feature in document order is ready
+                while following in pending:
+                    result = pending.pop(following)
+                    following += 1
+                    if result is not None:
+                        yield result
+        finally:
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+            self.stats.total_s = time.perf_counter() - started
+        if self.error is not None:
+            raise self.error
+
+
+def stream_features(url, feature_tag, transform, workers=2, queue_size=QUEUE_SIZE, chunk_size=CHUNK_SIZE,
+                    text_filter=None, timeout=30, stats=None, archive=None):
+    """Yields transform(element) for every feature_tag element of the layer at url, in document order.
+
+    Results of None are skipped. text_filter, if given, is applied to each
+    decoded text chunk before parsing (e.g. NAVAIDS.clean_xml); it must not
+    depend on more than two consecutive characters. When stats is a list,
+    the layer's StreamStats is appended to it once the stream is exhausted.
+    archive, a geoaisweb.archive.ArchiveWriter, receives the raw bytes as
+    they arrive and is closed (or aborted on error) with the download; a
+    payload it cannot index is logged and left unarchived, never raised.
+    """
+    pipeline = _Pipeline(url, feature_tag, transform, workers, queue_size, chunk_size, text_filter, timeout, archive)
+    try:
+        yield from pipeline.run()
+    finally:
+        if stats is not None:
+            stats.append(pipeline.stats)
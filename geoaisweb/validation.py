@@ -0,0 +1,267 @@
+"""Validation and repair of the simplified sector rings before they are written.
+
+Every sector of the CTA/TMA/CTR/FIR/ATZ layers is checked for:
+
+* too_few_vertices: fewer than three distinct vertices (not repairable);
+* duplicate_vertices: consecutive repeated vertices (removed);
+* unclosed: last vertex different from the first (closing vertex added);
+* invalid: self-intersections and other OGC validity errors, as introduced
+  by aggressive simplification (replaced by shapely's make_valid result,
+  one ring per polygon when it falls apart into several).
+
+Overlaps between sibling sectors of one layer are found with a shapely
+STRtree (candidate pairs by bounding box, then the intersection area in
+NM^2). They are reported, never repaired: stacked CTA/TMA sectors overlap on
+purpose, while FIR slivers usually come from simplifying shared borders.
+
+The report is JSON (SCT_BUILDER --validation-report, or
+python -m geoaisweb.validation) with one entry per layer.
+"""
+import argparse
+import datetime
+import json
+import logging
+import math
+import time
+from dataclasses import asdict, dataclass, field
+
+from geoaisweb import airac
+
+logger = logging.getLogger(__name__)
+
+MIN_OVERLAP_NM2 = 0.01  # shared borders differ by rounding; smaller intersections are not overlaps
+
+
+@dataclass
+class SectorIssue:
+    kind: str
+    name: str
+    fir: str
+    check: str
+    detail: str
+    repaired: bool
+
+
+@dataclass
+class SectorOverlap:
+    kind: str
+    first: str
+    second: str
+    first_fir: str
+    second_fir: str
+    area_nm2: float
+    share: float    # of the smaller sector's area
+
+
+@dataclass
+class LayerValidation:
+    kind: str
+    sectors: int = 0
+    seconds: float = 0.0
+    issues: list = field(default_factory=list)
+    overlaps: list = field(default_factory=list)
+
+    @property
+    def unrepaired(self):
+        return [issue for issue in self.issues if not issue.repaired]
+
+
+def sector_rings(kind, lines):
+    """Yields (name, [(lat, lon), ...]) for each run of 'T;<KIND> name;lat;lon;' lines.
+
+    The parts of a multi-part sector share its name: a ring also ends where it
+    comes back to its first vertex.
+    """
+    name, ring = None, []
+    for line in lines:
+        _, label, lat, lon, _ = line.split(";")
+        current = label[len(kind) + 1:]
+        if current != name or (len(ring) > 1 and ring[-1] == ring[0] and len(set(ring)) >= 3):
+            if ring:
+                yield name, ring
+            name, ring = current, []
+        ring.append((float(lat), float(lon)))
+    if ring:
+        yield name, ring
+
+
+def _area_nm2(polygon):
+    """Area of a lon/lat polygon in NM^2 (equirectangular at its centroid)."""
+    if polygon.is_empty:
+        return 0.0
+    return polygon.area * 3600.0 * math.cos(math.radians(polygon.centroid.y))
+
+
+def _polygons(geometry):
+    """The non-empty polygons of a make_valid result, largest first."""
+    from shapely.geometry import MultiPolygon, Polygon
+
+    parts = [geometry] if isinstance(geometry, Polygon) else getattr(geometry, "geoms", [])
+    parts = [part for part in parts if isinstance(part, (Polygon, MultiPolygon))]
+    polygons = [polygon for part in parts for polygon in getattr(part, "geoms", [part]) if not polygon.is_empty]
+    return sorted(polygons, key=lambda polygon: polygon.area, reverse=True)
+
+
+def check_ring(ring, repair=True):
+    """Checks one (lat, lon) ring. Returns ([ring, ...], [(check, detail, repaired)]).
+
+    The ring is repaired when asked; an invalid ring that make_valid splits
+    into several polygons comes back as one ring per polygon.
+    """
+    problems = []
+    deduplicated = [vertex for i, vertex in enumerate(ring) if i == 0 or vertex != ring[i - 1]]
+    if len(deduplicated) != len(ring):
+        problems.append(("duplicate_vertices", f"{len(ring) - len(deduplicated)} repeated vertices", repair))
+        if repair:
+            ring = deduplicated
+    if len(set(deduplicated)) < 3:
+        problems.append(("too_few_vertices", f"{len(set(deduplicated))} distinct vertices", False))
+        return [ring], problems
+    if ring[0] != ring[-1]:
+        problems.append(("unclosed", "last vertex differs from the first", repair))
+        if repair:
+            ring = ring + ring[:1]
+
+    try:
+        from shapely.geometry import Polygon
+        from shapely.validation import explain_validity, make_valid
+    except ImportError:
+        return [ring], problems
+    polygon = Polygon([(lon, lat) for lat, lon in ring])
+    if polygon.is_valid:
+        return [ring], problems
+    detail = explain_validity(polygon)
+    fixed = _polygons(make_valid(polygon)) if repair else []
+    if not fixed:
+        problems.append(("invalid", detail, False))
+        return [ring], problems
+    if len(fixed) > 1:
+        detail += f"; split into {len(fixed)} rings"
+    problems.append(("invalid", detail, True))
+    return [[(lat, lon) for lon, lat in part.exterior.coords] for part in fixed], problems
+
+
+def find_overlaps(kind, sectors, min_area_nm2=MIN_OVERLAP_NM2):
+    """SectorOverlap for each pair of (name, fir, ring) sectors whose interiors intersect."""
+    try:
+        from shapely import STRtree
+        from shapely.geometry import Polygon
+        from shapely.validation import make_valid
+    except ImportError:
+        logger.info("shapely 2 not installed; sector overlaps are not checked")
+        return []
+
+    polygons = [make_valid(Polygon([(lon, lat) for lat, lon in ring])) for _, _, ring in sectors]
+    if not polygons:
+        return []
+    tree = STRtree(polygons)
+    # Every intersecting pair from the tree at once; each pair appears in both orders
+    first, second = tree.query(polygons, predicate="intersects")
+    areas = {}
+    overlaps = []
+    for i, j in zip(first.tolist(), second.tolist()):
+        if i >= j:
+            continue
+        area = _area_nm2(polygons[i].intersection(polygons[j]))
+        if area <= min_area_nm2:
+            continue
+        for k in (i, j):
+            if k not in areas:
+                areas[k] = _area_nm2(polygons[k])
+        smaller = min(areas[i], areas[j])
+        overlaps.append(SectorOverlap(kind, sectors[i][0], sectors[j][0], sectors[i][1], sectors[j][1],
+                                      round(area, 3), round(area / smaller, 6) if smaller else 1.0))
+    return overlaps
+
+
+def validate_layer(kind, fir_sectors, repair=True):
+    """Checks (and repairs) one layer's {fir: lines}. Returns (fir_sectors, LayerValidation)."""
+    started = time.perf_counter()
+    result = LayerValidation(kind)
+    sectors = []
+    repaired_sectors = {}
+    for fir, lines in fir_sectors.items():
+        fir_lines = []
+        changed = False
+        for name, ring in sector_rings(kind, lines):
+            checked, problems = check_ring(ring, repair)
+            for check, detail, repaired in problems:
+                result.issues.append(SectorIssue(kind, name, fir, check, detail, repaired))
+            changed = changed or len(checked) != 1 or checked[0] is not ring
+            for part in checked:
+                fir_lines.extend(f"T;{kind} {name};{lat};{lon};" for lat, lon in part)
+                sectors.append((name, fir, part))
+        repaired_sectors[fir] = fir_lines if changed else lines
+    result.sectors = len(sectors)
+    result.overlaps = find_overlaps(kind, [sector for sector in sectors if len(set(sector[2])) >= 3])
+    result.seconds = time.perf_counter() - started
+    for issue in result.issues:
+        state = "repaired" if issue.repaired else "not repaired"
+        logger.warning(f"{kind} {issue.name}: {issue.check} ({issue.detail}), {state}")
+    return repaired_sectors, result
+
+
+def validate_sectors(dataset, kinds=None, repair=True):
+    """Validates dataset.sectors in place (all layers, or only kinds); results go to dataset.validation."""
+    kinds = list(dataset.sectors) if kinds is None else kinds
+    for kind in kinds:
+        dataset.sectors[kind], dataset.validation[kind] = validate_layer(kind, dataset.sectors[kind], repair)
+    if kinds:
+        logger.info(summary([dataset.validation[kind] for kind in kinds]))
+
+
+def summary(layers):
+    """One log line for a list of LayerValidation."""
+    sectors = sum(layer.sectors for layer in layers)
+    issues = sum(len(layer.issues) for layer in layers)
+    unrepaired = sum(len(layer.unrepaired) for layer in layers)
+    overlaps = sum(len(layer.overlaps) for layer in layers)
+    seconds = sum(layer.seconds for layer in layers)
+    return (f"Validated {sectors} sectors in {seconds * 1000:.0f} ms: {issues} issues ({unrepaired} not repaired), "
+            f"{overlaps} overlapping pairs")
+
+
+def report_dict(validation):
+    """The JSON report for {kind: LayerValidation}."""
+    return {
+        "generated": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "airac_cycle": airac.cycle(),
+        "layers": {
+            kind: {
+                "sectors": layer.sectors,
+                "seconds": round(layer.seconds, 4),
+                "issues": [asdict(issue) for issue in layer.issues],
+                "overlaps": [asdict(overlap) for overlap in layer.overlaps],
+            }
+            for kind, layer in validation.items()
+        },
+    }
+
+
+def write_report(validation, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report_dict(validation), f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    logger.info(f"Validation report written to {path}")
+
+
+def main(argv=None):
+    from geoaisweb.build import load_dataset
+
+    parser = argparse.ArgumentParser(description="Validate the sector layers and print a JSON report")
+    parser.add_argument("--base-url", help="WFS endpoint (default: $GEOAISWEB_BASE_URL or GEOAISWEB)")
+    parser.add_argument("--vertex-budget", type=int, help="Validate after adaptive simplification to this budget")
+    parser.add_argument("--max-error-nm", type=float, help="Validate after adaptive simplification to this error")
+    parser.add_argument("--output", help="Write the report here instead of stdout")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    dataset = load_dataset(args.base_url, vertex_budget=args.vertex_budget, max_error_nm=args.max_error_nm)
+    if args.output:
+        write_report(dataset.validation, args.output)
+    else:
+        print(json.dumps(report_dict(dataset.validation), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Cheap change detection for WFS layers, used by SCT_BUILDER --watch.
+
+Each poll asks the server for as little as it can answer:
+
+1. a conditional HEAD request: ETag (If-None-Match, 304 when unchanged) or
+   Last-Modified, when the server sends them;
+2. otherwise resultType=hits for the feature count plus a SHA-1 of a small
+   projection of the layer (fid and key attribute only, via propertyName).
+
+The projection misses edits that only move geometry, so a new AIRAC cycle
+always counts as a change of every layer.
+"""
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+
+from geoaisweb import airac
+from geoaisweb.layers import layer_keys
+from geoaisweb.wfs import feature_url
+
+logger = logging.getLogger(__name__)
+
+# Attribute hashed for each layer when the server has no ETag / Last-Modified
+PROJECTIONS = layer_keys()
+HITS_RE = re.compile(rb'numberOfFeatures="(\d+)"')
+
+
+@dataclass(frozen=True)
+class LayerVersion:
+    """Whatever the server told us about a layer; equal versions mean unchanged."""
+    cycle: str
+    etag: str = None
+    last_modified: str = None
+    count: int = None
+    digest: str = None
+
+
+class LayerPoller:
+    """Remembers the last version of each layer and reports which ones changed."""
+
+    def __init__(self, base_url=None, timeout=30):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.versions = {}
+
+    def probe(self, type_name):
+        """Current LayerVersion of a layer, from the cheapest request the server supports."""
+        from geoaisweb.client import get_client
+
+        client = get_client()
+        cycle = airac.cycle()
+        known = self.versions.get(type_name)
+        url = feature_url(type_name, self.base_url)
+        headers = {"If-None-Match": known.etag} if known is not None and known.etag else {}
+        response = client.head(url, timeout=self.timeout, headers=headers)
+        if response.status_code == 304 and known.cycle == cycle:
+            return known
+        if response.ok and (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+            return LayerVersion(cycle, etag=response.headers.get("ETag"),
+                                last_modified=response.headers.get("Last-Modified"))
+
+        response = client.get(feature_url(type_name, self.base_url, resultType="hits"), timeout=self.timeout)
+        match = HITS_RE.search(response.content)
+        count = int(match.group(1)) if match else None
+        response = client.get(feature_url(type_name, self.base_url, propertyName=PROJECTIONS.get(type_name)),
+                              timeout=self.timeout)
+        return LayerVersion(cycle, count=count, digest=hashlib.sha1(response.content).hexdigest())
+
+    def poll(self, type_names):
+        """{layer: new LayerVersion} for the layers that changed since accept() (all of them at first).
+
+        A layer that cannot be probed is left out and retried next time.
+        """
+        changed = {}
+        for type_name in type_names:
+            try:
+                version = self.probe(type_name)
+            except Exception as e:
+                logger.warning(f"Could not poll {type_name}: {e}")
+                continue
+            if self.versions.get(type_name) != version:
+                changed[type_name] = version
+        return changed
+
+    def accept(self, versions):
+        """Records versions once the layers have been fetched and processed."""
+        self.versions.update(versions)
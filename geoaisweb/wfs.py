@@ -0,0 +1,29 @@
+import os
+from urllib.parse import urlencode
+
+# Public GEOAISWEB endpoint. Override with the GEOAISWEB_BASE_URL environment
+# variable (e.g. to point the extractors at geoaisweb.mock_server).
+DEFAULT_BASE_URL = "https://geoaisweb.decea.mil.br/geoserver/ICA/ows"
+BASE_URL_ENV = "GEOAISWEB_BASE_URL"
+
+
+def get_base_url(base_url=None):
+    """Returns the WFS endpoint: explicit value, then environment, then default."""
+    return (base_url or os.environ.get(BASE_URL_ENV) or DEFAULT_BASE_URL).rstrip("?")
+
+
+def feature_url(type_name, base_url=None, **params):
+    """Builds a WFS 1.0.0 GetFeature URL for a layer such as 'ICA:airway'."""
+    query = {
+        "service": "WFS",
+        "version": "1.0.0",
+        "request": "GetFeature",
+        "typeName": type_name,
+    }
+    query.update({key: value for key, value in params.items() if value is not None})
+    return f"{get_base_url(base_url)}?{urlencode(query)}"
+
+
+def recording_name(type_name):
+    """Maps a typeName such as 'ICA:airway' to the file name of its payload (mock recordings, archive)."""
+    return type_name.replace(":", "_") + ".xml"
@@ -0,0 +1,33 @@
+import shutil
+
+import pytest
+
+from geoaisweb.mock_server import MockWFSServer
+from tests.wfs_fixtures import write_recordings
+
+
+@pytest.fixture(scope="session")
+def recordings(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("recordings")
+    write_recordings(directory)
+    return directory
+
+
+@pytest.fixture
+def wfs(recordings, tmp_path, monkeypatch):
+    """A MockWFSServer replaying its own copy of the recordings (server.data_dir), for a test run from an empty home.
+
+    Outputs that default to ~/Desktop or the working directory land in
+    tmp_path / "home"; caches go to tmp_path / "cache".
+    """
+    data_dir = tmp_path / "recordings"
+    shutil.copytree(recordings, data_dir)
+    home = tmp_path / "home"
+    (home / "Desktop").mkdir(parents=True)
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("GEOAISWEB_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "0")
+    monkeypatch.chdir(home)
+    with MockWFSServer(str(data_dir)) as server:
+        monkeypatch.setenv("GEOAISWEB_BASE_URL", server.base_url)
+        yield server
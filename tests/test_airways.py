@@ -0,0 +1,37 @@
+import AWY_EXTRACTOR
+from AWY_EXTRACTOR import build_airway_lines
+from geoaisweb.airways import AirwaySegment, merge_segments
+from tests.test_extractors import read_lines
+
+FIXES = {(-50.0, -10.0): "AAA", (-49.0, -10.0): "BBB", (-48.0, -10.0): "CCC", (-49.0, -9.0): "DDD"}
+
+
+def test_merge_segments():
+    a, b, c, d = (0, 0), (1, 0), (2, 0), (1, 1)
+    # A chain in any segment order keeps the direction of the segment seen first
+    assert merge_segments([[b, c], [a, b]]) == [[c, b, a]]
+    # A branch starts a new polyline instead of zig-zagging back
+    assert merge_segments([[a, b], [b, c], [b, d]]) == [[a, b, c], [b, d]]
+    assert merge_segments([[a, b], [(5, 5), (6, 6)], [b, c]]) == [[a, b, c], [(5, 5), (6, 6)]]
+
+
+def test_one_line_per_vertex():
+    airways = {
+        "UZ1": [AirwaySegment(2, [(-49.0, -10.0), (-48.0, -10.0)]), AirwaySegment(1, [(-50.0, -10.0), (-49.0, -10.0)]),
+                AirwaySegment(3, [(-49.0, -10.0), (-49.0, -9.0)])],
+        # The second segment starts a hair away from where the first ends: both ends snap to BBB
+        "W1": [AirwaySegment(1, [(-50.0, -10.0), (-49.0, -10.0)]), AirwaySegment(2, [(-49.000001, -10.0), (-48.0, -10.0)])],
+    }
+    upper, lower = build_airway_lines(airways, FIXES)
+    assert upper == ["T;UZ1;AAA;AAA;", "T;UZ1;BBB;BBB;", "T;UZ1;CCC;CCC;", "T;UZ1;BBB;BBB;", "T;UZ1;DDD;DDD;"]
+    assert lower == ["T;W1;AAA;AAA;", "T;W1;BBB;BBB;", "T;W1;CCC;CCC;"]
+
+
+def test_airways(wfs):
+    AWY_EXTRACTOR.main(["--base-url", wfs.base_url, "--output", "awy.txt"])
+    # Upper airways first; UZ10 branches at AZ001, so its branch is a second track from AZ001
+    assert read_lines("awy.txt") == [
+        "T;UZ10;AZ000;AZ000;", "T;UZ10;AZ001;AZ001;", "T;UZ10;AZ002;AZ002;", "T;UZ10;RE000;RE000;",
+        "T;UZ10;AZ001;AZ001;", "T;UZ10;AZ005;AZ005;",
+        "T;W5;BS000;BS000;", "T;W5;BS001;BS001;", "T;W5;BS002;BS002;",
+    ]
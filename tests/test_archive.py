@@ -0,0 +1,62 @@
+import logging
+import os
+
+import NAVAIDS
+from geoaisweb.archive import fetch_layer, layer_path, open_layer
+from geoaisweb.wfs import recording_name
+from tests.test_extractors import read_lines, sections
+from tests.wfs_fixtures import NDBS, SECTORS, VORS
+
+
+def inject(wfs, type_name, after, data):
+    """Inserts data into a recording right after the first occurrence of after."""
+    path = os.path.join(wfs.data_dir, recording_name(type_name))
+    with open(path, "rb") as f:
+        payload = f.read()
+    position = payload.index(after) + len(after)
+    with open(path, "wb") as f:
+        f.write(payload[:position] + data + payload[position:])
+
+
+def navaids(wfs, output_dir, *argv):
+    os.makedirs(output_dir, exist_ok=True)
+    NAVAIDS.main(["--base-url", wfs.base_url, "--output-dir", output_dir, *argv])
+    return read_lines(os.path.join(output_dir, NAVAIDS.Config.OUTPUT_FILE))
+
+
+def test_fetch_and_read(wfs):
+    path = fetch_layer("ICA:CTA", "archive", wfs.base_url)
+    with open(path, "rb") as archived, open(os.path.join(wfs.data_dir, recording_name("ICA:CTA")), "rb") as recorded:
+        assert archived.read() == recorded.read()
+    with open_layer("ICA:CTA", "archive") as layer:
+        assert len(layer) == len(SECTORS["CTA"])
+        assert sorted(layer.keys()) == sorted(SECTORS["CTA"])
+        assert layer.positions("AZ CTA 1") == [0]
+        assert layer.positions("CTA.2") == [1]
+        assert layer.positions("XX CTA 9") == []
+        assert b"<ICA:nam>AZ CTA 2</ICA:nam>" in layer.raw("AZ CTA 2")[0]
+        [element] = layer.elements("RE CTA 1")
+        assert element.get("fid") == "CTA.3"
+        subset = layer.document(["BS CTA 2", "AZ CTA 1"])
+        assert subset.count(b"<gml:featureMember>") == 2
+        assert subset.index(b"AZ CTA 1") < subset.index(b"BS CTA 2")
+
+
+def test_control_characters_are_archived(wfs):
+    expected = navaids(wfs, "plain")
+    # Not allowed in XML 1.0: the extractors strip it, the archive must not fail on it
+    inject(wfs, "ICA:vor", b"</ICA:ident>", b"\x02")
+    assert navaids(wfs, "archived", "--archive-dir", "archive") == expected
+    with open_layer("ICA:vor", "archive") as layer:
+        assert sorted(layer.keys()) == sorted(VORS)
+
+
+def test_archive_failure_keeps_extracting(wfs, caplog):
+    # Not UTF-8: the archive index parser rejects it, the extraction goes on without archiving the layer
+    inject(wfs, "ICA:ndb", b"</ICA:codeid>", b"\xff")
+    with caplog.at_level(logging.WARNING):
+        found = sections(navaids(wfs, "archived", "--archive-dir", "archive"))
+    assert [line.split(";")[0] for line in found["NDB"]] == sorted(NDBS)
+    assert [record for record in caplog.records if record.getMessage().startswith("Not archiving")]
+    assert not os.path.exists(layer_path("ICA:ndb", "archive"))
+    assert os.path.exists(layer_path("ICA:vor", "archive"))
@@ -0,0 +1,51 @@
+import math
+
+import pytest
+
+from geoaisweb.arcs import LocalProjection, reconstruct_arcs
+
+shapely = pytest.importorskip("shapely")
+
+
+def arc_ring(radius_nm, gap_deg, step_deg, lat0=-15.0, lon0=-47.0):
+    """A closed ring: an arc of 360 - gap_deg degrees densified every step_deg, closed by a straight chord."""
+    scale = math.cos(math.radians(lat0))
+    count = int((360 - gap_deg) / step_deg)
+    ring = [
+        (lat0 + radius_nm * math.sin(math.radians(k * step_deg)) / 60,
+         lon0 + radius_nm * math.cos(math.radians(k * step_deg)) / (60 * scale))
+        for k in range(count + 1)
+    ]
+    return ring + ring[:1]
+
+
+def deviation_nm(original, rebuilt):
+    projection = LocalProjection(original)
+    lines = [shapely.LineString([projection.forward(lat, lon) for lat, lon in ring]) for ring in (original, rebuilt)]
+    return shapely.hausdorff_distance(*lines, densify=0.01)
+
+
+def test_circle_within_bound():
+    ring = arc_ring(3.0, 0, 1)
+    rebuilt, bound = reconstruct_arcs(ring, 0.05)
+    assert len(rebuilt) < len(ring)
+    assert 0 < bound <= 0.05
+    assert deviation_nm(ring, rebuilt) <= bound
+
+
+def test_d_shape_keeps_its_flat_side():
+    # Half circle closed by its diameter: the diameter's end points are on the circle, the diameter is not
+    ring = arc_ring(3.0, 180, 2)
+    rebuilt, bound = reconstruct_arcs(ring, 0.05)
+    assert len(rebuilt) < len(ring)
+    assert bound <= 0.05
+    assert deviation_nm(ring, rebuilt) <= bound
+
+
+@pytest.mark.parametrize("gap_deg", [20, 60, 120, 200])
+@pytest.mark.parametrize("step_deg", [1, 3, 6])
+def test_arcs_with_a_chord_within_bound(gap_deg, step_deg):
+    ring = arc_ring(5.0, gap_deg, step_deg)
+    rebuilt, bound = reconstruct_arcs(ring, 0.05)
+    assert bound <= 0.05
+    assert deviation_nm(ring, rebuilt) <= max(bound, 1e-9)
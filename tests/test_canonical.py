@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+import AWY_EXTRACTOR
+import CTA_EXTRACTOR
+import NAVAIDS
+import NDB_EXTRACTOR
+import SCT_BUILDER
+import VOR_EXTRACTOR
+from geoaisweb.canonical import canonical_lines
+from tests.test_extractors import read_lines
+from tests.wfs_fixtures import NDBS, VORS, layers, write_layer
+
+SECTION = [
+    "//FIR SBRE",
+    "T;CTA RE CTA 2;-1.0;-50.0;", "T;CTA RE CTA 2;-1.0;-49.0;",
+    "T;CTA RE CTA 1;-2.0;-50.0;", "T;CTA RE CTA 1;-2.0;-49.0;",
+    "",
+    "//FIR SBAZ",
+    "T;CTA AZ CTA 1;-3.0;-60.0;", "T;CTA AZ CTA 1;-3.0;-59.0;",
+]
+
+
+def test_canonical_order():
+    # FIR groups by name, with the blank line before their header; the rings inside a group by name, each kept
+    # whole with its vertex order
+    assert list(canonical_lines(SECTION)) == [
+        "",
+        "//FIR SBAZ",
+        "T;CTA AZ CTA 1;-3.0;-60.0;", "T;CTA AZ CTA 1;-3.0;-59.0;",
+        "//FIR SBRE",
+        "T;CTA RE CTA 1;-2.0;-50.0;", "T;CTA RE CTA 1;-2.0;-49.0;",
+        "T;CTA RE CTA 2;-1.0;-50.0;", "T;CTA RE CTA 2;-1.0;-49.0;",
+    ]
+    # Points by ident; FIXES on airways (flag 0) first
+    assert list(canonical_lines(["B;1;", "A;2;"])) == ["A;2;", "B;1;"]
+    assert list(canonical_lines(["A;0;0;1;0", "B;0;0;0;0"], "FIXES")) == ["B;0;0;0;0", "A;0;0;1;0"]
+
+
+def test_spilled_sort_matches_in_memory():
+    lines = [f"T;UM{i % 37};{i};{i};" for i in range(500)] + [f"P{i % 91};{i};" for i in range(500)]
+    assert list(canonical_lines(lines, max_memory=256)) == list(canonical_lines(lines))
+
+
+def outputs(wfs, directory):
+    os.makedirs(directory)
+    VOR_EXTRACTOR.main(["--base-url", wfs.base_url, "--output", os.path.join(directory, "vor.txt")])
+    NDB_EXTRACTOR.main(["--base-url", wfs.base_url, "--output", os.path.join(directory, "ndb.txt")])
+    NAVAIDS.main(["--base-url", wfs.base_url, "--output-dir", directory])
+    CTA_EXTRACTOR.main(["--base-url", wfs.base_url, "--output", os.path.join(directory, "cta.txt")])
+    AWY_EXTRACTOR.main(["--base-url", wfs.base_url, "--output", os.path.join(directory, "awy.txt")])
+    SCT_BUILDER.main(["--base-url", wfs.base_url, "--output", os.path.join(directory, "brazil.sct")])
+    return {name: read_lines(os.path.join(directory, name)) for name in sorted(os.listdir(directory))}
+
+
+def test_server_order_does_not_matter(wfs):
+    first = outputs(wfs, "first")
+    # The same features, every layer in reverse order
+    for type_name, members in layers().items():
+        write_layer(wfs.data_dir, type_name, members[::-1])
+    assert outputs(wfs, "reversed") == first
+    assert [line.split(";")[0] for line in first["vor.txt"]] == sorted(VORS)
+    assert [line.split(";")[0] for line in first["ndb.txt"]] == sorted(NDBS)
+
+
+def test_build_is_reproducible(wfs):
+    SCT_BUILDER.main(["--base-url", wfs.base_url, "--output", "first.sct"])
+    SCT_BUILDER.main(["--base-url", wfs.base_url, "--output", "second.sct"])
+    with open("first.sct", "rb") as first, open("second.sct", "rb") as second:
+        assert first.read() == second.read()
+    # SOURCE_DATE_EPOCH=0 (see conftest) pins the date
+    assert read_lines("first.sct")[2].endswith(" on 1970-01-01 00:00:00")
+
+
+def test_unchanged_sectorfile_is_left_untouched(wfs):
+    SCT_BUILDER.main(["--base-url", wfs.base_url, "--output", "brazil.sct"])
+    os.utime("brazil.sct", (1, 1))
+    SCT_BUILDER.main(["--base-url", wfs.base_url, "--output", "brazil.sct"])
+    assert os.path.getmtime("brazil.sct") == pytest.approx(1)
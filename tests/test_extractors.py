@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+import APT_EXTRACTOR
+import ATZ_EXTRACTOR
+import CTA_EXTRACTOR
+import CTR_EXTRACTOR
+import FIR_EXTRACTOR
+import FIX_EXTRACTOR
+import HEL_EXTRACTOR
+import NAVAIDS
+import NDB_EXTRACTOR
+import TMA_EXTRACTOR
+import VOR_EXTRACTOR
+from tests.wfs_fixtures import AIRPORTS, AIRWAYS, FIRS, HELIPADS, NDBS, SECTORS, VORS, WAYPOINTS
+
+AIRWAY_FIXES = {fix for segments, _, _ in AIRWAYS.values() for _, start, end in segments for fix in (start, end)}
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def data_lines(lines):
+    return [line for line in lines if line.strip() and not line.startswith("//")]
+
+
+def sections(lines):
+    """{section: data lines} of a file with [SECTION] headers."""
+    found, section = {}, None
+    for line in lines:
+        if line.startswith("["):
+            section = line.strip("[]")
+            found[section] = []
+        elif section is not None and line.strip() and not line.startswith("//"):
+            found[section].append(line)
+    return found
+
+
+def test_vor(wfs):
+    VOR_EXTRACTOR.main(["--base-url", wfs.base_url, "--output", "vor.txt"])
+    lines = read_lines("vor.txt")
+    assert sorted(line.split(";")[0] for line in lines) == sorted(VORS)
+    assert "VA0;113.50;S008.30.00.000;W068.00.00.000;" in lines
+
+
+def test_ndb(wfs):
+    NDB_EXTRACTOR.main(["--base-url", wfs.base_url, "--output", "ndb.txt"])
+    lines = read_lines("ndb.txt")
+    assert sorted(line.split(";")[0] for line in lines) == sorted(NDBS)
+    assert "NA0;300;S008.00.00.000;W067.30.00.000;" in lines
+
+
+def test_fixes(wfs):
+    FIX_EXTRACTOR.main(["--base-url", wfs.base_url, "--output", "fixes.txt"])
+    flags = {line.split(";")[0]: line.split(";")[3] for line in read_lines("fixes.txt")}
+    assert set(flags) == set(WAYPOINTS)
+    assert {ident for ident, flag in flags.items() if flag == "0"} == AIRWAY_FIXES
+
+
+def test_navaids(wfs):
+    NAVAIDS.main(["--base-url", wfs.base_url, "--output-dir", "."])
+    found = sections(read_lines(NAVAIDS.Config.OUTPUT_FILE))
+    assert list(found) == ["FIXES", "VOR", "NDB"]
+    assert {line.split(";")[0] for line in found["FIXES"]} == set(WAYPOINTS)
+    assert sorted(line.split(";")[0] for line in found["VOR"]) == sorted(VORS)
+    assert sorted(line.split(";")[0] for line in found["NDB"]) == sorted(NDBS)
+
+
+@pytest.mark.parametrize("kind, module, output", [
+    ("FIR", FIR_EXTRACTOR, "fir.txt"),
+    ("CTA", CTA_EXTRACTOR, "cta.txt"),
+    ("TMA", TMA_EXTRACTOR, "tma.txt"),
+    ("CTR", CTR_EXTRACTOR, "ctr.txt"),
+    ("ATZ", ATZ_EXTRACTOR, "atz.txt"),
+])
+def test_sectors(wfs, kind, module, output):
+    module.main(["--base-url", wfs.base_url, "--output", output])
+    # ATZ is always written on the Desktop
+    path = output if os.path.exists(output) else os.path.join("Desktop", output)
+    lines = read_lines(path)
+    names = {line.split(";")[1] for line in data_lines(lines)}
+    assert names == {f"{kind} {name}" for name in (list(FIRS) if kind == "FIR" else SECTORS[kind])}
+    assert sorted(line for line in lines if line.startswith("//FIR")) == [f"//FIR {fir}" for fir in sorted(FIRS)]
+    for line in data_lines(lines):
+        _, _, lat, lon, rest = line.split(";")
+        assert -90 <= float(lat) <= 90 and -180 <= float(lon) <= 180 and rest == ""
+
+
+def test_airports(wfs):
+    APT_EXTRACTOR.main(["--base-url", wfs.base_url, "--output", "airport.txt"])
+    lines = read_lines("airport.txt")
+    groups, fir = {}, None
+    for line in lines:
+        if line.startswith("//FIR "):
+            fir = line[6:]
+        elif line in data_lines(lines):
+            groups.setdefault(fir, set()).add(line.split(";")[0])
+    assert groups == {fir: {ident for ident, (airport_fir, _, _) in AIRPORTS.items() if airport_fir == fir} for fir in FIRS}
+    # Elevation 114 m in feet
+    assert "SBAA;374;0;S008.45.00.000;W067.45.00.000;AERODROMO SBAA;2;0;" in lines
+
+
+def test_airports_and_helipads(wfs):
+    HEL_EXTRACTOR.main(["--base-url", wfs.base_url, "--output", "helipads.txt"])
+    assert {line.split(";")[0] for line in data_lines(read_lines("helipads.txt"))} == set(AIRPORTS) | set(HELIPADS)
+
+
+def test_navaids_stream_matches_full_download(wfs, tmp_path):
+    (tmp_path / "stream").mkdir()
+    (tmp_path / "full").mkdir()
+    NAVAIDS.main(["--base-url", wfs.base_url, "--output-dir", str(tmp_path / "stream")])
+    NAVAIDS.main(["--base-url", wfs.base_url, "--output-dir", str(tmp_path / "full"), "--no-stream"])
+    assert read_lines(tmp_path / "stream" / "navaids.txt") == read_lines(tmp_path / "full" / "navaids.txt")
@@ -0,0 +1,46 @@
+import os
+
+import SCT_BUILDER
+from geoaisweb import geopackage
+from geoaisweb.query import dataset_points
+from tests.wfs_fixtures import FIRS, NDBS, VOR_FIRS, VORS, WAYPOINTS
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_round_trip_builds_the_same_sectorfile(wfs):
+    SCT_BUILDER.main(["--base-url", wfs.base_url, "--output", "wfs.sct", "--gpkg-out", "data.gpkg"])
+    SCT_BUILDER.main(["--base-url", wfs.base_url, "--output", "gpkg.sct", "--gpkg-in", "data.gpkg"])
+    assert read_bytes("gpkg.sct") == read_bytes("wfs.sct")
+
+
+def test_round_trip_per_fir(wfs):
+    SCT_BUILDER.main(["--base-url", wfs.base_url, "--per-fir", "--output-dir", "wfs", "--gpkg-out", "data.gpkg"])
+    SCT_BUILDER.main(["--base-url", wfs.base_url, "--per-fir", "--output-dir", "gpkg", "--gpkg-in", "data.gpkg"])
+    for fir in FIRS:
+        assert read_bytes(os.path.join("gpkg", f"{fir}.sct")) == read_bytes(os.path.join("wfs", f"{fir}.sct"))
+
+
+def test_points_keep_their_fir(wfs):
+    # Saved after assign_firs: the VOR outside every FIR comes first and keeps None
+    SCT_BUILDER.main(["--base-url", wfs.base_url, "--per-fir", "--output-dir", "regions", "--gpkg-out", "data.gpkg"])
+    dataset = geopackage.read_dataset("data.gpkg")
+    assert [vor["ident"] for vor in dataset.vors] == list(VORS)
+    assert dataset.vor_firs == [VOR_FIRS[ident] for ident in VORS]
+    assert len(dataset.ndb_firs) == len(dataset.ndbs) == len(NDBS)
+    assert set(dataset.waypoints) == set(WAYPOINTS)
+    points = {(point.kind, point.ident): point.fir for point in dataset_points(dataset)}
+    assert {ident: points[("VOR", ident)] for ident in VORS} == {ident: fir or "" for ident, fir in VOR_FIRS.items()}
+
+
+def test_write_read_write(wfs, tmp_path):
+    SCT_BUILDER.main(["--base-url", wfs.base_url, "--per-fir", "--output-dir", "regions", "--gpkg-out", "first.gpkg"])
+    dataset = geopackage.read_dataset("first.gpkg")
+    geopackage.write_dataset(dataset, str(tmp_path / "second.gpkg"))
+    again = geopackage.read_dataset(str(tmp_path / "second.gpkg"))
+    assert again.vors == dataset.vors and again.vor_firs == dataset.vor_firs
+    assert again.waypoints == dataset.waypoints and again.waypoint_firs == dataset.waypoint_firs
+    assert again.sectors == dataset.sectors
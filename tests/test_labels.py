@@ -0,0 +1,53 @@
+import math
+
+import pytest
+
+import AWY_LABEL_EXTRACTOR
+from AWY_LABEL_EXTRACTOR import airway_labels, convert_to_dms, format_label
+from geoaisweb.labels import EARTH_RADIUS_NM, AlongTrackIndex
+from tests.test_extractors import read_lines
+
+
+def test_along_track_positions():
+    index = AlongTrackIndex([[(0.0, 0.0), (0.0, 1.0), (0.0, 3.0)], [(-10.0, -50.0)]])
+    degree_nm = EARTH_RADIUS_NM * math.pi / 180
+    assert index.lengths[0] == pytest.approx(3 * degree_nm)
+    assert index.lengths[1] == 0.0
+    lats, lons = index.positions([0, 0, 0, 1], [0.5 * degree_nm, 2 * degree_nm, 99 * degree_nm, 5.0])
+    assert lats.tolist() == pytest.approx([0.0, 0.0, 0.0, -10.0], abs=1e-9)
+    # Clamped to the end of each polyline
+    assert lons.tolist() == pytest.approx([0.5, 2.0, 3.0, -50.0], abs=1e-9)
+
+
+@pytest.mark.parametrize("value, dms", [
+    (-49.999999999, (-50, 0, 0.0)),
+    (-66.99999999, (-67, 0, 0.0)),
+    (10.5, (10, 30, 0.0)),
+    (-12.25, (-12, 15, 0.0)),
+])
+def test_convert_to_dms_carries_rounded_seconds(value, dms):
+    assert convert_to_dms(value) == dms
+
+
+def test_label_on_a_vertex():
+    # A single point, and the middle vertex of a symmetric airway: the slerp round trip is off by ~1e-9 degree
+    records = [
+        ("UZ1", 1, 20.0, [(-10.0, -50.0)]),
+        ("UZ2", 1, 120.0, [(-20.0, -51.0), (-20.0, -50.0), (-20.0, -49.0)]),
+    ]
+    labels = [label for _, label in airway_labels(records)]
+    assert labels == ["L;UZ1;S010.00.0.000;W050.00.0.000;", "L;UZ2;S020.00.0.000;W050.00.0.000;"]
+    assert format_label("UZ1", -10.0, -49.999999999) == labels[0]
+
+
+def test_airway_labels(wfs):
+    AWY_LABEL_EXTRACTOR.main(["--base-url", wfs.base_url, "--output-dir", "."])
+    upper, lower = read_lines("upper_awy_label.txt"), read_lines("lower_awy_label.txt")
+    assert upper and {line.split(";")[1] for line in upper} == {"UZ10"}
+    assert lower and {line.split(";")[1] for line in lower} == {"W5"}
+    for line in upper + lower:
+        _, _, lat, lon, _ = line.split(";")
+        assert line.startswith("L;")
+        for value in (lat, lon):
+            degrees, minutes, seconds = value[1:].split(".", 2)
+            assert int(minutes) < 60 and float(seconds) < 60
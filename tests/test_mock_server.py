@@ -0,0 +1,74 @@
+import gzip
+import json
+import os
+import urllib.error
+import urllib.request
+
+import pytest
+
+from geoaisweb.mock_server import Faults, MockWFSServer
+from geoaisweb.wfs import feature_url, recording_name
+from tests.wfs_fixtures import FIRS, write_layer
+
+
+def get(url, **headers):
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=10) as response:
+        return response.status, dict(response.headers), response.read()
+
+
+def recorded(wfs, type_name):
+    with open(os.path.join(wfs.data_dir, recording_name(type_name)), "rb") as f:
+        return f.read()
+
+
+def test_replays_the_recording(wfs):
+    status, headers, body = get(feature_url("ICA:SETOR_FIR", wfs.base_url))
+    assert status == 200 and body == recorded(wfs, "ICA:SETOR_FIR")
+    assert headers["ETag"]
+
+
+def test_gzip(wfs):
+    _, headers, body = get(feature_url("ICA:SETOR_FIR", wfs.base_url), **{"Accept-Encoding": "gzip"})
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body) == recorded(wfs, "ICA:SETOR_FIR")
+
+
+def test_paging_and_hits(wfs):
+    _, _, page = get(feature_url("ICA:SETOR_FIR", wfs.base_url, startIndex=1, count=1))
+    assert page.count(b"<gml:featureMember>") == 1 and b"SETOR_FIR.2" in page
+    _, _, hits = get(feature_url("ICA:SETOR_FIR", wfs.base_url, resultType="hits"))
+    assert f'numberOfFeatures="{len(FIRS)}"'.encode() in hits
+
+
+def test_unknown_layer(wfs):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(feature_url("ICA:nothing", wfs.base_url))
+    assert error.value.code == 404
+
+
+def test_reloads_a_changed_recording(wfs):
+    url = feature_url("ICA:ATZ", wfs.base_url)
+    get(url)
+    path = write_layer(wfs.data_dir, "ICA:ATZ", [])
+    os.utime(path, (1, 1))
+    _, _, body = get(url)
+    assert body == recorded(wfs, "ICA:ATZ") and b"<gml:featureMember>" not in body
+
+
+def test_not_modified_and_stats(wfs):
+    url = feature_url("ICA:SETOR_FIR", wfs.base_url)
+    _, headers, _ = get(url)
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(url, **{"If-None-Match": headers["ETag"]})
+    assert error.value.code == 304
+    _, _, stats = get(wfs.base_url.split("/geoserver")[0] + "/__stats")
+    stats = json.loads(stats)
+    assert stats["requests"] == 2 and stats["not_modified"] == 1 and stats["by_layer"] == {"ICA:SETOR_FIR": 2}
+
+
+def test_injected_errors(recordings):
+    with MockWFSServer(str(recordings), faults=Faults(error_rate=1.0, error_status=502)) as server:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            get(feature_url("ICA:SETOR_FIR", server.base_url))
+    assert error.value.code == 502
+    assert server.stats.errors_injected == 1
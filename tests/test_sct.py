@@ -0,0 +1,30 @@
+import pytest
+
+from geoaisweb.sct import SectorFileWriter
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_sections_in_order(tmp_path):
+    path = str(tmp_path / "out.sct")
+    writer = SectorFileWriter(path, spool_max_memory=16)
+    writer.add("LABELS", ["L;1;"])
+    writer.add("ARTCC LOW", lambda: (f"T;TMA {i};" for i in range(100)))
+    writer.add_group(["VOR", "EXTRA"], lambda: (["VOR;1;"], ["X;1;"]))
+    writer.add("ARTCC LOW", ["T;CTR 1;"])
+    stats = writer.write()
+    tma = "".join(f"T;TMA {i};\n" for i in range(100))
+    assert read(path) == f"[VOR]\nVOR;1;\n\n[ARTCC LOW]\n{tma}T;CTR 1;\n\n[LABELS]\nL;1;\n\n[EXTRA]\nX;1;\n"
+    assert stats["ARTCC LOW"].lines == 101
+
+
+def test_failed_producer_leaves_no_file(tmp_path):
+    writer = SectorFileWriter(str(tmp_path / "out.sct"))
+    writer.add("VOR", ["VOR;1;"])
+    writer.add("NDB", lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        writer.write()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,78 @@
+import os
+
+import SCT_BUILDER
+from geoaisweb.sct import SECTION_ORDER
+from tests.test_extractors import read_lines, sections
+from tests.wfs_fixtures import FIRS, NDBS, SECTORS, VOR_FIRS, VORS, WAYPOINTS, write_layer
+
+
+def build(wfs, *argv):
+    SCT_BUILDER.main(["--base-url", wfs.base_url, *argv])
+
+
+def test_full_build(wfs):
+    build(wfs, "--output", "brazil.sct")
+    found = sections(read_lines("brazil.sct"))
+    assert list(found) == [section for section in SECTION_ORDER if section in found]
+    assert {line.split(";")[0] for line in found["FIXES"]} == set(WAYPOINTS)
+    assert sorted(line.split(";")[0] for line in found["VOR"]) == sorted(VORS)
+    assert sorted(line.split(";")[0] for line in found["NDB"]) == sorted(NDBS)
+    sector_names = {line.split(";")[1] for section in ("ARTCC", "ARTCC HIGH", "ARTCC LOW") for line in found[section]}
+    assert sector_names == {f"FIR {fir}" for fir in FIRS} | {f"{kind} {name}" for kind, names in SECTORS.items() for name in names}
+    assert {line.split(";")[1] for line in found["HIGH AIRWAY"]} == {"UZ10"}
+    assert {line.split(";")[1] for line in found["LOW AIRWAY"]} == {"W5"}
+
+
+def test_per_fir(wfs):
+    build(wfs, "--per-fir", "--output-dir", "regions")
+    assert sorted(os.listdir("regions")) == sorted(f"{fir}.sct" for fir in FIRS)
+    vors = {}
+    for fir in FIRS:
+        found = sections(read_lines(os.path.join("regions", f"{fir}.sct")))
+        for line in found["VOR"]:
+            vors.setdefault(line.split(";")[0], []).append(fir)
+        fir_lines = [line for line in found["ARTCC"] if line.startswith("T;FIR ")]
+        assert {line.split(";")[1] for line in fir_lines} == {f"FIR {fir}"}
+        airways = {line.split(";")[1] for line in found["HIGH AIRWAY"] + found["LOW AIRWAY"]}
+        assert airways == {"SBAZ": {"UZ10"}, "SBRE": {"UZ10"}, "SBBS": {"W5"}}[fir]
+    # Every VOR in its own FIR only; the one outside every FIR in none
+    assert vors == {ident: [fir] for ident, fir in VOR_FIRS.items() if fir is not None}
+
+
+def test_per_fir_subset(wfs):
+    build(wfs, "--per-fir", "--output-dir", "regions", "--firs", "SBRE,SBBS")
+    assert sorted(os.listdir("regions")) == ["SBBS.sct", "SBRE.sct"]
+
+
+def test_per_fir_matches_full_build(wfs):
+    build(wfs, "--output", "brazil.sct")
+    build(wfs, "--per-fir", "--output-dir", "regions")
+    full = sections(read_lines("brazil.sct"))
+    regions = [sections(read_lines(os.path.join("regions", f"{fir}.sct"))) for fir in FIRS]
+    for section in ("FIXES", "NDB", "AIRPORT", "ARTCC", "ARTCC HIGH", "ARTCC LOW"):
+        assert sorted(full[section]) == sorted(line for region in regions for line in region[section])
+
+
+def test_levels_of_detail(wfs):
+    build(wfs, "--output", "brazil.sct", "--lod", "400,100")
+    full = sections(read_lines("brazil.sct"))
+    counts = {}
+    for budget in (400, 100):
+        lod = sections(read_lines(f"brazil.lod{budget}.sct"))
+        # Only the sectors are cut; every other section is the full build's
+        assert lod["VOR"] == full["VOR"] and lod["FIXES"] == full["FIXES"]
+        for section in ("ARTCC", "ARTCC HIGH", "ARTCC LOW"):
+            for line in lod[section]:
+                kind = line.split(";")[1].split(" ")[0]
+                counts[kind, budget] = counts.get((kind, budget), 0) + 1
+    # The budget is shared by the sectors of each layer
+    for kind in ("FIR", *SECTORS):
+        assert counts[kind, 100] <= 100 and counts[kind, 100] <= counts[kind, 400] <= 400
+
+
+def test_empty_layer(wfs):
+    write_layer(wfs.data_dir, "ICA:ATZ", [])
+    build(wfs, "--output", "brazil.sct")
+    found = sections(read_lines("brazil.sct"))
+    assert not [line for line in found["ARTCC LOW"] if line.startswith("T;ATZ ")]
+    assert [line for line in found["ARTCC LOW"] if line.startswith("T;CTR ")]
@@ -0,0 +1,88 @@
+import math
+import random
+
+import pytest
+
+from geoaisweb.simplify import (
+    MIN_VERTICES,
+    level_of_detail,
+    project_nm,
+    rank_rings,
+    simplify_section,
+    visvalingam_ranks,
+)
+from tests.wfs_fixtures import circle, sector_rings
+
+
+def noisy_ring(lat, lon, radius_nm, count=400, seed=1):
+    """A closed ring with random radial noise, so every vertex carries some detail."""
+    rng = random.Random(seed)
+    scale = math.cos(math.radians(lat))
+    ring = []
+    for k in range(count):
+        angle = 2 * math.pi * k / count
+        r = radius_nm * (1 + 0.1 * math.sin(5 * angle)) + rng.uniform(-0.2, 0.2)
+        ring.append((lat + r / 60 * math.cos(angle), lon + r / 60 * math.sin(angle) / scale))
+    return ring + ring[:1]
+
+
+SECTORS = [(name, ring) for kind in ("CTA", "TMA", "CTR", "ATZ") for name, _, ring in sector_rings(kind)]
+SECTORS += [("NOISY 1", noisy_ring(-15.0, -50.0, 20.0)), ("NOISY 2", noisy_ring(-5.0, -45.0, 3.0, seed=2)),
+            ("CIRCLE", circle(-12.0, -60.0, 30.0, count=720))]
+
+
+def hausdorff_nm(coords, simplified):
+    from shapely import LineString, hausdorff_distance
+
+    # Both in the projection of the original ring
+    points = project_nm(coords)
+    kept, j = [], 0
+    for coord, point in zip(coords, points):
+        if j < len(simplified) and coord == simplified[j]:
+            kept.append(point)
+            j += 1
+    return hausdorff_distance(LineString(points), LineString(kept), densify=0.01)
+
+
+def test_ranks_keep_the_endpoints():
+    ranks = visvalingam_ranks(project_nm(SECTORS[0][1]))
+    assert ranks[0] == ranks[-1] == math.inf
+    assert all(rank < math.inf for rank in ranks[1:-1])
+    assert visvalingam_ranks([(0.0, 0.0), (1.0, 1.0)]) == [math.inf, math.inf]
+
+
+@pytest.mark.parametrize("max_error_nm", [0.05, 0.5])
+def test_max_error_is_respected(max_error_nm):
+    simplified, report = simplify_section(SECTORS, max_error_nm=max_error_nm)
+    assert sum(sector.vertices_out for sector in report) < sum(sector.vertices_in for sector in report)
+    for (name, coords), ring, sector in zip(SECTORS, simplified, report):
+        assert sector.max_deviation_nm <= max_error_nm, name
+        assert hausdorff_nm(coords, ring) <= max_error_nm + 1e-9, name
+        assert ring[0] == ring[-1]
+
+
+@pytest.mark.parametrize("vertex_budget", [len(SECTORS) * MIN_VERTICES, 200, 800])
+def test_vertex_budget_is_respected(vertex_budget):
+    simplified, report = simplify_section(SECTORS, vertex_budget=vertex_budget)
+    assert sum(len(ring) for ring in simplified) == sum(sector.vertices_out for sector in report) <= vertex_budget
+    assert all(len(ring) >= MIN_VERTICES for ring in simplified)
+
+
+def test_budget_and_max_error_together():
+    by_error, _ = simplify_section(SECTORS, max_error_nm=0.05)
+    both, report = simplify_section(SECTORS, vertex_budget=200, max_error_nm=0.05)
+    assert sum(sector.vertices_out for sector in report) <= 200
+    assert all(len(ring) <= len(ring_by_error) for ring, ring_by_error in zip(both, by_error))
+
+
+
+def test_levels_of_detail_are_nested():
+    rings = rank_rings(SECTORS)
+    levels = [level_of_detail(rings, budget) for budget in (100, 200, 400, 800)]
+    for coarse, fine in zip(levels, levels[1:]):
+        for coarse_ring, fine_ring in zip(coarse, fine):
+            assert set(coarse_ring) <= set(fine_ring)
+    # Cutting the ranked rings gives what simplify_section computes from scratch
+    for budget, level in zip((100, 200, 400, 800), levels):
+        assert level == simplify_section(SECTORS, vertex_budget=budget)[0]
+        assert simplify_section(SECTORS, vertex_budget=budget, rings=rings)[0] == level
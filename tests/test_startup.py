@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+import pytest
+
+from geoaisweb.startup import REPO_ROOT, entry_points, measure
+
+
+@pytest.mark.parametrize("module", entry_points())
+def test_no_heavy_import(module):
+    _, heavy = measure(module)
+    assert heavy == []
+
+
+def test_sct_builder_imports_the_extractors_on_use():
+    modules = ["APT_EXTRACTOR", "AWY_EXTRACTOR", "AWY_LABEL_EXTRACTOR", "HEL_EXTRACTOR", "NAVAIDS", "multiprocessing"]
+    code = f"import sys, SCT_BUILDER; print(','.join(m for m in {modules!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
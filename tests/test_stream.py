@@ -0,0 +1,35 @@
+import pytest
+
+from geoaisweb.mock_server import Faults, MockWFSServer
+from geoaisweb.stream import stream_features
+from geoaisweb.wfs import feature_url
+from tests.wfs_fixtures import WAYPOINTS
+
+ICA = "{http://10.32.62.212/geoserver/ICA}"
+
+
+def ident(element):
+    return element.find(f"{ICA}ident").text
+
+
+def test_document_order_across_chunks(wfs):
+    stats = []
+    # Chunks far smaller than one feature, and more workers than needed
+    idents = list(stream_features(feature_url("ICA:waypoint_aisweb", wfs.base_url), f"{ICA}waypoint_aisweb", ident,
+                                  workers=4, chunk_size=7, stats=stats))
+    assert idents == list(WAYPOINTS)
+    assert stats[0].features == len(WAYPOINTS) and stats[0].bytes > 0
+
+
+def test_none_results_are_skipped(wfs):
+    def az_only(element):
+        return ident(element) if ident(element).startswith("AZ") else None
+
+    idents = list(stream_features(feature_url("ICA:waypoint_aisweb", wfs.base_url), f"{ICA}waypoint_aisweb", az_only))
+    assert idents == [name for name in WAYPOINTS if name.startswith("AZ")]
+
+
+def test_truncated_body_raises(recordings):
+    with MockWFSServer(str(recordings), faults=Faults(truncate_rate=1.0)) as server:
+        with pytest.raises(Exception, match="Failed to fetch URL"):
+            list(stream_features(feature_url("ICA:waypoint_aisweb", server.base_url), f"{ICA}waypoint_aisweb", ident))
@@ -0,0 +1,71 @@
+import json
+
+import SCT_BUILDER
+from geoaisweb.validation import check_ring, find_overlaps, sector_rings, validate_layer
+from tests.test_extractors import read_lines, sections
+from tests.wfs_fixtures import polygon, rectangle, write_layer
+
+
+def test_empty_layer():
+    assert find_overlaps("ATZ", []) == []
+    fir_sectors, result = validate_layer("ATZ", {"SBAZ": []})
+    assert fir_sectors == {"SBAZ": []}
+    assert result.sectors == 0 and result.issues == [] and result.overlaps == []
+
+
+def test_overlap():
+    sectors = [
+        ("A", "SBAZ", rectangle(-5.0, -4.0, -60.0, -59.0)),
+        ("B", "SBAZ", rectangle(-4.5, -3.5, -60.5, -59.5)),
+        # Shares only a border with A
+        ("C", "SBRE", rectangle(-5.0, -4.0, -59.0, -58.0)),
+    ]
+    [overlap] = find_overlaps("CTA", sectors)
+    assert (overlap.first, overlap.second) == ("A", "B")
+    assert abs(overlap.share - 0.25) < 0.01
+
+
+def lines(kind, name, ring):
+    return [f"T;{kind} {name};{lat};{lon};" for lat, lon in ring]
+
+
+def test_multi_part_sector():
+    first, second = rectangle(-5.0, -4.0, -60.0, -59.0), rectangle(-2.0, -1.0, -60.0, -59.0)
+    layer = lines("CTA", "AZ CTA 1", first) + lines("CTA", "AZ CTA 1", second) + lines("CTA", "AZ CTA 2", second)
+    assert list(sector_rings("CTA", layer)) == [("AZ CTA 1", first), ("AZ CTA 1", second), ("AZ CTA 2", second)]
+    fir_sectors, result = validate_layer("CTA", {"SBAZ": layer})
+    assert fir_sectors == {"SBAZ": layer}
+    assert result.sectors == 3 and result.issues == []
+    assert [(overlap.first, overlap.second) for overlap in result.overlaps] == [("AZ CTA 1", "AZ CTA 2")]
+
+
+def test_invalid_ring_keeps_every_part():
+    # A bow tie: make_valid gives two triangles of the same area
+    bow_tie = [(0.0, 0.0), (1.0, 1.0), (1.0, 0.0), (0.0, 1.0), (0.0, 0.0)]
+    rings, problems = check_ring(bow_tie)
+    assert len(rings) == 2 and all(ring[0] == ring[-1] and len(set(ring)) == 3 for ring in rings)
+    assert {vertex for ring in rings for vertex in ring} == set(bow_tie) | {(0.5, 0.5)}
+    [(check, detail, repaired)] = problems
+    assert check == "invalid" and "split into 2 rings" in detail and repaired
+
+    fir_sectors, result = validate_layer("ATZ", {"SBAZ": lines("ATZ", "X", bow_tie)})
+    assert list(sector_rings("ATZ", fir_sectors["SBAZ"])) == [("X", ring) for ring in rings]
+    assert result.sectors == 2 and result.overlaps == []
+
+
+def test_unrepaired_ring_is_kept():
+    bow_tie = [(0.0, 0.0), (1.0, 1.0), (1.0, 0.0), (0.0, 1.0), (0.0, 0.0)]
+    assert check_ring(bow_tie, repair=False) == ([bow_tie], [("invalid", "Self-intersection[0.5 0.5]", False)])
+
+
+def test_multi_part_sector_build(wfs):
+    # Two features of one CTA, far apart
+    members = [f"<ICA:nam>AZ CTA 1</ICA:nam><ICA:relatedfir>SBAZ</ICA:relatedfir>{polygon(ring)}"
+               for ring in (rectangle(-9.0, -8.0, -69.0, -68.0), rectangle(-3.0, -2.0, -60.0, -59.0))]
+    write_layer(wfs.data_dir, "ICA:CTA", members)
+    SCT_BUILDER.main(["--base-url", wfs.base_url, "--output", "brazil.sct", "--validation-report", "report.json"])
+    with open("report.json", encoding="utf-8") as f:
+        report = json.load(f)["layers"]["CTA"]
+    assert report["sectors"] == 2 and report["issues"] == [] and report["overlaps"] == []
+    cta = sections(read_lines("brazil.sct"))["ARTCC HIGH"]
+    assert [name for name, _ in sector_rings("CTA", cta)] == ["AZ CTA 1", "AZ CTA 1"]
@@ -0,0 +1,171 @@
+"""Small, deterministic GEOAISWEB layers written as geoaisweb.mock_server recordings.
+
+Three rectangular FIRs, with CTA/TMA rectangles, CTR/ATZ circles, a grid of
+waypoints, VORs, NDBs, aerodromes and two airways (one branching) per test
+run. Coordinates are multiples of 0.25 degree so the DMS texts are exact.
+"""
+import math
+import os
+
+from geoaisweb.wfs import recording_name
+
+HEAD = ('<?xml version="1.0" encoding="UTF-8"?><wfs:FeatureCollection xmlns="http://www.opengis.net/wfs" '
+        'xmlns:wfs="http://www.opengis.net/wfs" xmlns:gml="http://www.opengis.net/gml" '
+        'xmlns:ICA="http://10.32.62.212/geoserver/ICA"><gml:boundedBy><gml:null>unknown</gml:null></gml:boundedBy>\n')
+TAIL = '</wfs:FeatureCollection>\n'
+
+# FIR: (south, north, west, east)
+FIRS = {"SBAZ": (-10.0, 0.0, -70.0, -55.0), "SBRE": (-10.0, 0.0, -55.0, -40.0), "SBBS": (-20.0, -10.0, -70.0, -40.0)}
+OUTSIDE = (-30.0, -30.0)  # in no FIR
+
+
+def _grid(fir, count, row_step=2.0, column_step=3.0):
+    south, _, west, _ = FIRS[fir]
+    return [(south + 1.0 + row_step * (i // 4), west + 1.5 + column_step * (i % 4)) for i in range(count)]
+
+
+# ident: (lat, lon)
+WAYPOINTS = {f"{fir[2:]}{i:03d}": position for fir in FIRS for i, position in enumerate(_grid(fir, 12))}
+# The VOR outside every FIR comes first, so a shifted FIR list shows on every other VOR
+VORS = {"VXX": OUTSIDE}
+VORS.update({f"V{fir[2]}{i}": (lat + 0.5, lon + 0.5) for fir in FIRS for i, (lat, lon) in enumerate(_grid(fir, 3))})
+NDBS = {f"N{fir[2]}{i}": (lat + 1.0, lon + 1.0) for fir in FIRS for i, (lat, lon) in enumerate(_grid(fir, 3))}
+VOR_FIRS = {ident: None if ident == "VXX" else {"A": "SBAZ", "R": "SBRE", "B": "SBBS"}[ident[1]] for ident in VORS}
+
+# txtdesig: ([(seq, from, to)], lower FL, upper FL); UZ10 branches at AZ001
+AIRWAYS = {
+    "UZ10": ([(1, "AZ000", "AZ001"), (2, "AZ001", "AZ002"), (3, "AZ002", "RE000"), (4, "AZ001", "AZ005")], 245, 460),
+    "W5": ([(1, "BS000", "BS001"), (2, "BS001", "BS002")], 0, 245),
+}
+
+SECTORS = {
+    "CTA": [f"{fir[2:]} CTA {i}" for fir in FIRS for i in (1, 2)],
+    "TMA": [f"{fir[2:]} TMA {i}" for fir in FIRS for i in (1, 2)],
+    "CTR": [f"{fir[2:]} CTR 1" for fir in FIRS],
+    "ATZ": [f"{fir[2:]} ATZ {i}" for fir in FIRS for i in (1, 2)],
+}
+AIRPORTS = {f"SB{fir[2]}{chr(ord('A') + i)}": (fir, lat + 0.25, lon + 0.75) for fir in FIRS
+            for i, (lat, lon) in enumerate(_grid(fir, 3))}
+HELIPADS = {f"SJ{fir[2]}{chr(ord('A') + i)}": (fir, lat + 0.75, lon + 0.25) for fir in FIRS
+            for i, (lat, lon) in enumerate(_grid(fir, 2))}
+
+
+def gms(value, positive, negative):
+    seconds = round(abs(value) * 3600)
+    return f"{seconds // 3600}°{seconds // 60 % 60:02d}'{seconds % 60:02d}\"{positive if value >= 0 else negative}"
+
+
+def point(lat, lon):
+    return ('<ICA:geom><gml:MultiPoint srsName="EPSG:4326"><gml:pointMember><gml:Point>'
+            f'<gml:coordinates decimal="." cs="," ts=" ">{lon},{lat}</gml:coordinates>'
+            '</gml:Point></gml:pointMember></gml:MultiPoint></ICA:geom>')
+
+
+def polygon(ring):
+    coordinates = " ".join(f"{lon},{lat}" for lat, lon in ring)
+    return ('<ICA:geom><gml:MultiPolygon srsName="EPSG:4326"><gml:polygonMember><gml:Polygon><gml:outerBoundaryIs>'
+            f'<gml:LinearRing><gml:coordinates decimal="." cs="," ts=" ">{coordinates}</gml:coordinates></gml:LinearRing>'
+            '</gml:outerBoundaryIs></gml:Polygon></gml:polygonMember></gml:MultiPolygon></ICA:geom>')
+
+
+def rectangle(south, north, west, east, per_side=10):
+    corners = [(south, west), (south, east), (north, east), (north, west)]
+    ring = []
+    for (lat0, lon0), (lat1, lon1) in zip(corners, corners[1:] + corners[:1]):
+        ring.extend((round(lat0 + (lat1 - lat0) * k / per_side, 6), round(lon0 + (lon1 - lon0) * k / per_side, 6))
+                    for k in range(per_side))
+    return ring + ring[:1]
+
+
+def circle(lat, lon, radius_nm, count=120):
+    scale = math.cos(math.radians(lat))
+    ring = [(round(lat + radius_nm / 60 * math.cos(2 * math.pi * k / count), 6),
+             round(lon + radius_nm / 60 * math.sin(2 * math.pi * k / count) / scale, 6)) for k in range(count)]
+    return ring + ring[:1]
+
+
+def sector_rings(kind):
+    """(name, FIR, ring) of every sector of a layer."""
+    rings = []
+    for name in SECTORS[kind]:
+        fir = f"SB{name[:2]}"
+        number = int(name.rsplit(" ", 1)[1])
+        south, _, west, _ = FIRS[fir]
+        lat, lon = south + 3.0 * number, west + 5.0 * number
+        if kind == "CTA":
+            ring = rectangle(lat - 1.5, lat + 1.5, lon - 1.5, lon + 1.5)
+        elif kind == "TMA":
+            ring = rectangle(lat - 0.5, lat + 0.5, lon + 2.0, lon + 3.0)
+        else:
+            ring = circle(lat + 1.0, lon - 2.0 + 0.5 * number, 15.0 if kind == "CTR" else 5.0)
+        rings.append((name, fir, ring))
+    return rings
+
+
+def layers():
+    """{typeName: [feature member XML]} of every layer the extractors read."""
+    result = {
+        "ICA:SETOR_FIR": [f"<ICA:nam>{fir}</ICA:nam><ICA:relatedfir>{fir}</ICA:relatedfir>{polygon(rectangle(*box))}"
+                          for fir, box in FIRS.items()],
+    }
+    for kind in SECTORS:
+        result[f"ICA:{kind}"] = [f"<ICA:nam>{name}</ICA:nam><ICA:relatedfir>{fir}</ICA:relatedfir>{polygon(ring)}"
+                                 for name, fir, ring in sector_rings(kind)]
+    waypoints = [f"<ICA:ident>{ident}</ICA:ident>{point(lat, lon)}" for ident, (lat, lon) in WAYPOINTS.items()]
+    result["ICA:waypoint"] = result["ICA:waypoint_aisweb"] = waypoints
+    result["ICA:vor"] = [
+        f"<ICA:ident>{ident}</ICA:ident><ICA:frequency>{112 + i % 5}.{i % 2 * 5}0</ICA:frequency>"
+        f"<ICA:latitude_gms>{gms(lat, 'N', 'S')}</ICA:latitude_gms><ICA:longitude_gms>{gms(lon, 'E', 'W')}</ICA:longitude_gms>"
+        f"{point(lat, lon)}"
+        for i, (ident, (lat, lon)) in enumerate(VORS.items())
+    ]
+    result["ICA:ndb"] = [
+        f"<ICA:codeid>{ident}</ICA:codeid><ICA:valfreq>{300 + 10 * i}</ICA:valfreq>"
+        f"<ICA:latitude_gms>{gms(lat, 'N', 'S')}</ICA:latitude_gms><ICA:longitude_gms>{gms(lon, 'E', 'W')}</ICA:longitude_gms>"
+        f"{point(lat, lon)}"
+        for i, (ident, (lat, lon)) in enumerate(NDBS.items())
+    ]
+    result["ICA:navaids"] = [f"<ICA:designator>{ident}</ICA:designator>{point(lat, lon)}"
+                             for ident, (lat, lon) in {**VORS, **NDBS}.items()]
+    airways = []
+    for txtdesig, (segments, lower, upper) in AIRWAYS.items():
+        for seq, start, end in segments:
+            (lat0, lon0), (lat1, lon1) = WAYPOINTS[start], WAYPOINTS[end]
+            airways.append(
+                f"<ICA:txtdesig>{txtdesig}</ICA:txtdesig><ICA:name>{txtdesig}</ICA:name><ICA:seq>{seq}</ICA:seq>"
+                f"<ICA:airwayseg_>{seq}</ICA:airwayseg_><ICA:routedis>{60 * math.hypot(lat1 - lat0, lon1 - lon0):.1f}</ICA:routedis>"
+                f"<ICA:valdistverlower>{lower}</ICA:valdistverlower><ICA:uomdistverlower>FL</ICA:uomdistverlower>"
+                f"<ICA:valdistverupper>{upper}</ICA:valdistverupper><ICA:uomdistverupper>FL</ICA:uomdistverupper>"
+                '<ICA:geom><gml:LineString srsName="EPSG:4326"><gml:coordinates decimal="." cs="," ts=" ">'
+                f"{lon0},{lat0} {lon1},{lat1}</gml:coordinates></gml:LineString></ICA:geom>"
+            )
+    result["ICA:airway"] = airways
+
+    def aerodrome(ident, fir, lat, lon, name, tipo_util=""):
+        return (f"<ICA:localidade_id>{ident}</ICA:localidade_id><ICA:nome>{name}</ICA:nome><ICA:fir>{fir}</ICA:fir>"
+                f"{tipo_util}<ICA:elevacao>{100 + len(name)}.00</ICA:elevacao><ICA:latitude_dec>{lat}</ICA:latitude_dec>"
+                f"<ICA:longitude_dec>{lon}</ICA:longitude_dec>{point(lat, lon)}")
+
+    result["ICA:airport"] = [aerodrome(ident, fir, lat, lon, f"AERODROMO {ident}", "<ICA:tipo_util>PUB</ICA:tipo_util>")
+                             for ident, (fir, lat, lon) in AIRPORTS.items()]
+    result["ICA:airport_heliport"] = [aerodrome(ident, fir, lat, lon, f"AERODROMO {ident}")
+                                      for ident, (fir, lat, lon) in {**AIRPORTS, **HELIPADS}.items()]
+    return result
+
+
+def write_layer(directory, type_name, members):
+    """Writes one layer as a WFS 1.0.0 GetFeature response; returns its path."""
+    name = type_name.split(":")[1]
+    path = os.path.join(directory, recording_name(type_name))
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(HEAD)
+        for i, member in enumerate(members, 1):
+            f.write(f'<gml:featureMember><ICA:{name} fid="{name}.{i}">{member}</ICA:{name}></gml:featureMember>\n')
+        f.write(TAIL)
+    return path
+
+
+def write_recordings(directory):
+    """Writes every layer into directory, one recording per typeName."""
+    for type_name, members in layers().items():
+        write_layer(directory, type_name, members)